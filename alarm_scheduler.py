@@ -0,0 +1,92 @@
+import heapq
+import itertools
+import uuid
+from datetime import datetime, timedelta
+from predictive_schedule import get_predictive_planner, PREDICTIVE
+
+
+
+# Same labels as the TimerPopup repeat toggles, indexed like datetime.weekday()
+DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def ensure_alarm_id(alarm):
+    """Give an alarm a stable id if it has none yet; new alarms get theirs here before they are saved."""
+    if not alarm.get('id'):
+        alarm['id'] = uuid.uuid4().hex
+    return alarm['id']
+
+
+def next_fire_time(alarm, after):
+    """
+    Return the next datetime strictly after `after` at which the alarm should fire.
+
+    Alarms with an empty repeat list fire at the next occurrence of their HH:MM time;
+    otherwise only on the listed weekdays. Returns None for an unparsable time.
+    Predictive alarms fire at the times planned from the seat history instead.
+    """
+    if alarm.get('mode') == PREDICTIVE:
+        return get_predictive_planner().next_check(alarm, after)
+    try:
+        target_time = datetime.strptime(alarm['time'], "%H:%M").time()
+    except (ValueError, KeyError):
+        return None
+    repeat_days = {DAY_NAMES.index(day) for day in alarm.get('repeat', []) if day in DAY_NAMES}
+    for offset in range(8):
+        candidate = datetime.combine(after.date() + timedelta(days=offset), target_time)
+        if candidate <= after:
+            continue
+        if not repeat_days or candidate.weekday() in repeat_days:
+            return candidate
+    return None
+
+
+class AlarmScheduler:
+    """
+    Priority queue of alarm fire times.
+
+    Only the earliest entry matters to the caller, who keeps a single timer for it.
+    Cancelled or rescheduled alarms leave stale heap entries that are skipped lazily.
+    """
+
+    def __init__(self):
+        self.heap = []              # (fire timestamp, sequence, alarm id)
+        self.entries = {}           # alarm id -> (sequence, alarm)
+        self.counter = itertools.count()
+
+    def schedule(self, alarm, now=None):
+        """(Re)schedule an alarm for its next occurrence. Returns the fire datetime or None."""
+        alarm_id = ensure_alarm_id(alarm)
+        fire_at = next_fire_time(alarm, now or datetime.now())
+        if fire_at is None:
+            self.entries.pop(alarm_id, None)
+            return None
+        sequence = next(self.counter)
+        self.entries[alarm_id] = (sequence, alarm)
+        heapq.heappush(self.heap, (fire_at.timestamp(), sequence, alarm_id))
+        return fire_at
+
+    def cancel(self, alarm_id):
+        self.entries.pop(alarm_id, None)
+
+    def _is_live(self, item):
+        entry = self.entries.get(item[2])
+        return entry is not None and entry[0] == item[1]
+
+    def next_due(self):
+        """Timestamp of the earliest scheduled alarm, or None."""
+        while self.heap and not self._is_live(self.heap[0]):
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now_ts):
+        """Remove and return every alarm due at or before now_ts, earliest first."""
+        due = []
+        while self.heap and self.heap[0][0] <= now_ts:
+            item = heapq.heappop(self.heap)
+            if self._is_live(item):
+                due.append(self.entries.pop(item[2])[1])
+        return due
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,30 @@
+import os
+
+
+
+# Overrides the data directory, e.g. to keep benchmark runs out of the real profile data
+DATA_DIR_ENV = "WALLE_DATA_DIR"
+
+_persistent_dir = None
+
+
+def get_persistent_dir():
+    """Get platform-specific persistent directory for storing data (created once per process)."""
+    global _persistent_dir
+    if _persistent_dir is None:
+        if os.name == "nt":  # Windows
+            base_dir = os.getenv('APPDATA')
+        elif os.name == "posix":  # macOS/Linux
+            base_dir = os.path.expanduser('~/.local/share')
+        else:
+            base_dir = os.path.abspath(".")
+
+        app_dir = os.getenv(DATA_DIR_ENV) or os.path.join(base_dir, "Wall-E App")
+        os.makedirs(app_dir, exist_ok=True)
+        _persistent_dir = app_dir
+    return _persistent_dir
+
+
+def get_file_path(filename):
+    """Get full path to a file in the persistent directory."""
+    return os.path.join(get_persistent_dir(), filename)
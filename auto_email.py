@@ -1,13 +1,14 @@
 import os
 import pickle
 import base64
-import json
 import sys
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import threading
+from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from app_paths import get_persistent_dir
+from metrics import get_metrics
+from template_registry import get_template_registry
 
 
 
@@ -15,19 +16,13 @@ from email.mime.multipart import MIMEMultipart
 # OAuth 2.0 Scopes
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
-# Default email template (fallback if files are missing)
-DEFAULT_TEMPLATE = {
-    'subject': "{course_code} Add Request",
-    'body': """Hi Advisor,
+# Refresh cached tokens this many seconds before they expire
+REFRESH_MARGIN = 5 * 60
 
-I want to add {course_code} section {section}. 
-
-Thanks for your time.
-
-Sincerely Yours,
-{student_name},
-{student_id}"""
-}
+# Per student email: {'creds', 'service', 'lock'}
+_services = {}
+_refresh_timers = {}
+_services_lock = threading.Lock()
 
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and PyInstaller."""
@@ -37,46 +32,6 @@ def get_resource_path(relative_path):
         base_path = os.path.abspath(".")  # Use the current working directory in development
     return os.path.join(base_path, relative_path)
 
-def get_persistent_dir():
-    """Get platform-specific persistent directory for storing data (aligned with email_template_manager)."""
-    if os.name == "nt":  # Windows
-        base_dir = os.getenv('APPDATA')
-    elif os.name == "posix":  # macOS/Linux
-        base_dir = os.path.expanduser('~/.local/share')
-    else:
-        base_dir = os.path.abspath(".")
-
-    app_dir = os.path.join(base_dir, "Wall-E App")
-    os.makedirs(app_dir, exist_ok=True)
-    return app_dir
-
-def get_file_path(filename):
-    """Get full path to a file in the persistent directory."""
-    return os.path.join(get_persistent_dir(), filename)
-
-def load_template(template_type):
-    """Load a specific template (default or edited) from persistent storage."""
-    file_path = get_file_path(f"{template_type}_email_template.json")
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return DEFAULT_TEMPLATE  # Fallback to default if file is missing/corrupt
-
-def load_active_template():
-    """Load the active template based on settings.json (aligned with email_template_manager)."""
-    settings_path = get_file_path("settings.json")
-    if os.path.exists(settings_path):
-        try:
-            with open(settings_path, 'r') as f:
-                settings = json.load(f)
-            return load_template(settings.get("active", "default"))
-        except (json.JSONDecodeError, IOError):
-            pass
-    return load_template("default")  # Fallback to default template
-
 def get_persistent_token_path(student_email):
     """Get a persistent path for storing the token file, using the same directory as email_template_manager."""
     app_dir = get_persistent_dir()  # Use the same persistent directory as email_template_manager
@@ -84,6 +39,10 @@ def get_persistent_token_path(student_email):
 
 def get_credentials(student_email):
     """Get OAuth 2.0 credentials for a specific student email."""
+    # The Google client libraries are slow to import; load them only when an email is sent
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     creds = None
     token_path = get_persistent_token_path(student_email)  # Use persistent token path
 
@@ -102,15 +61,119 @@ def get_credentials(student_email):
             creds = flow.run_local_server(port=0)
 
         # Save the credentials for future use
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
+        save_credentials(student_email, creds)
 
     return creds
 
+def save_credentials(student_email, creds):
+    with open(get_persistent_token_path(student_email), 'wb') as token:
+        pickle.dump(creds, token)
+
+def get_gmail_service(student_email):
+    """
+    Return a cached Gmail service for the student, building it on first use.
+
+    The service is built from the bundled discovery document (no network fetch) and its
+    token is refreshed in the background shortly before it expires.
+    """
+    with _services_lock:
+        entry = _services.get(student_email)
+    if entry and entry['creds'].valid:
+        return entry
+    from googleapiclient.discovery import build
+
+    creds = get_credentials(student_email)
+    service = build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
+    entry = {'creds': creds, 'service': service, 'lock': threading.Lock()}
+    with _services_lock:
+        _services[student_email] = entry
+    schedule_token_refresh(student_email, creds)
+    return entry
+
+def warm_gmail_service(student_email):
+    """Load credentials and build the service on a background thread, ahead of the first send."""
+    def warm_thread():
+        try:
+            get_gmail_service(student_email)
+        except Exception as e:
+            print(f"Gmail warm-up failed for {student_email}: {e}")
+
+    threading.Thread(target=warm_thread, daemon=True).start()
+
+def schedule_token_refresh(student_email, creds):
+    """Refresh the token REFRESH_MARGIN seconds before it expires, off the send path."""
+    if not creds.expiry or not creds.refresh_token:
+        return
+    # google-auth keeps expiry as a naive UTC datetime
+    delay = (creds.expiry - datetime.utcnow()).total_seconds() - REFRESH_MARGIN
+    timer = threading.Timer(max(delay, 0), refresh_cached_token, args=(student_email,))
+    timer.daemon = True
+    with _services_lock:
+        old_timer = _refresh_timers.pop(student_email, None)
+        _refresh_timers[student_email] = timer
+    if old_timer:
+        old_timer.cancel()
+    timer.start()
+
+def refresh_cached_token(student_email):
+    from google.auth.transport.requests import Request
+
+    with _services_lock:
+        entry = _services.get(student_email)
+    if not entry:
+        return
+    try:
+        with entry['lock']:
+            entry['creds'].refresh(Request())
+        save_credentials(student_email, entry['creds'])
+        schedule_token_refresh(student_email, entry['creds'])
+    except Exception as e:
+        # Drop the cache entry; the next send goes through get_credentials again
+        print(f"Token refresh failed for {student_email}: {e}")
+        with _services_lock:
+            _services.pop(student_email, None)
+
+def build_raw_message(student_name, student_email, advisor_email, course_code, section, student_id):
+    """Render the active template into a base64url-encoded MIME message ready for the Gmail API."""
+    # Render the active template (compiled and cached in memory)
+    subject, body = get_template_registry().render(
+        course_code=course_code,
+        section=section,
+        student_name=student_name,
+        student_id=student_id
+    )
+
+    # Create the email message
+    message = MIMEMultipart()
+    message['From'] = student_email
+    message['To'] = advisor_email
+    message['Subject'] = subject
+
+    # Attach the email body
+    message.attach(MIMEText(body, 'plain'))
+
+    # Encode the message in base64
+    return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+
+def send_raw_message(student_email, raw_message):
+    """Send an already encoded message from the student's Gmail account."""
+    # Get the cached Gmail API service for the student's email
+    gmail = get_gmail_service(student_email)
+
+    # Send the email (service objects are not thread-safe)
+    with gmail['lock']:
+        gmail['service'].users().messages().send(
+            userId='me',
+            body={'raw': raw_message}
+        ).execute()
+
 def send_email(student_name, student_email, advisor_email, course_code, section, student_id):
     """
     Sends an email to the advisor with a request to add the student to a specific course section.
 
+    Errors are printed and re-raised so the caller can retry; the app queues sends through
+    email_outbox instead of calling this directly.
+
     Args:
         student_name (str): The name of the student.
         student_email (str): The student's email address.
@@ -119,42 +182,14 @@ def send_email(student_name, student_email, advisor_email, course_code, section,
         section (str): The section of the course (e.g., A).
         student_id (str): The student ID.
     """
+    metrics = get_metrics()
     try:
-        # Load the active email template
-        template = load_active_template()
-
-        # Format subject and body with placeholders
-        subject = template['subject'].format(course_code=course_code, section=section)
-        body = template['body'].format(
-            course_code=course_code,
-            section=section,
-            student_name=student_name,
-            student_id=student_id
-        )
-
-        # Create the email message
-        message = MIMEMultipart()
-        message['From'] = student_email
-        message['To'] = advisor_email
-        message['Subject'] = subject
-
-        # Attach the email body
-        message.attach(MIMEText(body, 'plain'))
-
-        # Encode the message in base64
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-
-        # Get OAuth 2.0 credentials for the student's email
-        creds = get_credentials(student_email)
-
-        # Build the Gmail API service
-        service = build('gmail', 'v1', credentials=creds)
-
-        # Send the email
-        service.users().messages().send(
-            userId='me',
-            body={'raw': raw_message}
-        ).execute()
-
+        with metrics.span('email.send'):
+            raw_message = build_raw_message(student_name, student_email, advisor_email,
+                                            course_code, section, student_id)
+            send_raw_message(student_email, raw_message)
+        metrics.inc('emails_sent')
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        metrics.inc('email_failures')
+        print(f"Error: {e}")
+        raise
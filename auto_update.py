@@ -1,5 +1,4 @@
 import os
-import requests
 import shutil
 import sys
 import threading
@@ -9,9 +8,9 @@ from kivy.uix.popup import Popup
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.boxlayout import BoxLayout
-from packaging import version
 import time
 import json
+from metrics import get_metrics
 
 
 
@@ -91,12 +90,19 @@ class AutoUpdater:
             return
 
         def check_thread():
+            # requests/packaging are imported here, off the UI thread and after start-up
+            import requests
+            from packaging import version
+            metrics = get_metrics()
+            metrics.inc('update_checks')
             try:
-                response = requests.get(REMOTE_VERSION_URL, timeout=10)
-                response.raise_for_status()
-                remote_data = response.json()
+                with metrics.span('update.check'):
+                    response = requests.get(REMOTE_VERSION_URL, timeout=10)
+                    response.raise_for_status()
+                    remote_data = response.json()
             except (requests.RequestException, json.JSONDecodeError) as e:
                 # Log the error but don't spam the user with popups
+                metrics.inc('update_check_failures')
                 print(f"Update check failed: {str(e)}")
                 return
 
@@ -127,6 +133,7 @@ class AutoUpdater:
             self.show_popup("Info", "Update postponed.")
 
     def download_and_apply_update(self):
+        import requests
         try:
             response = requests.get(REMOTE_VERSION_URL)
             remote_data = response.json()
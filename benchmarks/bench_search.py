@@ -0,0 +1,248 @@
+"""
+End-to-end seat-check benchmark against the local mock portal.
+
+Starts benchmarks/mock_portal.py in-process, points Wall-E at it through WALLE_PORTAL_URL,
+and keeps all app data in a temporary WALLE_DATA_DIR. Then it runs the search pipeline
+`--iterations` times and reports p50/p95 per phase, plus Python memory.
+
+Paths:
+    browser  (default) Selenium: Chrome start, portal login, Offered Courses scrape, evaluate
+             (needs Chrome; the readiness-wait steps are reported as their own phases)
+    http     PortalClient: login, department/semester lookup, offered-courses JSON, evaluate
+    engine   the app's SearchEngine -> SnapshotCache -> fetch_offered_courses path, as a
+             seat finder check runs it (caching disabled), end to end only. It uses the
+             browser unless --portal-api turns on the HTTP fast path.
+
+The mock serves the same guessed JSON endpoints and field names as portal_client.py, so
+the http path (and engine with --portal-api) only shows that those guesses agree with
+each other; only the browser path measures the scraping the app relies on.
+
+Examples:
+    python benchmarks/bench_search.py --iterations 10 --cold
+    python benchmarks/bench_search.py --path http --iterations 50 --rows 400 --latency 0.02
+    python benchmarks/bench_search.py --path engine --profiles 4 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_portal import MockPortal, DEPARTMENTS, SEMESTERS, course_code, SECTIONS_PER_COURSE
+
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class PhaseTimer:
+    """Collects seconds per named phase across iterations."""
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, phase, seconds):
+        self.phases.setdefault(phase, []).append(seconds)
+
+    def measure(self, phase, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.add(phase, time.perf_counter() - start)
+        return result
+
+    def summary(self):
+        return {
+            phase: {'count': len(values), 'p50_ms': percentile(values, 0.5) * 1000,
+                    'p95_ms': percentile(values, 0.95) * 1000, 'max_ms': max(values) * 1000}
+            for phase, values in self.phases.items()
+        }
+
+
+def bench_profile(index):
+    return {'student_id': f"bench{index}", 'portal_password': "secret", 'student_name': f"Bench {index}",
+            'student_email': f"bench{index}@std.ewubd.edu", 'advisor_email': "advisor@ewubd.edu"}
+
+
+def bench_watches(rows, count):
+    """Spread `count` course/section watches over the table, first and last rows included."""
+    step = max(rows // max(count, 1), 1)
+    indexes = sorted({min(i * step, rows - 1) for i in range(count)} | {rows - 1})
+    return [(course_code(DEPARTMENTS[0], i), str(i % SECTIONS_PER_COURSE + 1)) for i in indexes]
+
+
+def run_http(args, timer, watches):
+    from portal_client import PortalClient
+    from offered_courses import OfferedCoursesTable, evaluate_watches
+
+    client = None
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        if client is None or args.cold:
+            client = PortalClient(bench_profile(0))
+            timer.measure('login', client.login)
+            departments, semesters = timer.measure('catalogue', client.fetch_catalogue)
+            ids = dict(departments), dict(semesters)
+        rows = timer.measure('fetch', client.fetch_offered_courses, DEPARTMENTS[0], SEMESTERS[0],
+                             ids[0][DEPARTMENTS[0]], ids[1][SEMESTERS[0]])
+        timer.measure('evaluate', lambda: evaluate_watches(OfferedCoursesTable(rows), watches))
+        timer.add('total', time.perf_counter() - start)
+
+
+def run_browser(args, timer, watches):
+    from session_pool import PortalSession
+    from offered_courses import scrape_offered_courses, evaluate_watches
+    from page_readiness import timings
+
+    session = None
+    try:
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            if session is None or args.cold:
+                if session is not None:
+                    session.close()
+                session = timer.measure('chrome_start', PortalSession, bench_profile(0))
+            timer.measure('login', session.ensure_logged_in, bench_profile(0))
+            before = {step: stats['count'] for step, stats in timings.summary().items()}
+            table = timer.measure('scrape', scrape_offered_courses, session.driver, DEPARTMENTS[0], SEMESTERS[0])
+            for step, stats in timings.summary().items():
+                if stats['count'] > before.get(step, 0):
+                    timer.add(f"wait:{step}", stats['last'])
+            timer.measure('evaluate', evaluate_watches, table, watches)
+            timer.add('total', time.perf_counter() - start)
+    finally:
+        if session is not None:
+            session.close()
+
+
+def run_engine(args, timer, watches):
+    from search_engine import SearchEngine, make_search_request
+    from snapshot_cache import SnapshotCache
+
+    engine = SearchEngine(cache=SnapshotCache(ttl=0))
+    try:
+        for _ in range(args.iterations):
+            requests = [make_search_request(bench_profile(p), DEPARTMENTS[0], SEMESTERS[0], course, section,
+                                            source='benchmark')
+                        for p in range(args.profiles) for course, section in watches]
+            done = threading.Event()
+            remaining = [len(requests)]
+            lock = threading.Lock()
+            errors = []
+
+            def finish(request, outcome):
+                if isinstance(outcome, Exception):
+                    errors.append(outcome)
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        done.set()
+
+            start = time.perf_counter()
+            for request in requests:
+                engine.submit(request, finish, finish)
+            done.wait()
+            timer.add('total', time.perf_counter() - start)
+            if errors:
+                raise errors[0]
+    finally:
+        engine.shutdown()
+
+
+RUNNERS = {'http': run_http, 'browser': run_browser, 'engine': run_engine}
+
+
+def print_report(report):
+    print(f"path={report['path']} iterations={report['iterations']} rows={report['rows']} "
+          f"watches={report['watches']} latency={report['latency']}s portal_requests={report['portal_requests']}")
+    print(f"{'phase':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for phase, stats in report['phases'].items():
+        print(f"{phase:<28}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    if report['spans']:
+        print(f"{'pipeline span (metrics.py)':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for span in report['spans']:
+            labels = ",".join(f"{k}={v}" for k, v in span['labels'].items())
+            name = f"{span['name']}[{labels}]" if labels else span['name']
+            print(f"{name:<28}{span['count']:>7}{span['p50'] * 1000:>10.1f}{span['p95'] * 1000:>10.1f}"
+                  f"{span['max'] * 1000:>10.1f}")
+    memory = report['memory']
+    print(f"python heap peak {memory['python_peak_kb']:.0f} KiB, process max RSS {memory['max_rss_kb']} KiB")
+
+
+def max_rss_kb():
+    try:
+        import resource
+    except ImportError:         # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Wall-E seat checks against the mock portal.")
+    parser.add_argument("--path", choices=sorted(RUNNERS), default="browser")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1, help="iterations run before measuring")
+    parser.add_argument("--cold", action="store_true", help="log in (and start Chrome) on every iteration")
+    parser.add_argument("--profiles", type=int, default=1, help="engine path: profiles checked in parallel")
+    parser.add_argument("--watches", type=int, default=3, help="course/section watches per check")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--open-ratio", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--table-latency", type=float, default=0.0)
+    parser.add_argument("--portal-api", action="store_true",
+                        help="engine path: try the (unverified) HTTP fast path before the browser")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    portal = MockPortal(rows=args.rows, open_ratio=args.open_ratio, latency=args.latency,
+                        table_latency=args.table_latency)
+    os.environ["WALLE_PORTAL_URL"] = portal.start()
+    os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-bench-")
+    if args.portal_api:
+        from storage import update_settings
+        update_settings(portal_api={'enabled': True})
+    watches = bench_watches(args.rows, args.watches)
+    runner = RUNNERS[args.path]
+
+    from metrics import get_metrics
+
+    try:
+        if args.warmup:
+            runner(argparse.Namespace(**dict(vars(args), iterations=args.warmup)), PhaseTimer(), watches)
+        get_metrics().reset()           # Drop what the warm-up recorded
+        timer = PhaseTimer()
+        requests_before = portal.requests
+        tracemalloc.start()
+        runner(args, timer, watches)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        portal.stop()
+
+    report = {
+        'path': args.path, 'iterations': args.iterations, 'rows': args.rows, 'watches': len(watches),
+        'latency': args.latency, 'portal_requests': portal.requests - requests_before,
+        'phases': timer.summary(),
+        'spans': get_metrics().snapshot()['spans'],
+        'memory': {'python_peak_kb': peak / 1024, 'max_rss_kb': max_rss_kb()},
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
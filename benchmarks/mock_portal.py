@@ -0,0 +1,249 @@
+"""
+Local stand-in for portal.ewubd.edu, for benchmarks and offline checks.
+
+It serves the pages and endpoints Wall-E uses:
+- the login form (username, pass, lblFirstNo/lblSecondNo sum captcha, hidden token);
+- a dashboard with the Offered Courses link;
+- the Offered Courses page, whose department/semester selects and "Show Offered Courses"
+  link fill a //tbody/tr table from the offered-courses JSON endpoint;
+- the department, semester and offered-courses JSON endpoints used by portal_client.py.
+
+Table size, the share of sections with a free seat and response latency are configurable.
+
+The login form and the Offered Courses page mirror what the Selenium code drives on the
+real portal. The JSON endpoints and their field names do not: they are the same
+unverified guesses portal_client.py makes, so timings of the HTTP fast path against this
+mock say nothing about the real portal.
+
+Run it standalone and point the app at it:
+    python benchmarks/mock_portal.py --port 8800 --rows 300 --latency 0.05
+    WALLE_PORTAL_URL=http://127.0.0.1:8800/ python main.py
+"""
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+
+DEPARTMENTS = ["Department of CSE", "Department of EEE", "Department of BA", "Department of English"]
+SEMESTERS = ["Fall-2025", "Summer-2025", "Spring-2025"]
+SECTIONS_PER_COURSE = 4
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><body>
+<form action="Home/Login" method="post">
+  <input type="hidden" name="__RequestVerificationToken" value="{token}">
+  <input id="username" name="username" type="text">
+  <input id="pass" name="pass" type="password">
+  <span id="lblFirstNo">{first}</span> + <span id="lblSecondNo">{second}</span> =
+  <input id="lblcaptchaAnswer" name="lblcaptchaAnswer" type="text">
+  <button id="submit" type="submit">Login</button>
+</form>
+</body></html>"""
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html><body>
+<h1>Dashboard</h1>
+<a href="OfferedCourses"><i></i><strong>Offered Courses</strong></a>
+</body></html>"""
+
+OFFERED_COURSES_PAGE = """<!DOCTYPE html>
+<html><body>
+<select data-ng-model="filterDepartmentId">{departments}</select>
+<select data-ng-model="filterSemesterId">{semesters}</select>
+<a href="javascript:void(0)" onclick="showOffered()">Show Offered Courses</a>
+<table><thead><tr><th>Course</th><th>Section</th><th>Faculty</th><th>Time</th><th>Room</th><th>Seats</th></tr></thead>
+<tbody></tbody></table>
+<script>
+function showOffered() {
+  var dept = document.querySelector('[data-ng-model=filterDepartmentId]').value.split(':').pop();
+  var sem = document.querySelector('[data-ng-model=filterSemesterId]').value.split(':').pop();
+  var tbody = document.querySelector('tbody');
+  tbody.innerHTML = '';
+  fetch('api/Course/GetOfferedCourses?departmentId=' + dept + '&semesterId=' + sem)
+    .then(function (r) { return r.json(); })
+    .then(function (rows) {
+      tbody.innerHTML = rows.map(function (r) {
+        return '<tr><td>' + r.CourseCode + '</td><td>' + r.SectionName + '</td><td>' + r.Faculty +
+               '</td><td>' + r.Time + '</td><td>' + r.Room + '</td><td>' + r.SeatStatus + '</td></tr>';
+      }).join('');
+    });
+}
+</script>
+</body></html>"""
+
+
+def _options(names):
+    items = ['<option value="?" selected>Select</option>']
+    items += ['<option value="number:%d">%s</option>' % (i + 1, html.escape(name)) for i, name in enumerate(names)]
+    return "".join(items)
+
+
+def course_code(department, index):
+    prefix = "".join(ch for ch in department.replace("Department of ", "") if ch.isupper())[:3]
+    return f"{prefix}{100 + index // SECTIONS_PER_COURSE}"
+
+
+class MockPortal:
+    """
+    A threaded HTTP server playing the portal.
+
+    rows: sections per department/semester table. open_ratio: share of sections with a free
+    seat on each request. latency: seconds added to every response; table_latency: extra
+    seconds for the offered-courses endpoint. Any username/password is accepted; the
+    captcha must be right.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rows=200, open_ratio=0.05, latency=0.0,
+                 table_latency=0.0, seed=1):
+        self.rows = rows
+        self.open_ratio = open_ratio
+        self.latency = latency
+        self.table_latency = table_latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sessions = {}          # cookie -> {'captcha': int, 'logged_in': bool}
+        self.requests = 0
+        self.logins = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="mock-portal")
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def offered_courses(self, department_id, semester_id):
+        department = DEPARTMENTS[(int(department_id) - 1) % len(DEPARTMENTS)]
+        rows = []
+        with self.lock:
+            for index in range(self.rows):
+                capacity = 40
+                enrolled = capacity - self.random.randint(1, 3) if self.random.random() < self.open_ratio else capacity
+                rows.append({
+                    'CourseCode': course_code(department, index),
+                    'SectionName': str(index % SECTIONS_PER_COURSE + 1),
+                    'Faculty': "TBA",
+                    'Time': "MW 10:10-11:40",
+                    'Room': f"{200 + index % 50}",
+                    'SeatStatus': f"{enrolled}/{capacity}",
+                })
+        return rows
+
+    def _handler_class(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _session(self):
+                cookie = self.headers.get("Cookie", "")
+                for part in cookie.split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "mock_session" and value in portal.sessions:
+                        return value, portal.sessions[value]
+                token = secrets.token_hex(8)
+                portal.sessions[token] = {'captcha': None, 'logged_in': False}
+                return token, portal.sessions[token]
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8", token=None, location=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                if token:
+                    self.send_header("Set-Cookie", f"mock_session={token}; Path=/")
+                if location:
+                    self.send_header("Location", location)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _login_page(self, token, session):
+                first, second = portal.random.randint(1, 9), portal.random.randint(1, 9)
+                session['captcha'] = first + second
+                self._send(200, LOGIN_PAGE.format(token=secrets.token_hex(8), first=first, second=second), token=token)
+
+            def do_GET(self):
+                with portal.lock:
+                    portal.requests += 1
+                time.sleep(portal.latency)
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                token, session = self._session()
+                if not session['logged_in']:
+                    # Pages and API calls without a login get the login form, like the portal
+                    return self._login_page(token, session)
+                if url.path == "/":
+                    return self._send(200, DASHBOARD_PAGE, token=token)
+                if url.path == "/OfferedCourses":
+                    return self._send(200, OFFERED_COURSES_PAGE.format(
+                        departments=_options(DEPARTMENTS), semesters=_options(SEMESTERS)), token=token)
+                if url.path == "/api/Common/GetDepartments":
+                    return self._json([{'Id': i + 1, 'Name': name} for i, name in enumerate(DEPARTMENTS)], token)
+                if url.path == "/api/Common/GetSemesters":
+                    return self._json([{'Id': i + 1, 'Name': name} for i, name in enumerate(SEMESTERS)], token)
+                if url.path == "/api/Course/GetOfferedCourses":
+                    time.sleep(portal.table_latency)
+                    return self._json(portal.offered_courses(params.get('departmentId', ['1'])[0],
+                                                             params.get('semesterId', ['1'])[0]), token)
+                self._send(404, "Not found", token=token)
+
+            def _json(self, payload, token):
+                self._send(200, json.dumps(payload), "application/json; charset=utf-8", token=token)
+
+            def do_POST(self):
+                with portal.lock:
+                    portal.requests += 1
+                time.sleep(portal.latency)
+                token, session = self._session()
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if urlparse(self.path).path != "/Home/Login":
+                    return self._send(404, "Not found", token=token)
+                answer = form.get('lblcaptchaAnswer', [''])[0]
+                if form.get('username') and form.get('pass') and answer == str(session['captcha']):
+                    session['logged_in'] = True
+                    with portal.lock:
+                        portal.logins += 1
+                    return self._send(302, "", token=token, location="/")
+                self._login_page(token, session)
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock EWU portal.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--rows", type=int, default=200, help="sections per department/semester table")
+    parser.add_argument("--open-ratio", type=float, default=0.05, help="share of sections with a free seat")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--table-latency", type=float, default=0.0, help="extra seconds for the table endpoint")
+    args = parser.parse_args(argv)
+    portal = MockPortal(args.host, args.port, args.rows, args.open_ratio, args.latency, args.table_latency)
+    print(f"Mock portal on {portal.url} (Ctrl+C to stop)")
+    try:
+        portal.server.serve_forever()
+    except KeyboardInterrupt:
+        portal.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
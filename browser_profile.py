@@ -0,0 +1,70 @@
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from storage import load_section
+
+
+
+# Defaults for the "browser" settings section (see `walle_cli.py settings`)
+DEFAULT_BROWSER_SETTINGS = {
+    'lean': True,                # Use the stripped-down profile below
+    'headless': True,            # No window; also works on display-less servers
+    'block_images': True,
+    'block_fonts': True,
+    'block_stylesheets': True,
+    'page_load_strategy': 'eager',
+}
+
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico", "*.bmp"]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+STYLESHEET_PATTERNS = ["*.css"]
+# Third-party trackers the seat check never needs
+TRACKER_PATTERNS = ["*google-analytics.com*", "*googletagmanager.com*", "*facebook.net*", "*doubleclick.net*"]
+
+
+def load_browser_settings():
+    """Return the browser settings with defaults filled in."""
+    return load_section("browser", DEFAULT_BROWSER_SETTINGS)
+
+
+def blocked_url_patterns(settings):
+    patterns = list(TRACKER_PATTERNS)
+    if settings['block_images']:
+        patterns += IMAGE_PATTERNS
+    if settings['block_fonts']:
+        patterns += FONT_PATTERNS
+    if settings['block_stylesheets']:
+        patterns += STYLESHEET_PATTERNS
+    return patterns
+
+
+def build_chrome_options(settings):
+    options = webdriver.ChromeOptions()
+    if settings['headless']:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1280,900")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-first-run")
+    options.add_argument("--mute-audio")
+    if settings['block_images']:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = settings['page_load_strategy']
+    return options
+
+
+def create_driver():
+    """Start Chrome for a seat check, using the lean profile unless it is turned off in settings."""
+    settings = load_browser_settings()
+    if not settings['lean']:
+        return webdriver.Chrome()
+
+    driver = webdriver.Chrome(options=build_chrome_options(settings))
+    try:
+        # Drop fonts, stylesheets and trackers before they are requested
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(settings)})
+    except WebDriverException as e:
+        print(f"Could not enable request blocking: {e}")
+    return driver
@@ -0,0 +1,21 @@
+import storage
+
+
+
+# Alarm Loading/Saving
+def validate_alarm(alarm):
+    required_keys = ['time', 'course', 'section', 'department', 'semester', 'profile']
+    return all(key in alarm for key in required_keys)
+
+
+def load_alarms():
+    """Load the saved alarms, skipping incomplete entries."""
+    return [a for a in storage.load_alarms() if validate_alarm(a)]
+
+
+def save_alarm(alarm):
+    storage.upsert_alarm(alarm)
+
+
+def delete_alarm(alarm):
+    storage.delete_alarm(alarm['id'])
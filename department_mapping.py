@@ -1,6 +1,7 @@
 def get_department_mapping():
     """
-    Returns a list of department full names to be displayed in the dropdown menu.
+    Returns a list of department full names to be displayed in the dropdown menu
+    until the portal catalogue (portal_catalogue.py) has been fetched.
     """
     return [
         "MBA and EMBA Program",
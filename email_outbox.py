@@ -0,0 +1,195 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from app_paths import get_file_path
+from auto_email import build_raw_message, get_gmail_service
+from metrics import get_metrics
+
+
+
+OUTBOX_FILE = "outbox.json"
+BATCH_SIZE = 50                 # Gmail accepts up to 100 calls per batch; it recommends 50 or fewer
+MAX_ATTEMPTS = 12
+BASE_RETRY_DELAY = 5            # Seconds; doubled after every failed attempt
+MAX_RETRY_DELAY = 10 * 60
+
+# Outbox events passed to listeners
+EMAIL_SENT = 'sent'
+EMAIL_RETRYING = 'retrying'
+EMAIL_FAILED = 'failed'
+
+
+def retry_delay(attempts):
+    delay = min(BASE_RETRY_DELAY * (2 ** (attempts - 1)), MAX_RETRY_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class EmailOutbox:
+    """
+    Durable queue of advisor emails with a single background sender.
+
+    Messages are written to outbox.json before enqueue() returns and stay there until Gmail
+    accepts them, so a crash or a transient Gmail error does not lose an advisor request.
+    Due messages from the same student account go out together in Gmail batch requests.
+    Messages that fail MAX_ATTEMPTS times are kept in the file under 'failed'.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_file_path(OUTBOX_FILE)
+        self.condition = threading.Condition()
+        self.pending = []
+        self.failed = []
+        self.listeners = []
+        self.thread = None
+        self.stopping = False
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+                self.pending = stored.get('pending', [])
+                self.failed = stored.get('failed', [])
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Could not read outbox: {e}")
+
+    def _save(self):
+        """Write the outbox atomically; callers hold the condition lock."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'pending': self.pending, 'failed': self.failed}, f)
+        os.replace(tmp_path, self.path)
+
+    def subscribe(self, callback):
+        """callback(event, message, error) is called from the sender thread."""
+        self.listeners.append(callback)
+
+    def _notify(self, event, message, error=None):
+        for callback in list(self.listeners):
+            try:
+                callback(event, message, error)
+            except Exception as e:
+                print(f"Outbox listener failed: {e}")
+
+    def enqueue(self, student_name, student_email, advisor_email, course_code, section, student_id):
+        """Render the advisor email now and queue it for sending. Returns the message id."""
+        message = {
+            'id': uuid.uuid4().hex,
+            'student_email': student_email,
+            'advisor_email': advisor_email,
+            'course': course_code,
+            'section': section,
+            'raw': build_raw_message(student_name, student_email, advisor_email,
+                                     course_code, section, student_id),
+            'created_at': time.time(),
+            'attempts': 0,
+            'next_attempt_at': 0,
+            'last_error': None,
+        }
+        with self.condition:
+            self.pending.append(message)
+            self._save()
+            self.condition.notify()
+        return message['id']
+
+    def start(self):
+        with self.condition:
+            if self.thread is None:
+                self.stopping = False
+                self.thread = threading.Thread(target=self._run, daemon=True, name="email-outbox")
+                self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+    def _take_due(self):
+        """Wait until messages are due and return them grouped by student account."""
+        with self.condition:
+            while not self.stopping:
+                now = time.time()
+                due = [m for m in self.pending if m['next_attempt_at'] <= now]
+                if due:
+                    groups = {}
+                    for message in due:
+                        groups.setdefault(message['student_email'], []).append(message)
+                    return groups
+                upcoming = [m['next_attempt_at'] for m in self.pending]
+                self.condition.wait(min(upcoming) - now if upcoming else None)
+            return None
+
+    def _run(self):
+        while True:
+            groups = self._take_due()
+            if groups is None:
+                return
+            for student_email, messages in groups.items():
+                for start in range(0, len(messages), BATCH_SIZE):
+                    self._send_batch(student_email, messages[start:start + BATCH_SIZE])
+
+    def _send_batch(self, student_email, messages):
+        outcomes = {}
+
+        def on_response(request_id, response, exception):
+            outcomes[request_id] = exception
+
+        try:
+            gmail = get_gmail_service(student_email)
+            service = gmail['service']
+            batch = service.new_batch_http_request(callback=on_response)
+            for message in messages:
+                batch.add(service.users().messages().send(userId='me', body={'raw': message['raw']}),
+                          request_id=message['id'])
+            with gmail['lock'], get_metrics().span('email.batch_send'):
+                batch.execute()
+        except Exception as e:
+            # Auth or transport failure: the whole batch is retried
+            for message in messages:
+                outcomes.setdefault(message['id'], e)
+        self._record(messages, outcomes)
+
+    def _record(self, messages, outcomes):
+        events = []
+        with self.condition:
+            for message in messages:
+                error = outcomes.get(message['id'], RuntimeError("No response in batch"))
+                if message not in self.pending:
+                    continue
+                if error is None:
+                    self.pending.remove(message)
+                    events.append((EMAIL_SENT, message, None))
+                    get_metrics().inc('emails_sent')
+                    continue
+                message['attempts'] += 1
+                message['last_error'] = str(error)
+                if message['attempts'] >= MAX_ATTEMPTS:
+                    self.pending.remove(message)
+                    self.failed.append(message)
+                    events.append((EMAIL_FAILED, message, error))
+                    get_metrics().inc('email_failures')
+                else:
+                    message['next_attempt_at'] = time.time() + retry_delay(message['attempts'])
+                    events.append((EMAIL_RETRYING, message, error))
+                    get_metrics().inc('retries', reason='email')
+            self._save()
+        for event in events:
+            self._notify(*event)
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """Return the process-wide outbox, starting its sender on first use."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = EmailOutbox()
+            _outbox.start()
+        return _outbox
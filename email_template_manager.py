@@ -1,89 +1,41 @@
-import os
-import json
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.button import Button
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
+import storage
+from template_registry import DEFAULT_TEMPLATE, TemplateError, get_template_registry, validate_template
 
 
 
-# Default email template
-DEFAULT_TEMPLATE = {
-    'subject': "{course_code} Add Request",
-    'body': """Hi Advisor,
-
-I want to add {course_code} section {section}. 
-
-Thanks for your time.
-
-Sincerely Yours,
-{student_name},
-{student_id}"""
-}
-
-
-def get_persistent_dir():
-    """Get platform-specific persistent directory for storing data."""
-    if os.name == "nt":  # Windows
-        base_dir = os.getenv('APPDATA')
-    elif os.name == "posix":  # macOS/Linux
-        base_dir = os.path.expanduser('~/.local/share')
-    else:
-        base_dir = os.path.abspath(".")
-
-    app_dir = os.path.join(base_dir, "Wall-E App")
-    os.makedirs(app_dir, exist_ok=True)
-    return app_dir
-
-
-def get_file_path(filename):
-    return os.path.join(get_persistent_dir(), filename)
-
-
 def initialize_default_template():
-    """Ensure default template file exists."""
-    default_path = get_file_path("default_email_template.json")
-    if not os.path.exists(default_path):
-        with open(default_path, 'w') as f:
-            json.dump(DEFAULT_TEMPLATE, f, indent=4)
+    """Ensure the default template is stored."""
+    if storage.load_template("default") is None:
+        storage.save_template("default", DEFAULT_TEMPLATE)
 
 
 def load_template(template_type):
     """Load a specific template (default or edited)."""
-    file_path = get_file_path(f"{template_type}_email_template.json")
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            pass
-    return DEFAULT_TEMPLATE
+    return storage.load_template(template_type) or DEFAULT_TEMPLATE
 
 
 def save_template(template, template_type):
-    """Save a template as default or edited."""
-    file_path = get_file_path(f"{template_type}_email_template.json")
-    with open(file_path, 'w') as f:
-        json.dump(template, f, indent=4)
+    """Save a template as default or edited. Raises TemplateError if its placeholders are invalid."""
+    validate_template(template)
+    storage.save_template(template_type, template)
+    get_template_registry().invalidate()
 
 
 def load_active_template():
-    """Load the active template based on user selection."""
-    settings_path = get_file_path("settings.json")
-    if os.path.exists(settings_path):
-        with open(settings_path, 'r') as f:
-            settings = json.load(f)
-        return load_template(settings.get("active", "default"))
-    return load_template("default")
+    """Return the active template, served from the in-memory template registry."""
+    return get_template_registry().active_template()
 
 
 def set_active_template(template_type):
     """Set the active template (default or edited)."""
-    settings_path = get_file_path("settings.json")
-    with open(settings_path, 'w') as f:
-        json.dump({"active": template_type}, f)
+    storage.update_settings(active=template_type)
+    get_template_registry().invalidate()
 
 
 class ViewTemplateScreen(Screen):
@@ -174,7 +126,11 @@ class EmailTemplateScreen(Screen):
 
     def save_edited_email(self, instance):
         edited_email = {'subject': self.subject_input.text.strip(), 'body': self.body_input.text.strip()}
-        save_template(edited_email, "edited")
+        try:
+            save_template(edited_email, "edited")
+        except TemplateError as e:
+            self.message_label.text = str(e)
+            return
         self.message_label.text = "Template saved successfully!"
 
 
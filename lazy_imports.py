@@ -0,0 +1,115 @@
+"""
+Background pre-loading of heavy dependencies and an import-time report.
+
+Selenium, the Google client and requests are imported inside the functions that use them,
+never at module level in code reached from main.py, so they stay off the app start-up path;
+preload_in_background() then imports them while the user is still on the home screen.
+
+Run `python lazy_imports.py` to see what each start-up and heavy module costs on a cold
+interpreter; `--max-startup-ms N` exits with status 1 when start-up imports exceed N ms.
+"""
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+
+
+# Imported by main.py before the first frame
+STARTUP_MODULES = ['kivy.uix.button', 'user_profile_manager', 'search_seat', 'email_template_manager', 'auto_update']
+
+# Only needed once the user searches, sends an email or checks for updates
+HEAVY_MODULES = [
+    'selenium.webdriver',
+    'requests',
+    'portal_client',
+    'page_readiness',
+    'browser_profile',
+    'google.auth.transport.requests',
+    'google_auth_oauthlib.flow',
+    'googleapiclient.discovery',
+    'packaging.version',
+]
+
+# Set WALLE_IMPORT_REPORT=1 to print pre-load timings from the running app
+REPORT_ENV = "WALLE_IMPORT_REPORT"
+
+preload_times = {}      # module -> seconds spent importing it in the background, or None if it failed
+_preload_lock = threading.Lock()
+
+
+def preload_in_background(modules=None, on_done=None):
+    """Import the given (default: heavy) modules on a daemon thread so first use does not stall."""
+    modules = HEAVY_MODULES if modules is None else modules
+
+    def preload_thread():
+        for name in modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                elapsed = time.perf_counter() - start
+            except ImportError as e:
+                print(f"Pre-load of {name} failed: {e}")
+                elapsed = None
+            with _preload_lock:
+                preload_times[name] = elapsed
+        if os.getenv(REPORT_ENV):
+            print_preload_report()
+        if on_done:
+            on_done()
+
+    thread = threading.Thread(target=preload_thread, daemon=True)
+    thread.start()
+    return thread
+
+
+def print_preload_report():
+    with _preload_lock:
+        items = list(preload_times.items())
+    print("Background pre-load:")
+    for name, seconds in items:
+        print(f"  {name:<34} {'failed' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+
+
+def measure_import(module):
+    """Cumulative import time of a module in a fresh interpreter, in ms (None if it fails)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        return None
+    pattern = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+    for line in result.stderr.splitlines():
+        match = pattern.match(line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000
+    return None
+
+
+def import_report(modules):
+    return [(module, measure_import(module)) for module in modules]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report cold import times of Wall-E modules.")
+    parser.add_argument("--max-startup-ms", type=float,
+                        help="fail if any start-up module takes longer than this")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for title, modules in (("Start-up imports", STARTUP_MODULES), ("Deferred imports", HEAVY_MODULES)):
+        print(title)
+        for module, ms in import_report(modules):
+            print(f"  {module:<34} {'not importable' if ms is None else f'{ms:8.1f} ms'}")
+            if title == "Start-up imports" and args.max_startup_ms and ms and ms > args.max_startup_ms:
+                status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
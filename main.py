@@ -1,4 +1,9 @@
+import os
+import time
+APP_START = time.perf_counter()
+
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.button import Button
 from kivy.uix.label import Label
@@ -7,6 +12,12 @@ from user_profile_manager import ProfileManagementScreen, CreateProfileScreen, V
 from search_seat import SeatFinderScreen
 from email_template_manager import EmailTemplateScreen, ViewTemplateScreen
 from auto_update import AutoUpdater
+from session_pool import get_session_pool
+from email_outbox import get_outbox
+from lazy_imports import preload_in_background, REPORT_ENV
+from stats_view import StatsScreen
+from metrics import get_metrics, MetricsExporter
+from ui_latency import start_ui_monitor, get_ui_monitor
 
 
 
@@ -30,6 +41,10 @@ class HomeScreen(Screen):
         email_template_button.bind(on_press=self.go_to_email_template_manager)
         layout.add_widget(email_template_button)
 
+        stats_button = Button(text="Stats", size_hint_y=None, height=50)
+        stats_button.bind(on_press=self.go_to_stats)
+        layout.add_widget(stats_button)
+
         exit_button = Button(text="Exit", size_hint_y=None, height=50)
         exit_button.bind(on_press=self.exit_app)
         layout.add_widget(exit_button)
@@ -48,6 +63,10 @@ class HomeScreen(Screen):
         """Switch to the 'email_template_manager' screen."""
         self.manager.current = "email_template_manager"
 
+    def go_to_stats(self, instance):
+        """Switch to the 'stats' screen."""
+        self.manager.current = "stats"
+
     def exit_app(self, instance):
         """Exit the app."""
         App.get_running_app().stop()
@@ -65,10 +84,37 @@ class ProfileApp(App):
         sm.add_widget(EmailTemplateScreen(name="email_template_manager"))
         sm.add_widget(ViewTemplateScreen(name="view_templates"))
         sm.add_widget(EmailTemplateScreen(name="edit_template"))
+        sm.add_widget(StatsScreen(name="stats"))
         self.updater = AutoUpdater(self)
         self.updater.check_for_updates()
+        self.metrics_exporter = None        # Started after the first frame
 
         return sm
 
+    def on_start(self):
+        # Runs once the first frame is on screen
+        Clock.schedule_once(self.after_first_frame, 0)
+
+    def after_first_frame(self, dt):
+        if os.getenv(REPORT_ENV):
+            print(f"Time to first frame: {(time.perf_counter() - APP_START) * 1000:.0f} ms")
+        preload_in_background()
+        self.metrics_exporter = MetricsExporter(get_metrics())
+        self.metrics_exporter.start()
+
+    def on_stop(self):
+        seat_finder = self.root.get_screen('seat_finder')
+        seat_finder.watch_manager.stop_all()
+        seat_finder.search_engine.shutdown()
+        get_outbox().stop()
+        get_session_pool().close_all()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        ui_monitor = get_ui_monitor()
+        if ui_monitor is not None:
+            print(f"UI latency written to {ui_monitor.dump()}")
+            ui_monitor.uninstall()      # Shutdown callbacks after this run untimed
+
 if __name__ == '__main__':
+    start_ui_monitor()      # Before build(), so the widget tree's own triggers are timed too
     ProfileApp().run()
@@ -0,0 +1,205 @@
+"""
+Counters and timing spans for the seat-check pipeline, email sending and update checks.
+
+    with get_metrics().span('portal.login', via='http'):
+        ...
+    get_metrics().inc('checks')
+
+Spans keep a count, total, max, Prometheus histogram buckets and the last SPAN_SAMPLES
+durations (for p50/p95 in the stats screen). export() writes everything to the data
+directory either as Prometheus text (metrics.prom, rewritten each time, for a node_exporter
+textfile collector) or as JSON lines (metrics.jsonl, one snapshot appended per export).
+The format and interval come from the "metrics" settings.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from app_paths import get_file_path
+from storage import load_section
+
+
+
+DEFAULT_METRICS_SETTINGS = {
+    'format': 'prometheus',         # 'prometheus' or 'jsonl'
+    'interval': 60,                 # Seconds between exports while the app runs; 0 turns them off
+}
+
+PROMETHEUS_FILE = "metrics.prom"
+JSONL_FILE = "metrics.jsonl"
+PREFIX = "walle_"
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SPAN_SAMPLES = 512
+
+
+def load_metrics_settings():
+    return load_section("metrics", DEFAULT_METRICS_SETTINGS)
+
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (key, value.replace('\\', '\\\\').replace('"', '\\"'))
+                             for key, value in pairs)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)] if ordered else None
+
+
+class SpanStats:
+    __slots__ = ('count', 'total', 'max', 'errors', 'buckets', 'recent')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=SPAN_SAMPLES)
+
+    def add(self, seconds, failed=False):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if failed:
+            self.errors += 1
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+        self.recent.append(seconds)
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop every counter and span and restart the uptime clock."""
+        with self.lock:
+            self.started_at = time.time()
+            self.counters = {}          # (name, labels) -> value
+            self.spans = {}             # (name, labels) -> SpanStats
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, failed=False, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                stats = self.spans[key] = SpanStats()
+            stats.add(seconds, failed)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the block under `name`; a block that raises is counted in the span's errors."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(name, time.perf_counter() - start, failed=True, **labels)
+            raise
+        self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """Return {'time', 'uptime', 'counters': [...], 'spans': [...]} as plain data."""
+        with self.lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            spans = [{'name': name, 'labels': dict(labels), 'count': s.count, 'errors': s.errors,
+                      'total': s.total, 'max': s.max, 'p50': _percentile(s.recent, 0.5),
+                      'p95': _percentile(s.recent, 0.95)}
+                     for (name, labels), s in sorted(self.spans.items())]
+        now = time.time()
+        return {'time': now, 'uptime': now - self.started_at, 'counters': counters, 'spans': spans}
+
+    def prometheus_text(self):
+        lines = []
+        with self.lock:
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                metric = PREFIX + name.replace('.', '_') + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        lines.append(f"{metric}{_format_labels(labels)} {value}")
+            if self.spans:
+                metric = PREFIX + "span_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for (name, labels), stats in sorted(self.spans.items()):
+                    base = (('span', name),) + labels
+                    for bound, count in zip(BUCKETS, stats.buckets):
+                        lines.append(f"{metric}_bucket{_format_labels(base, [('le', str(bound))])} {count}")
+                    lines.append(f"{metric}_bucket{_format_labels(base, [('le', '+Inf')])} {stats.count}")
+                    lines.append(f"{metric}_sum{_format_labels(base)} {stats.total:.6f}")
+                    lines.append(f"{metric}_count{_format_labels(base)} {stats.count}")
+                metric = PREFIX + "span_errors_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (name, labels), stats in sorted(self.spans.items()):
+                    lines.append(f"{metric}{_format_labels((('span', name),) + labels)} {stats.errors}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, fmt=None):
+        """Write the metrics file in the configured format and return its path."""
+        fmt = fmt or load_metrics_settings()['format']
+        if fmt == 'jsonl':
+            path = get_file_path(JSONL_FILE)
+            with open(path, 'a') as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
+            return path
+        path = get_file_path(PROMETHEUS_FILE)
+        with open(path + ".tmp", 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(path + ".tmp", path)
+        return path
+
+
+class MetricsExporter:
+    """Calls export() every `interval` seconds on a daemon thread."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        interval = load_metrics_settings()['interval']
+        if interval and self.thread is None:
+            self.thread = threading.Thread(target=self._run, args=(interval,), daemon=True, name="metrics-export")
+            self.thread.start()
+
+    def _run(self, interval):
+        while not self.stopped.wait(interval):
+            self._export()
+
+    def _export(self):
+        try:
+            self.metrics.export()
+        except Exception as e:
+            print(f"Metrics export failed: {e}")
+
+    def stop(self):
+        """Stop the thread and write a final export."""
+        self.stopped.set()
+        if self.thread is not None:
+            self._export()
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
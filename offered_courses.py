@@ -0,0 +1,207 @@
+import threading
+import time
+from session_pool import get_session_pool, load_portal_api_settings
+from metrics import get_metrics
+from portal_catalogue import get_catalogue, OPTIONS_SCRIPT
+
+
+
+# After the HTTP fast path fails, go straight to Selenium for this long
+HTTP_RETRY_COOLDOWN = 10 * 60
+
+DEPARTMENT_SELECT = "//select[@data-ng-model='filterDepartmentId']"
+SEMESTER_SELECT = "//select[@data-ng-model='filterSemesterId']"
+
+# Reads the whole table in one WebDriver round trip: a list of rows, each a list of cell texts
+TABLE_SCRIPT = """
+return Array.prototype.map.call(document.querySelectorAll('tbody tr'), function (tr) {
+    return Array.prototype.map.call(tr.cells, function (td) {
+        return td.textContent.replace(/\\s+/g, ' ').trim();
+    });
+});
+"""
+
+# Picks an option by portal id and lets Angular see the change; false if no option has that id
+SELECT_BY_ID_SCRIPT = """
+var select = document.evaluate(arguments[0], document, null,
+                               XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!select) { return false; }
+for (var i = 0; i < select.options.length; i++) {
+    if (select.options[i].value.split(':').pop() === arguments[1]) {
+        select.selectedIndex = i;
+        select.dispatchEvent(new Event('change', {bubbles: true}));
+        return true;
+    }
+}
+return false;
+"""
+
+OFFERED_COURSES_LINK = "//a[.//strong[text()='Offered Courses']]"
+
+_http_disabled_until = 0
+_http_lock = threading.Lock()
+
+
+def calculate_available_seats(seat_data):
+    try:
+        current_enrollment, total_capacity = map(int, seat_data.split('/'))
+        return total_capacity - current_enrollment, seat_data
+    except ValueError:
+        return None, None
+
+
+def parse_table_cells(table_cells):
+    """Turn raw cell texts into row dicts, skipping rows without the seat column."""
+    return [
+        {'course': cells[0], 'section': cells[1], 'seats': cells[5]}
+        for cells in table_cells if len(cells) >= 6
+    ]
+
+
+class OfferedCoursesTable:
+    """Offered-courses rows with seats pre-computed and an index by (course code, section)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.index = {}
+        for row in rows:
+            row['available_seats'], _ = calculate_available_seats(row['seats'])
+            self.index.setdefault((row['course'], row['section']), row)
+
+    def lookup(self, course, section):
+        """Return the row for a course/section, or None if it is not offered."""
+        return self.index.get((course.strip(), section.strip()))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def _open_offered_courses(driver):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from page_readiness import wait_for
+
+    wait_for(driver, 'offered_courses_link', EC.element_to_be_clickable((By.XPATH, OFFERED_COURSES_LINK))).click()
+
+
+def _choose_option(driver, xpath, name, option_id):
+    """
+    Select by portal id when the catalogue knows it, by label otherwise.
+
+    The id is tried once the select is populated. If the portal no longer lists it, the
+    catalogue is marked stale (so it is re-read from this page) and the label is used.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import Select
+    from page_readiness import wait_for, select_has_option, select_populated
+
+    if option_id is not None:
+        wait_for(driver, 'filters_ready', select_populated(xpath))
+        if driver.execute_script(SELECT_BY_ID_SCRIPT, xpath, str(option_id)):
+            return
+        print(f"Portal has no option with id {option_id} for '{name}'; selecting it by name")
+        get_catalogue().mark_stale()
+    wait_for(driver, 'filters_ready', select_has_option(xpath, name))
+    Select(driver.find_element(By.XPATH, xpath)).select_by_visible_text(name)
+
+
+def scrape_catalogue(driver):
+    """Read the department and semester options as [(name, id)] lists from the Offered Courses page."""
+    from page_readiness import wait_for, select_populated
+
+    _open_offered_courses(driver)
+    wait_for(driver, 'filters_ready', select_populated(DEPARTMENT_SELECT))
+    wait_for(driver, 'filters_ready', select_populated(SEMESTER_SELECT))
+    departments, semesters = driver.execute_script(OPTIONS_SCRIPT, DEPARTMENT_SELECT, SEMESTER_SELECT)
+    return departments, semesters
+
+
+def scrape_offered_courses(driver, department, semester):
+    """Open Offered Courses in a logged-in browser and read the department/semester table."""
+    from selenium.webdriver.common.by import By
+    from page_readiness import wait_for, table_rows_stable
+
+    catalogue = get_catalogue()
+    metrics = get_metrics()
+    with metrics.span('portal.offered_courses_click'):
+        _open_offered_courses(driver)
+    with metrics.span('portal.select_filters'):
+        _choose_option(driver, DEPARTMENT_SELECT, department, catalogue.department_id(department))
+        _choose_option(driver, SEMESTER_SELECT, semester, catalogue.semester_id(semester))
+    if catalogue.is_stale():
+        # The filters are loaded anyway, so refreshing the catalogue costs one script call
+        catalogue.update(*driver.execute_script(OPTIONS_SCRIPT, DEPARTMENT_SELECT, SEMESTER_SELECT))
+    with metrics.span('portal.table_load'):
+        driver.find_element(By.XPATH, "//a[contains(text(), 'Show Offered Courses')]").click()
+        wait_for(driver, 'table_ready', table_rows_stable())
+    with metrics.span('portal.row_scan'):
+        return OfferedCoursesTable(parse_table_cells(driver.execute_script(TABLE_SCRIPT)))
+
+
+def _http_available():
+    return time.time() >= _http_disabled_until
+
+
+def _disable_http():
+    global _http_disabled_until
+    with _http_lock:
+        _http_disabled_until = time.time() + HTTP_RETRY_COOLDOWN
+
+
+def fetch_offered_courses(profile, department, semester):
+    """
+    Load the offered-courses table for a department and semester.
+
+    With the "portal_api" setting enabled, tries the HTTP client first and falls back to a
+    pooled Selenium browser when the portal API refuses or changes shape.
+    """
+    metrics = get_metrics()
+    if load_portal_api_settings()['enabled'] and _http_available():
+        from portal_client import get_portal_client, FALLBACK_ERRORS
+        try:
+            catalogue = get_catalogue()
+            with metrics.span('portal.fetch', via='http'):
+                rows = get_portal_client(profile).fetch_offered_courses(
+                    department, semester, catalogue.department_id(department), catalogue.semester_id(semester))
+            with metrics.span('portal.row_scan'):
+                return OfferedCoursesTable(rows)
+        except FALLBACK_ERRORS as e:
+            print(f"HTTP portal client failed, falling back to browser: {e}")
+            metrics.inc('retries', reason='browser_fallback')
+            _disable_http()
+    with metrics.span('portal.fetch', via='browser'):
+        with get_session_pool().session(profile) as driver:
+            return scrape_offered_courses(driver, department, semester)
+
+
+def evaluate_watches(table, watches):
+    """
+    Answer every (course, section) watch from one table.
+
+    Returns one result dict per watch, in the same order:
+    {'course', 'section', 'offered', 'seats', 'available_seats', 'opened_at'}.
+    opened_at is only known when the table went through the snapshot tracker.
+    """
+    results = []
+    for course, section in watches:
+        course = course.strip()
+        section = section.strip()
+        row = table.lookup(course, section)
+        results.append({
+            'course': course,
+            'section': section,
+            'offered': row is not None,
+            'seats': row['seats'] if row else "",
+            'available_seats': row['available_seats'] if row else None,
+            'opened_at': row.get('opened_at') if row else None,
+        })
+    return results
+
+
+def search_watches(profile, department, semester, watches):
+    """Check several course/section watches with a single offered-courses load."""
+    table = fetch_offered_courses(profile, department, semester)
+    return evaluate_watches(table, watches)
@@ -0,0 +1,147 @@
+import threading
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from metrics import get_metrics
+
+
+
+# Per-step timeouts in seconds
+STEP_TIMEOUTS = {
+    'offered_courses_link': 15,
+    'filters_ready': 10,
+    'table_ready': 20,
+}
+
+POLL_INTERVAL = 0.1
+
+ANGULAR_IDLE_SCRIPT = """
+if (!window.angular) { return true; }
+var root = document.querySelector('[ng-app],[data-ng-app]') || document.body;
+var injector = window.angular.element(root).injector();
+if (!injector) { return true; }
+var http = injector.get('$http');
+var rootScope = injector.get('$rootScope');
+return http.pendingRequests.length === 0 && !rootScope.$$phase;
+"""
+
+ROW_COUNT_SCRIPT = "return document.querySelectorAll('tbody tr').length;"
+
+OPTION_TEXTS_SCRIPT = """
+var select = document.evaluate(arguments[0], document, null,
+                               XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!select) { return null; }
+return Array.prototype.map.call(select.options, function (o) { return o.text.trim(); });
+"""
+
+
+class WaitTimings:
+    """Keeps how long each readiness step actually waited, for tuning the timeouts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.steps = {}
+        self.last = {}
+
+    def record(self, step, seconds, timed_out=False):
+        with self.lock:
+            stats = self.steps.setdefault(step, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            if timed_out:
+                stats['timeouts'] += 1
+            self.last[step] = seconds
+
+    def summary(self):
+        """Return {step: {'count', 'avg', 'max', 'timeouts', 'last'}}."""
+        with self.lock:
+            return {
+                step: {
+                    'count': stats['count'],
+                    'avg': stats['total'] / stats['count'],
+                    'max': stats['max'],
+                    'timeouts': stats['timeouts'],
+                    'last': self.last.get(step),
+                }
+                for step, stats in self.steps.items()
+            }
+
+
+timings = WaitTimings()
+
+
+def wait_for(driver, step, condition, timeout=None):
+    """Wait until condition(driver) is truthy, recording the time spent under the step name."""
+    timeout = timeout if timeout is not None else STEP_TIMEOUTS.get(step, 10)
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        timings.record(step, time.perf_counter() - start, timed_out=True)
+        get_metrics().observe('portal.wait', time.perf_counter() - start, failed=True, step=step)
+        raise TimeoutException(f"Portal not ready: '{step}' after {timeout}s")
+    timings.record(step, time.perf_counter() - start)
+    get_metrics().observe('portal.wait', time.perf_counter() - start, step=step)
+    return result
+
+
+def angular_idle(driver):
+    """True when Angular has no pending $http requests and is not in a digest."""
+    try:
+        return driver.execute_script(ANGULAR_IDLE_SCRIPT)
+    except WebDriverException:
+        return False
+
+
+class select_has_option:
+    """Condition: the select at xpath is populated and lists the given option text."""
+
+    def __init__(self, xpath, text):
+        self.xpath = xpath
+        self.text = text
+
+    def __call__(self, driver):
+        if not angular_idle(driver):
+            return False
+        options = driver.execute_script(OPTION_TEXTS_SCRIPT, self.xpath)
+        return bool(options) and self.text in options
+
+
+class select_populated:
+    """Condition: the select at xpath has options and Angular is idle."""
+
+    def __init__(self, xpath):
+        self.xpath = xpath
+
+    def __call__(self, driver):
+        return angular_idle(driver) and bool(driver.execute_script(OPTION_TEXTS_SCRIPT, self.xpath))
+
+
+class table_rows_stable:
+    """
+    Condition: the offered-courses table row count stopped changing.
+
+    The count must hold for `settle` seconds with Angular idle. An empty table is only
+    accepted after `empty_grace` seconds, since the rows arrive after the click.
+    """
+
+    def __init__(self, settle=0.4, empty_grace=3.0):
+        self.settle = settle
+        self.empty_grace = empty_grace
+        self.started = time.monotonic()
+        self.count = None
+        self.since = None
+
+    def __call__(self, driver):
+        now = time.monotonic()
+        count = driver.execute_script(ROW_COUNT_SCRIPT)
+        if count != self.count or not angular_idle(driver):
+            self.count = count
+            self.since = now
+            return False
+        if now - self.since < self.settle:
+            return False
+        if count == 0 and now - self.started < self.empty_grace:
+            return False
+        return True
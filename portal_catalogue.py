@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from app_paths import get_file_path
+from department_mapping import get_department_mapping
+from semester_mapping import get_semester_mapping
+from storage import load_section
+
+
+
+CATALOGUE_FILE = "catalogue.json"
+CATALOGUE_TTL = 24 * 60 * 60        # Re-read the portal's department/semester lists once a day
+
+# Defaults for the "catalogue" section of settings
+DEFAULT_CATALOGUE_SETTINGS = {
+    'refresh_on_profile_select': False,     # Log in as soon as a profile is picked to refresh a stale catalogue
+}
+
+# Reads the (label, id) pairs of both filter selects in one WebDriver round trip.
+# AngularJS writes option values like "number:12"; only the id after the colon is kept.
+OPTIONS_SCRIPT = """
+function read(xpath) {
+    var select = document.evaluate(xpath, document, null,
+                                   XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!select) { return []; }
+    var out = [];
+    Array.prototype.forEach.call(select.options, function (o) {
+        var id = o.value.split(':').pop();
+        if (id && id.charAt(0) !== '?' && o.text.trim()) { out.push([o.text.trim(), id]); }
+    });
+    return out;
+}
+return [read(arguments[0]), read(arguments[1])];
+"""
+
+
+def load_catalogue_settings():
+    return load_section("catalogue", DEFAULT_CATALOGUE_SETTINGS)
+
+
+def option_id(value):
+    """Strip AngularJS' "type:" prefix from an option value."""
+    return str(value).split(':')[-1]
+
+
+class Catalogue:
+    """
+    Department and semester names as the portal lists them, indexed name -> portal id.
+
+    Kept in catalogue.json and refreshed when older than CATALOGUE_TTL, normally from the
+    Offered Courses page a seat check has already opened. Until the first successful
+    refresh the names come from the built-in mapping lists, without ids.
+    """
+
+    def __init__(self, path=None, ttl=CATALOGUE_TTL):
+        self.path = path or get_file_path(CATALOGUE_FILE)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.departments = {}       # name -> id, in portal order
+        self.semesters = {}
+        self.fetched_at = 0
+        self.refreshing = False
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+                self.departments = dict(stored['departments'])
+                self.semesters = dict(stored['semesters'])
+                self.fetched_at = stored['fetched_at']
+            except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError) as e:
+                print(f"Could not read catalogue: {e}")
+
+    def _save(self):
+        stored = {'fetched_at': self.fetched_at,
+                  'departments': list(self.departments.items()),
+                  'semesters': list(self.semesters.items())}
+        with open(self.path + ".tmp", 'w') as f:
+            json.dump(stored, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def is_stale(self):
+        return not self.departments or time.time() - self.fetched_at > self.ttl
+
+    def mark_stale(self):
+        """Force a refresh on the next chance, e.g. after the portal rejected a stored id."""
+        with self.lock:
+            self.fetched_at = 0
+
+    def department_names(self):
+        with self.lock:
+            return list(self.departments) or get_department_mapping()
+
+    def semester_names(self):
+        with self.lock:
+            return list(self.semesters) or get_semester_mapping()
+
+    def department_id(self, name):
+        """Return the portal id for a department name, or None if it is not known yet."""
+        with self.lock:
+            return self.departments.get(name)
+
+    def semester_id(self, name):
+        with self.lock:
+            return self.semesters.get(name)
+
+    def update(self, departments, semesters):
+        """Replace the catalogue with [(name, id)] lists read from the portal."""
+        if not departments or not semesters:
+            return False
+        with self.lock:
+            self.departments = {str(name).strip(): option_id(value) for name, value in departments}
+            self.semesters = {str(name).strip(): option_id(value) for name, value in semesters}
+            self.fetched_at = time.time()
+            self._save()
+        return True
+
+    def refresh(self, profile):
+        """Fetch both lists, over HTTP when the "portal_api" setting allows it, else from a pooled browser."""
+        from session_pool import get_session_pool, load_portal_api_settings
+        if load_portal_api_settings()['enabled']:
+            from portal_client import get_portal_client, FALLBACK_ERRORS
+            try:
+                return self.update(*get_portal_client(profile).fetch_catalogue())
+            except FALLBACK_ERRORS as e:
+                print(f"HTTP catalogue fetch failed, reading the browser page: {e}")
+        from offered_courses import scrape_catalogue
+        with get_session_pool().session(profile) as driver:
+            departments, semesters = scrape_catalogue(driver)
+        return self.update(departments, semesters)
+
+    def refresh_in_background(self, profile, on_done=None):
+        """Refresh on a worker thread if the catalogue is stale; on_done(updated) runs on that thread."""
+        with self.lock:
+            if self.refreshing or not self.is_stale():
+                return False
+            self.refreshing = True
+
+        def run():
+            updated = False
+            try:
+                updated = self.refresh(profile)
+            except Exception as e:
+                print(f"Catalogue refresh failed: {e}")
+            finally:
+                with self.lock:
+                    self.refreshing = False
+            if on_done:
+                on_done(updated)
+
+        threading.Thread(target=run, daemon=True, name="catalogue-refresh").start()
+        return True
+
+
+_catalogue = None
+_catalogue_lock = threading.Lock()
+
+
+def get_catalogue():
+    global _catalogue
+    with _catalogue_lock:
+        if _catalogue is None:
+            _catalogue = Catalogue()
+        return _catalogue
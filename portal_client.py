@@ -0,0 +1,192 @@
+import html
+import re
+import threading
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from session_pool import PORTAL_URL, load_portal_api_settings
+from metrics import get_metrics
+
+
+
+REQUEST_TIMEOUT = 15
+
+# One connection pool shared by every logged-in session
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=1)
+
+
+class PortalClientError(Exception):
+    """Raised when the HTTP fast path cannot answer and Selenium should take over."""
+
+
+# Anything the fast path can raise on a refused request or a payload of the wrong shape;
+# callers fall back to Selenium on these
+FALLBACK_ERRORS = (PortalClientError, requests.RequestException, ValueError, TypeError, KeyError, AttributeError)
+
+
+def _parse_captcha(page):
+    """Return the two captcha numbers from the lblFirstNo/lblSecondNo labels."""
+    numbers = []
+    for label in ("lblFirstNo", "lblSecondNo"):
+        match = re.search(r'id="%s"[^>]*>\s*(\d+)\s*<' % label, page)
+        if not match:
+            raise PortalClientError(f"Captcha label {label} not found on login page")
+        numbers.append(int(match.group(1)))
+    return numbers
+
+
+def _parse_form_action(page, page_url):
+    """Return the absolute URL the login form (the one holding the username field) posts to."""
+    for form in re.findall(r'<form\b[^>]*>.*?</form>', page, re.S | re.I):
+        if 'id="username"' not in form:
+            continue
+        action = re.search(r'action="([^"]*)"', form.split(">", 1)[0])
+        return urljoin(page_url, html.unescape(action.group(1)) if action else page_url)
+    raise PortalClientError("Login form not found on the login page")
+
+
+def _parse_hidden_inputs(page):
+    """Collect hidden form fields (e.g. anti-forgery tokens) from the login page."""
+    fields = {}
+    for tag in re.findall(r'<input[^>]*type="hidden"[^>]*>', page):
+        name = re.search(r'name="([^"]+)"', tag)
+        value = re.search(r'value="([^"]*)"', tag)
+        if name:
+            fields[name.group(1)] = value.group(1) if value else ""
+    return fields
+
+
+def _is_login_page(page):
+    return 'id="lblFirstNo"' in page and 'id="username"' in page
+
+
+def _pick(row, *names):
+    """Return the first non-empty value for any of the given JSON keys."""
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def normalize_course_row(row):
+    """Turn one JSON course record into the same shape as a scraped table row."""
+    seats = _pick(row, "SeatStatus", "seatStatus", "Seats")
+    if seats is None:
+        taken = _pick(row, "TotalStudent", "totalStudent", "Enrolled")
+        capacity = _pick(row, "SeatCapacity", "seatCapacity", "Capacity")
+        seats = f"{taken}/{capacity}" if taken is not None and capacity is not None else ""
+    return {
+        'course': str(_pick(row, "CourseCode", "courseCode") or "").strip(),
+        'section': str(_pick(row, "SectionName", "sectionName", "Section", "section") or "").strip(),
+        'seats': str(seats).strip(),
+    }
+
+
+class PortalClient:
+    """Talks to the portal over plain HTTP, logging in with the same form fields as the web page."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.endpoints = load_portal_api_settings()
+        self.session = requests.Session()
+        self.session.mount("https://", _adapter)
+        self.session.mount("http://", _adapter)
+        self.logged_in = False
+        self.department_ids = {}
+        self.semester_ids = {}
+        self.lock = threading.Lock()
+
+    def login(self):
+        with get_metrics().span('portal.login', via='http'):
+            self._login()
+
+    def _login(self):
+        get_metrics().inc('logins', via='http')
+        response = self.session.get(PORTAL_URL, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        first, second = _parse_captcha(response.text)
+        form = _parse_hidden_inputs(response.text)
+        form.update({
+            'username': self.profile['student_id'],
+            'pass': self.profile['portal_password'],
+            'lblcaptchaAnswer': str(first + second),
+        })
+        action = _parse_form_action(response.text, response.url)
+        response = self.session.post(action, data=form, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        if _is_login_page(response.text):
+            raise PortalClientError("Portal login was rejected")
+        self.logged_in = True
+
+    def _get_json(self, endpoint, params=None):
+        """GET a JSON endpoint, logging in again once if the portal session has expired."""
+        for attempt in range(2):
+            if not self.logged_in:
+                self.login()
+            response = self.session.get(PORTAL_URL + endpoint, params=params, timeout=REQUEST_TIMEOUT)
+            expired = response.status_code in (401, 403) or \
+                "application/json" not in response.headers.get("Content-Type", "")
+            if expired and attempt == 0:
+                get_metrics().inc('retries', reason='relogin')
+                self.logged_in = False
+                continue
+            response.raise_for_status()
+            try:
+                return response.json()
+            except ValueError:
+                raise PortalClientError(f"{endpoint} did not return JSON")
+        raise PortalClientError(f"{endpoint} kept redirecting to the login page")
+
+    def _list_options(self, endpoint):
+        """Return [(name, id)] from a department/semester list endpoint."""
+        options = []
+        for item in self._get_json(endpoint):
+            item_name = _pick(item, "Name", "name", "Title", "title")
+            item_id = _pick(item, "Id", "id", "Value", "value")
+            if item_name is not None and item_id is not None:
+                options.append((str(item_name).strip(), str(item_id)))
+        return options
+
+    def _lookup_id(self, cache, endpoint, name):
+        if name not in cache:
+            cache.update(self._list_options(endpoint))
+        if name not in cache:
+            raise PortalClientError(f"'{name}' not offered by {endpoint}")
+        return cache[name]
+
+    def fetch_catalogue(self):
+        """Return ([(department, id)], [(semester, id)]) as the portal lists them."""
+        with self.lock:
+            departments = self._list_options(self.endpoints['departments'])
+            semesters = self._list_options(self.endpoints['semesters'])
+            self.department_ids.update(departments)
+            self.semester_ids.update(semesters)
+        return departments, semesters
+
+    def fetch_offered_courses(self, department, semester, department_id=None, semester_id=None):
+        """Return the offered-courses rows; ids from the catalogue save the list lookups."""
+        with self.lock:
+            if department_id is None:
+                department_id = self._lookup_id(self.department_ids, self.endpoints['departments'], department)
+            if semester_id is None:
+                semester_id = self._lookup_id(self.semester_ids, self.endpoints['semesters'], semester)
+            data = self._get_json(self.endpoints['offered_courses'],
+                                  params={'departmentId': department_id, 'semesterId': semester_id})
+        if not isinstance(data, list):
+            raise PortalClientError("Unexpected offered-courses payload")
+        return [normalize_course_row(row) for row in data]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_portal_client(profile):
+    """Return the cached HTTP client for a profile, creating it on first use."""
+    key = (profile['student_id'], profile['portal_password'])
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = PortalClient(profile)
+        return client
@@ -0,0 +1,241 @@
+"""
+Predictive alarm mode: spend each profile's daily portal checks where seats tend to open.
+
+For an alarm in this mode the hourly seat history of its section is scanned for openings
+over the last `lookback_days`. An opening is an hour in which a free seat appeared.
+Openings elsewhere in the same department/semester count too, with a lower weight.
+Each opening is weighted by recency and binned by hour of day. The day's check budget is
+then split across the hours: `explore_share` of it is spread evenly so new patterns still
+get noticed, and the rest follows the opening weights. The checks are spaced evenly
+inside each hour.
+
+A day is always planned from midnight, so a caller asking for the check after a moment
+in the past (walle_cli's --due-within window) gets the one it missed. When today is
+planned after it has started, only the part of the budget not yet used is spread over
+what is left of the day.
+"""
+import threading
+from datetime import datetime, timedelta
+import storage
+from seat_history import get_seat_history, HOURLY
+
+
+
+PREDICTIVE = 'predictive'           # Value of alarm['mode'] for this scheduling mode
+
+# Defaults for the "predictive" section of settings
+DEFAULT_PREDICTIVE_SETTINGS = {
+    'daily_budget': 48,             # Portal checks per profile per day, shared by its predictive alarms
+    'lookback_days': 28,
+    'half_life_days': 7,            # An opening this old counts half as much as one today
+    'explore_share': 0.2,           # Part of the budget spread evenly over the day
+    'department_weight': 0.25,      # Share of the weights taken from other sections of the department
+    'min_gap': 5 * 60,              # Seconds between two checks of the same alarm
+}
+
+
+def load_predictive_settings():
+    return storage.load_section("predictive", DEFAULT_PREDICTIVE_SETTINGS)
+
+
+def opening_hours(rollups, now, half_life_days):
+    """Return 24 recency-weighted opening counts by hour of day from hourly rollup dicts."""
+    weights = [0.0] * 24
+    previous = {}
+    for rollup in sorted(rollups, key=lambda r: r['start']):
+        key = (rollup['department'], rollup['semester'], rollup['course'], rollup['section'])
+        before = previous.get(key)
+        previous[key] = rollup
+        if rollup['max_free'] <= 0:
+            continue
+        opened = rollup['min_free'] <= 0 or (
+            before is not None and (before['max_free'] <= 0 or before['start'] < rollup['start'] - 3600))
+        if opened:
+            age_days = max(now.timestamp() - rollup['start'], 0) / 86400
+            weights[datetime.fromtimestamp(rollup['start']).hour] += 0.5 ** (age_days / half_life_days)
+    return weights
+
+
+def _normalized(weights):
+    total = sum(weights)
+    return [w / total for w in weights] if total else None
+
+
+def hourly_weights(alarm, settings, now, history=None):
+    """Return 24 weights summing to 1 for when this alarm's section tends to open."""
+    history = history or get_seat_history()
+    since = (now - timedelta(days=settings['lookback_days'])).timestamp()
+    course_ids = history.find_series(alarm['course'].strip(), alarm['section'].strip(),
+                                     alarm['department'], alarm['semester'])
+    other_ids = set(history.find_department_series(alarm['department'], alarm['semester'])) - set(course_ids)
+    course = _normalized(opening_hours(history.rollups(HOURLY, course_ids, since), now,
+                                       settings['half_life_days'])) if course_ids else None
+    department = _normalized(opening_hours(history.rollups(HOURLY, other_ids, since), now,
+                                           settings['half_life_days'])) if other_ids else None
+    if course and department:
+        share = settings['department_weight']
+        return [c * (1 - share) + d * share for c, d in zip(course, department)]
+    return course or department or [1 / 24] * 24
+
+
+def allocate_checks(weights, hours, budget, explore_share, max_per_hour):
+    """Split `budget` checks over `hours` (hour-of-day numbers). Returns {hour: count}."""
+    if not hours or budget <= 0:
+        return {}
+    total = sum(weights[h] for h in hours)
+    shares = {h: explore_share / len(hours) + (1 - explore_share) * (weights[h] / total if total else 1 / len(hours))
+              for h in hours}
+    budget = min(budget, max_per_hour * len(hours))
+    counts = {h: min(int(budget * shares[h]), max_per_hour) for h in hours}
+    # Hand out what rounding and the per-hour cap left over, largest remainder first
+    by_remainder = sorted(hours, key=lambda h: budget * shares[h] - int(budget * shares[h]), reverse=True)
+    left = budget - sum(counts.values())
+    while left > 0:
+        for h in by_remainder:
+            if left and counts[h] < max_per_hour:
+                counts[h] += 1
+                left -= 1
+    return counts
+
+
+def plan_day(alarm, day, budget, settings, weights):
+    """Return the sorted check datetimes for one alarm over the whole of one day."""
+    repeat = alarm.get('repeat') or []
+    if repeat and day.strftime("%a") not in repeat:
+        return []
+    day_start = datetime.combine(day, datetime.min.time())
+    max_per_hour = max(3600 // settings['min_gap'], 1)
+    counts = allocate_checks(weights, list(range(24)), budget, settings['explore_share'], max_per_hour)
+    checks = []
+    for hour, count in counts.items():
+        hour_start = day_start + timedelta(hours=hour)
+        checks += [hour_start + timedelta(seconds=(i + 0.5) * 3600 / count) for i in range(count)]
+    return sorted(checks)
+
+
+def thin_checks(checks, now, allowed):
+    """Keep every check up to `now` and at most `allowed` of the later ones, evenly picked."""
+    past = [check for check in checks if check <= now]
+    future = [check for check in checks if check > now]
+    if len(future) > allowed:
+        future = [future[i * len(future) // allowed] for i in range(allowed)] if allowed > 0 else []
+    return past + future
+
+
+class CheckBudget:
+    """Counts portal checks per profile per day, stored under the "check_budget" setting."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def used(self, profile, day=None):
+        day = (day or datetime.now().date()).isoformat()
+        entry = storage.get_setting("check_budget", {}).get(profile['student_id'])
+        return entry[1] if entry and entry[0] == day else 0
+
+    def consume(self, profile, limit):
+        """Count one check for the profile today; False (and nothing counted) once `limit` is reached."""
+        day = datetime.now().date().isoformat()
+        with self.lock:
+            budgets = storage.get_setting("check_budget", {})
+            entry = budgets.get(profile['student_id'])
+            used = entry[1] if entry and entry[0] == day else 0
+            if used >= limit:
+                return False
+            budgets[profile['student_id']] = [day, used + 1]
+            storage.update_settings(check_budget=budgets)
+            return True
+
+
+class PredictivePlanner:
+    """Caches each predictive alarm's plan for the day and hands out its next check time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.plans = {}                 # (alarm id, date) -> [datetime]
+        self.weights = {}               # (alarm id, date computed) -> 24 hourly weights
+        self.alarm_counts = {}          # student id -> number of predictive alarms
+        self.budget = CheckBudget()
+
+    def set_alarms(self, alarms):
+        """Tell the planner every saved alarm, so a profile's budget is split between its predictive ones."""
+        counts = {}
+        for alarm in alarms:
+            if alarm.get('mode') == PREDICTIVE:
+                student_id = alarm['profile']['student_id']
+                counts[student_id] = counts.get(student_id, 0) + 1
+        with self.lock:
+            if counts != self.alarm_counts:
+                self.plans.clear()
+            self.alarm_counts = counts
+
+    def _share(self, alarm):
+        with self.lock:
+            return self.alarm_counts.get(alarm['profile']['student_id'], 1)
+
+    def alarm_budget(self, alarm, settings):
+        return max(settings['daily_budget'] // self._share(alarm), 1)
+
+    def remaining_budget(self, alarm, settings):
+        """This alarm's share of what is left of its profile's budget today."""
+        left = settings['daily_budget'] - self.budget.used(alarm['profile'])
+        return max(left, 0) // self._share(alarm)
+
+    def hourly_weights(self, alarm, settings, now):
+        """hourly_weights() for the alarm, computed at most once a day since it reads the history files."""
+        key = (alarm.get('id'), now.date())
+        with self.lock:
+            weights = self.weights.get(key)
+        if weights is None:
+            weights = hourly_weights(alarm, settings, now)
+            with self.lock:
+                self.weights = {k: v for k, v in self.weights.items() if k[1] == now.date()}
+                self.weights[key] = weights
+        return weights
+
+    def next_check(self, alarm, after, now=None):
+        """Next planned check strictly after `after` (which may be in the past), looking up to a week ahead."""
+        settings = load_predictive_settings()
+        now = now or datetime.now()
+        for offset in range(8):
+            day = after.date() + timedelta(days=offset)
+            key = (alarm.get('id'), day)
+            with self.lock:
+                plan = self.plans.get(key)
+            if plan is None:
+                plan = plan_day(alarm, day, self.alarm_budget(alarm, settings), settings,
+                                self.hourly_weights(alarm, settings, now))
+                if day == now.date():
+                    # Today is already under way (a restart or a new day): spread only what is left of the budget
+                    plan = thin_checks(plan, now, self.remaining_budget(alarm, settings))
+                with self.lock:
+                    self.plans = {k: v for k, v in self.plans.items() if k[1] >= after.date()}
+                    self.plans[key] = plan
+            for check in plan:
+                if check > after:
+                    return check
+        return None
+
+    def prepare(self, alarms, on_done):
+        """Plan the alarms on a worker thread, as that reads the history files; on_done() runs there."""
+        def plan_thread():
+            now = datetime.now()
+            for alarm in alarms:
+                try:
+                    self.next_check(alarm, now, now)
+                except Exception as e:
+                    print(f"Predictive planning failed: {e}")
+            on_done()
+
+        threading.Thread(target=plan_thread, daemon=True, name="predictive-plan").start()
+
+    def consume(self, alarm):
+        """Count a check against the alarm's profile; False when today's budget is spent."""
+        return self.budget.consume(alarm['profile'], load_predictive_settings()['daily_budget'])
+
+
+_planner = PredictivePlanner()
+
+
+def get_predictive_planner():
+    return _planner
@@ -0,0 +1,103 @@
+import threading
+import storage
+
+
+
+# Change events passed to listeners
+PROFILE_ADDED = 'added'
+PROFILE_UPDATED = 'updated'
+PROFILE_DELETED = 'deleted'
+
+
+class ProfileRepository:
+    """
+    In-memory copy of the saved profiles, loaded once per process.
+
+    Keeps the next free key and a student ID index, writes single rows through storage,
+    and tells listeners exactly which profile changed so screens can patch one widget.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.profiles = None        # key -> profile, in key order
+        self.by_student_id = {}
+        self.next_key = 1
+        self.listeners = []
+
+    def _ensure_loaded(self):
+        if self.profiles is None:
+            self.profiles = storage.load_profiles()
+            self.by_student_id = {p.get('student_id'): key for key, p in self.profiles.items()}
+            self.next_key = max((int(key) for key in self.profiles), default=0) + 1
+
+    def subscribe(self, callback):
+        """callback(event, key, profile) runs on the thread that made the change."""
+        self.listeners.append(callback)
+
+    def _notify(self, event, key, profile):
+        for callback in list(self.listeners):
+            callback(event, key, profile)
+
+    def items(self):
+        """Return [(key, profile)] in key order."""
+        with self.lock:
+            self._ensure_loaded()
+            return list(self.profiles.items())
+
+    def get(self, key):
+        with self.lock:
+            self._ensure_loaded()
+            return self.profiles.get(key)
+
+    def find_by_student_id(self, student_id):
+        with self.lock:
+            self._ensure_loaded()
+            key = self.by_student_id.get(student_id)
+            return key, self.profiles.get(key)
+
+    def __len__(self):
+        with self.lock:
+            self._ensure_loaded()
+            return len(self.profiles)
+
+    def add(self, profile):
+        """Save a new profile and return its key."""
+        with self.lock:
+            self._ensure_loaded()
+            key = str(self.next_key)
+            storage.upsert_profile(key, profile)
+            self.next_key += 1
+            self.profiles[key] = profile
+            self.by_student_id[profile.get('student_id')] = key
+        self._notify(PROFILE_ADDED, key, profile)
+        return key
+
+    def update(self, key, profile):
+        with self.lock:
+            self._ensure_loaded()
+            storage.upsert_profile(key, profile)
+            old = self.profiles.get(key)
+            if old and self.by_student_id.get(old.get('student_id')) == key:
+                del self.by_student_id[old.get('student_id')]
+            self.profiles[key] = profile
+            self.by_student_id[profile.get('student_id')] = key
+        self._notify(PROFILE_UPDATED, key, profile)
+
+    def delete(self, key):
+        with self.lock:
+            self._ensure_loaded()
+            profile = self.profiles.pop(key, None)
+            if profile is None:
+                return False
+            storage.delete_profile(key)
+            if self.by_student_id.get(profile.get('student_id')) == key:
+                del self.by_student_id[profile.get('student_id')]
+        self._notify(PROFILE_DELETED, key, profile)
+        return True
+
+
+_repository = ProfileRepository()
+
+
+def get_profile_repository():
+    return _repository
@@ -0,0 +1,98 @@
+from kivy.core.image import Image as CoreImage
+from kivy.uix.behaviors import ButtonBehavior
+from kivy.uix.button import Button
+from kivy.uix.dropdown import DropDown
+from kivy.uix.image import Image
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+
+
+
+# Icon textures loaded once and shared by every row that shows them
+_icon_textures = {}
+
+
+def icon_texture(path):
+    texture = _icon_textures.get(path)
+    if texture is None:
+        texture = _icon_textures[path] = CoreImage(path).texture
+    return texture
+
+
+class IconButton(ButtonBehavior, Image):
+    """Button drawn from a shared icon texture instead of loading its own image."""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(allow_stretch=True, keep_ratio=False, **kwargs)
+        self.texture = icon_texture(path)
+
+
+class RecycleList(RecycleView):
+    """
+    Vertical RecycleView with fixed-height rows.
+
+    Only the rows on screen exist as widgets; set .data to a list of dicts and the
+    viewclass fills itself from each dict in refresh_view_attrs.
+    """
+
+    def __init__(self, viewclass, row_height, spacing=0, **kwargs):
+        super().__init__(**kwargs)
+        self.viewclass = viewclass
+        self.row_height = row_height
+        layout = RecycleBoxLayout(orientation='vertical', spacing=spacing, size_hint_y=None,
+                                  default_size=(None, row_height), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+    def index_of(self, field, value):
+        for index, item in enumerate(self.data):
+            if item.get(field) == value:
+                return index
+        return -1
+
+
+class ChoiceRow(RecycleDataViewBehavior, Button):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.item = None
+        self.bind(on_release=lambda x: self.item['choose'](self.item['value']))
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.item = data
+        self.text = data['text']
+
+
+class ChoiceDropDown(DropDown):
+    """DropDown backed by a RecycleList, so long option lists cost a handful of buttons."""
+
+    def __init__(self, choose, row_height=40, max_visible=8, **kwargs):
+        super().__init__(**kwargs)
+        self.choose = choose
+        self.max_visible = max_visible
+        self.choices = RecycleList(ChoiceRow, row_height, size_hint_y=None, height=0)
+        self.choices.data = []
+        self.add_widget(self.choices)
+
+    def _resize(self):
+        self.choices.height = min(len(self.choices.data), self.max_visible) * self.choices.row_height
+
+    def set_choices(self, choices):
+        """Replace the options with [(value, text)]."""
+        self.choices.data = [{'value': value, 'text': text, 'choose': self.choose} for value, text in choices]
+        self._resize()
+
+    def add_choice(self, value, text):
+        self.choices.data.append({'value': value, 'text': text, 'choose': self.choose})
+        self._resize()
+
+    def update_choice(self, value, text):
+        index = self.choices.index_of('value', value)
+        if index >= 0:
+            self.choices.data[index] = {'value': value, 'text': text, 'choose': self.choose}
+
+    def remove_choice(self, value):
+        index = self.choices.index_of('value', value)
+        if index >= 0:
+            del self.choices.data[index]
+            self._resize()
@@ -0,0 +1,122 @@
+import threading
+from collections import namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor
+from snapshot_cache import get_snapshot_cache
+from metrics import get_metrics
+
+
+
+MAX_WORKERS = 4
+
+# An immutable description of one seat check; profile is a private copy of the profile dict.
+# alarm_id names the alarm that started the check, if any.
+SearchRequest = namedtuple(
+    'SearchRequest',
+    ['profile', 'department', 'semester', 'course', 'section', 'auto_email', 'source', 'alarm_id']
+)
+
+
+def make_search_request(profile, department, semester, course, section, auto_email=False, source='manual',
+                        alarm_id=None):
+    return SearchRequest(dict(profile), department, semester, course.strip(), section.strip(), auto_email, source,
+                         alarm_id)
+
+
+def request_key(request):
+    """Identity of a request for duplicate detection (who is checking what)."""
+    return (request.profile['student_id'], request.department, request.semester,
+            request.course, request.section)
+
+
+class SearchEngine:
+    """
+    Runs seat checks on a bounded worker pool and reports back through callbacks.
+
+    Requests for the same profile are queued and run one after another on a single
+    worker, so one portal login is never used by two checks at once. Queued requests
+    for the same department/semester are answered together from one table load.
+    Different profiles run in parallel.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, cache=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="seat-search")
+        self.cache = cache or get_snapshot_cache()
+        self.lock = threading.Lock()
+        self.queues = {}            # student id -> deque of (request, on_result, on_error)
+        self.active_profiles = set()
+        self.pending = set()        # request keys queued or running
+
+    def submit(self, request, on_result, on_error):
+        """
+        Queue a request. Returns False if an identical check is already queued or running.
+
+        on_result(request, result) and on_error(request, exception) are called from a worker thread.
+        """
+        key = request_key(request)
+        profile_key = request.profile['student_id']
+        with self.lock:
+            if key in self.pending:
+                return False
+            self.pending.add(key)
+            self.queues.setdefault(profile_key, deque()).append((request, on_result, on_error))
+            if profile_key in self.active_profiles:
+                return True
+            self.active_profiles.add(profile_key)
+        self.executor.submit(self._drain, profile_key)
+        return True
+
+    def _next_batch(self, profile_key):
+        """Pop the next request plus every queued request for the same table."""
+        with self.lock:
+            queue = self.queues.get(profile_key)
+            if not queue:
+                self.active_profiles.discard(profile_key)
+                self.queues.pop(profile_key, None)
+                return []
+            first = queue.popleft()
+            table = (first[0].department, first[0].semester)
+            batch = [first]
+            for job in list(queue):
+                if (job[0].department, job[0].semester) == table:
+                    queue.remove(job)
+                    batch.append(job)
+            return batch
+
+    def _drain(self, profile_key):
+        while True:
+            batch = self._next_batch(profile_key)
+            if not batch:
+                return
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        first = batch[0][0]
+        metrics = get_metrics()
+        metrics.inc('checks', len(batch), source=first.source)
+        try:
+            with metrics.span('search.check', source=first.source):
+                results = self.cache.search_watches(
+                    first.profile, first.department, first.semester,
+                    [(request.course, request.section) for request, _, _ in batch])
+            hits = sum(1 for result in results if result['available_seats'] and result['available_seats'] > 0)
+            if hits:
+                metrics.inc('hits', hits, source=first.source)
+                # Open seats go fast; whoever checks this table next should see it fresh, not cached
+                self.cache.invalidate(first.department, first.semester)
+        except Exception as e:
+            results = None
+            error = e
+            metrics.inc('failures', len(batch), source=first.source)
+        for index, (request, on_result, on_error) in enumerate(batch):
+            with self.lock:
+                self.pending.discard(request_key(request))
+            try:
+                if results is None:
+                    on_error(request, error)
+                else:
+                    on_result(request, results[index])
+            except Exception as e:
+                print(f"Search callback failed: {e}")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
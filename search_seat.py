@@ -1,127 +1,150 @@
-import json
-import os
 import time
-import threading
-from datetime import datetime, timedelta
 from functools import partial
 from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
-from kivy.uix.dropdown import DropDown
 from kivy.uix.textinput import TextInput
 from kivy.uix.screenmanager import Screen
 from kivy.uix.popup import Popup
 from kivy.uix.label import Label
 from kivy.uix.spinner import Spinner
 from kivy.uix.togglebutton import ToggleButton
-from kivy.uix.scrollview import ScrollView
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from department_mapping import get_department_mapping
-from semester_mapping import get_semester_mapping
-from user_profile_manager import load_profiles
-from auto_email import send_email
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from portal_catalogue import get_catalogue, load_catalogue_settings
+from data_store import load_alarms, save_alarm, delete_alarm, validate_alarm
+from auto_email import warm_gmail_service
+from profile_repository import get_profile_repository, PROFILE_ADDED, PROFILE_UPDATED, PROFILE_DELETED
+from email_outbox import get_outbox, EMAIL_SENT, EMAIL_FAILED
+from session_pool import get_session_pool
+from snapshot_cache import get_snapshot_cache, load_snapshot_settings
+from seat_history import get_seat_history
+from search_engine import SearchEngine, make_search_request
+from alarm_scheduler import AlarmScheduler, ensure_alarm_id
+from predictive_schedule import get_predictive_planner, PREDICTIVE
+from watch_mode import WatchManager
+from recycle_lists import RecycleList, ChoiceDropDown
 
 
 
-
-
-def calculate_available_seats(seat_data):
-    try:
-        current_enrollment, total_capacity = map(int, seat_data.split('/'))
-        return total_capacity - current_enrollment, seat_data
-    except ValueError:
-        return None, None
-
-def get_persistent_dir():
-    """Get platform-specific persistent directory for storing data."""
-    if os.name == "nt":  # Windows
-        base_dir = os.getenv('APPDATA')
-    elif os.name == "posix":  # macOS/Linux
-        base_dir = os.path.expanduser('~/.local/share')
-    else:
-        base_dir = os.path.abspath(".")
-
-    app_dir = os.path.join(base_dir, "Wall-E App")
-    os.makedirs(app_dir, exist_ok=True)
-    return app_dir
-
-def get_file_path(filename):
-    """Get full path to a file in the persistent directory."""
-    return os.path.join(get_persistent_dir(), filename)
+MAX_TIMER_DELAY = 60  # Longest single wait of the alarm timer, in seconds
 
 
 class AlarmManager:
     def __init__(self):
         self.alarms = []
         self.seat_finder = None
+        self.scheduler = AlarmScheduler()
+        self.timer_event = None
         self.load_alarms()
+        self.schedule_all()
 
     def load_alarms(self):
-        """Load alarms from alarms.json in the persistent directory."""
-        self.alarms = []
-        alarms_path = get_file_path("alarms.json")
-        if os.path.exists(alarms_path):
-            try:
-                with open(alarms_path, 'r') as f:
-                    content = f.read()
-                    if content.strip():
-                        raw_alarms = json.loads(content)
-                        self.alarms = [a for a in raw_alarms if self.validate_alarm(a)]
-            except (json.JSONDecodeError, KeyError):
-                with open(alarms_path, 'w') as f:
-                    json.dump([], f)
+        """Load the saved alarms from the database."""
+        self.alarms = load_alarms()
+        for alarm in self.alarms:
+            ensure_alarm_id(alarm)
 
     def validate_alarm(self, alarm):
-        required_keys = ['time', 'course', 'section', 'department', 'semester', 'profile']
-        return all(key in alarm for key in required_keys)
-
-    def save_alarms(self):
-        clean_alarms = []
-        for alarm in self.alarms:
-            clean_alarm = alarm.copy()
-            clean_alarm.pop('clock_event', None)
-            clean_alarms.append(clean_alarm)
-        alarms_path = get_file_path("alarms.json")
-        with open(alarms_path, 'w') as f:
-            json.dump(clean_alarms, f, indent=2)
+        return validate_alarm(alarm)
 
     def add_alarm(self, alarm_data):
+        ensure_alarm_id(alarm_data)
         self.alarms.append(alarm_data)
-        self.save_alarms()
+        save_alarm(alarm_data)
         self.schedule_alarm(alarm_data)
 
     def delete_alarm(self, alarm_data):
         if alarm_data in self.alarms:
-            if 'clock_event' in alarm_data:
-                Clock.unschedule(alarm_data['clock_event'])
+            self.scheduler.cancel(alarm_data.get('id'))
             self.alarms.remove(alarm_data)
-            self.save_alarms()
+            delete_alarm(alarm_data)
+            get_predictive_planner().set_alarms(self.alarms)
+            self.rearm_timer()
+
+    def schedule_all(self):
+        """Schedule every saved alarm, e.g. after a restart."""
+        get_predictive_planner().set_alarms(self.alarms)
+        for alarm in self.alarms:
+            if alarm.get('mode') != PREDICTIVE:
+                self.scheduler.schedule(alarm)
+        self.schedule_predictive([alarm for alarm in self.alarms if alarm.get('mode') == PREDICTIVE])
+        self.rearm_timer()
 
     def schedule_alarm(self, alarm):
-        now = datetime.now()
-        try:
-            target_time = datetime.strptime(alarm['time'], "%H:%M").time()
-            alarm_datetime = datetime.combine(now.date(), target_time)
-            if alarm_datetime < now:
-                alarm_datetime += timedelta(days=1)
-            delay = (alarm_datetime - now).total_seconds()
-            alarm['clock_event'] = Clock.schedule_once(
-                lambda dt: self.trigger_alarm(alarm),
-                delay
-            )
-        except ValueError:
-            pass
+        get_predictive_planner().set_alarms(self.alarms)
+        if alarm.get('mode') == PREDICTIVE:
+            self.schedule_predictive([alarm])
+        else:
+            self.scheduler.schedule(alarm)
+            self.rearm_timer()
+
+    def schedule_predictive(self, alarms):
+        """Plan predictive alarms on a worker thread (planning reads the seat history), then schedule them here."""
+        if alarms:
+            get_predictive_planner().prepare(
+                alarms, lambda: Clock.schedule_once(partial(self.schedule_planned, alarms)))
+
+    def schedule_planned(self, alarms, dt):
+        for alarm in alarms:
+            if alarm in self.alarms:
+                self.scheduler.schedule(alarm)
+        self.rearm_timer()
+
+    def rearm_timer(self):
+        """Keep a single Clock event pointed at the earliest due alarm."""
+        if self.timer_event is not None:
+            self.timer_event.cancel()
+            self.timer_event = None
+        next_due = self.scheduler.next_due()
+        if next_due is not None:
+            # Wake at least once a minute so suspend/resume or clock changes cannot make us late
+            delay = min(max(next_due - time.time(), 0), MAX_TIMER_DELAY)
+            self.timer_event = Clock.schedule_once(self.on_timer, delay)
+
+    def on_timer(self, dt):
+        self.timer_event = None
+        for alarm in self.scheduler.pop_due(time.time()):
+            self.trigger_alarm(alarm)
+            if alarm.get('mode') == PREDICTIVE and alarm in self.alarms:
+                self.schedule_predictive([alarm])
+            elif alarm.get('repeat') and alarm in self.alarms:
+                self.scheduler.schedule(alarm)
+            else:
+                self.delete_alarm(alarm)
+        self.rearm_timer()
 
     def trigger_alarm(self, alarm):
+        if alarm.get('mode') == PREDICTIVE and not get_predictive_planner().consume(alarm):
+            return      # Today's check budget for this profile is spent
         if self.seat_finder:
             self.seat_finder.trigger_auto_search(alarm)
 
 
+class AlarmRow(RecycleDataViewBehavior, BoxLayout):
+    """One recycled row of the alarm list."""
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', **kwargs)
+        self.item = None
+        self.info = Label(halign='left')
+        self.add_widget(self.info)
+        btn_box = BoxLayout(size_hint_x=None, width=150, spacing=5)
+        btn_box.add_widget(Button(text='Delete', size_hint_x=None, width=70,
+                                  on_press=lambda x: self.item['delete'](self.item['alarm'])))
+        self.add_widget(btn_box)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.item = data
+        alarm = data['alarm']
+        if alarm.get('mode') == PREDICTIVE:
+            days_str = ', '.join(alarm.get('repeat', [])) or 'Daily'
+            self.info.text = f"Predictive ({days_str})"
+        else:
+            days_str = ', '.join(alarm.get('repeat', [])) or 'Once'
+            self.info.text = f"{alarm['time']} ({days_str})"
+
+
 class TimerPopup(Popup):
     def __init__(self, seat_finder, **kwargs):
         super().__init__(**kwargs)
@@ -130,13 +153,10 @@ class TimerPopup(Popup):
         self.title = "Manage Alarms"
         self.size_hint = (0.9, 0.7)
         main_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        scroll = ScrollView()
-        self.alarm_list = GridLayout(cols=1, spacing=5, size_hint_y=None)
-        self.alarm_list.bind(minimum_height=self.alarm_list.setter('height'))
+        self.alarm_list = RecycleList(AlarmRow, 40, spacing=5)
         self.refresh_alarm_list()
-        scroll.add_widget(self.alarm_list)
         main_layout.add_widget(Label(text="Active Alarms:", size_hint_y=None, height=30))
-        main_layout.add_widget(scroll)
+        main_layout.add_widget(self.alarm_list)
         main_layout.add_widget(Label(text="Add New Alarm:", size_hint_y=None, height=30))
         time_grid = GridLayout(cols=4, spacing=10, size_hint_y=None, height=50)
         self.hour_spinner = Spinner(text='08', values=[f"{i:02d}" for i in range(1, 13)], size_hint=(None, None),
@@ -157,6 +177,10 @@ class TimerPopup(Popup):
             days_grid.add_widget(btn)
         main_layout.add_widget(Label(text="Repeat Days:", size_hint_y=None, height=30))
         main_layout.add_widget(days_grid)
+        # Predictive alarms ignore the time above and check when seats have opened before
+        self.predictive_toggle = ToggleButton(text="Predictive: check when seats usually open",
+                                              size_hint_y=None, height=40)
+        main_layout.add_widget(self.predictive_toggle)
         btn_layout = GridLayout(cols=2, spacing=10, size_hint_y=None, height=50)
         btn_layout.add_widget(Button(text='Add Alarm', on_press=self.add_alarm))
         btn_layout.add_widget(Button(text='Close', on_press=self.dismiss))
@@ -164,17 +188,7 @@ class TimerPopup(Popup):
         self.content = main_layout
 
     def refresh_alarm_list(self):
-        self.alarm_list.clear_widgets()
-        for alarm in self.alarm_manager.alarms:
-            item = BoxLayout(orientation='horizontal', size_hint_y=None, height=40)
-            time_str = alarm['time']
-            days_str = ', '.join(alarm.get('repeat', [])) or 'Once'
-            item.add_widget(Label(text=f"{time_str} ({days_str})", halign='left'))
-            btn_box = BoxLayout(size_hint_x=None, width=150, spacing=5)
-            btn_box.add_widget(
-                Button(text='Delete', size_hint_x=None, width=70, on_press=lambda x, a=alarm: self.delete_alarm(a)))
-            item.add_widget(btn_box)
-            self.alarm_list.add_widget(item)
+        self.alarm_list.data = [{'alarm': alarm, 'delete': self.delete_alarm} for alarm in self.alarm_manager.alarms]
 
     def add_alarm(self, instance):
         try:
@@ -196,6 +210,8 @@ class TimerPopup(Popup):
                 'semester': self.seat_finder.selected_semester,
                 'profile': self.seat_finder.selected_profile
             }
+            if self.predictive_toggle.state == 'down':
+                alarm_data['mode'] = PREDICTIVE
             self.alarm_manager.add_alarm(alarm_data)
             self.refresh_alarm_list()
         except Exception as e:
@@ -211,12 +227,20 @@ class SeatFinderScreen(Screen):
         super().__init__(**kwargs)
 
         self.auto_email_enabled = False
+        self.selected_profile_key = None
         self.layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
 
         self.create_ui()
         self.alarm_manager = AlarmManager()
         self.alarm_manager.seat_finder = self
-        self.search_active = False
+        self.search_engine = SearchEngine()
+        self.watch_manager = WatchManager(self.search_engine)
+        self.emailed_openings = set()
+        get_outbox().subscribe(self.on_outbox_event)
+        get_profile_repository().subscribe(self.on_profile_changed)
+        get_session_pool().start_pruning()
+        if load_snapshot_settings()['warm_up_on_start']:
+            get_snapshot_cache().warm_up(self.alarm_manager.alarms)
 
         def on_enter(self):
             """Refresh dropdowns when the screen becomes active"""
@@ -224,15 +248,15 @@ class SeatFinderScreen(Screen):
 
     def create_ui(self):
         self.layout.add_widget(Label(text="Seat Finder", font_size=24, size_hint_y=None, height=50))
-        self.profile_dropdown = DropDown()
+        self.profile_dropdown = ChoiceDropDown(self.choose_profile)
         self.profile_button = Button(text="Select Profile", size_hint_y=None, height=40)
         self.profile_button.bind(on_release=self.profile_dropdown.open)
         self.layout.add_widget(self.profile_button)
-        self.department_dropdown = DropDown()
+        self.department_dropdown = ChoiceDropDown(self.select_department)
         self.department_button = Button(text="Select Department", size_hint_y=None, height=40)
         self.department_button.bind(on_release=self.department_dropdown.open)
         self.layout.add_widget(self.department_button)
-        self.semester_dropdown = DropDown()
+        self.semester_dropdown = ChoiceDropDown(self.select_semester)
         self.semester_button = Button(text="Select Semester", size_hint_y=None, height=40)
         self.semester_button.bind(on_release=self.semester_dropdown.open)
         self.layout.add_widget(self.semester_button)
@@ -246,6 +270,9 @@ class SeatFinderScreen(Screen):
         self.timer_button = Button(text="Set Timer", size_hint_y=None, height=40)
         self.timer_button.bind(on_press=self.show_timer_popup)
         self.layout.add_widget(self.timer_button)
+        self.watch_button = Button(text="Watch Until Found", size_hint_y=None, height=40)
+        self.watch_button.bind(on_press=self.toggle_watch)
+        self.layout.add_widget(self.watch_button)
         self.search_button = Button(text="Search Now", size_hint_y=None, height=40)
         self.search_button.bind(on_press=self.start_search)
         self.layout.add_widget(self.search_button)
@@ -256,27 +283,47 @@ class SeatFinderScreen(Screen):
         self.load_dropdowns()
 
     def load_dropdowns(self):
-        profiles = load_profiles()
-        self.profile_dropdown.clear_widgets()
-        for profile in profiles.values():
-            btn = Button(text=profile['student_name'], size_hint_y=None, height=40)
-            btn.bind(on_release=lambda x, p=profile: self.select_profile(p))
-            self.profile_dropdown.add_widget(btn)
-        self.department_dropdown.clear_widgets()
-        for dept in get_department_mapping():
-            btn = Button(text=dept, size_hint_y=None, height=40)
-            btn.bind(on_release=lambda x, d=dept: self.select_department(d))
-            self.department_dropdown.add_widget(btn)
-        self.semester_dropdown.clear_widgets()
-        for sem in get_semester_mapping():
-            btn = Button(text=sem, size_hint_y=None, height=40)
-            btn.bind(on_release=lambda x, s=sem: self.select_semester(s))
-            self.semester_dropdown.add_widget(btn)
-
-    def select_profile(self, profile):
+        self.profile_dropdown.set_choices(
+            (key, profile['student_name']) for key, profile in get_profile_repository().items())
+        self.load_catalogue_dropdowns()
+
+    def load_catalogue_dropdowns(self, *args):
+        """Department and semester names from the portal catalogue (built-in lists until it is fetched)."""
+        catalogue = get_catalogue()
+        self.department_dropdown.set_choices((dept, dept) for dept in catalogue.department_names())
+        self.semester_dropdown.set_choices((sem, sem) for sem in catalogue.semester_names())
+
+    def on_profile_changed(self, event, key, profile):
+        """Patch the one dropdown entry that changed."""
+        if event == PROFILE_ADDED:
+            self.profile_dropdown.add_choice(key, profile['student_name'])
+        elif event == PROFILE_UPDATED:
+            self.profile_dropdown.update_choice(key, profile['student_name'])
+            if self.selected_profile_key == key:
+                self.selected_profile = profile
+                self.profile_button.text = profile['student_name']
+        elif event == PROFILE_DELETED:
+            self.profile_dropdown.remove_choice(key)
+            if self.selected_profile_key == key:
+                del self.selected_profile
+                self.selected_profile_key = None
+                self.profile_button.text = "Select Profile"
+
+    def choose_profile(self, key):
+        self.select_profile(get_profile_repository().get(key), key)
+
+    def select_profile(self, profile, key=None):
         self.selected_profile = profile
+        self.selected_profile_key = key
         self.profile_button.text = profile['student_name']
         self.profile_dropdown.dismiss()
+        if self.auto_email_enabled:
+            warm_gmail_service(profile['student_email'])
+        # Opt-in: picking a profile is not a request to log in, so by default the catalogue
+        # is refreshed by the next seat check instead
+        if load_catalogue_settings()['refresh_on_profile_select']:
+            get_catalogue().refresh_in_background(
+                profile, lambda updated: updated and Clock.schedule_once(self.load_catalogue_dropdowns))
 
     def select_department(self, department):
         self.selected_department = department
@@ -291,6 +338,9 @@ class SeatFinderScreen(Screen):
     def toggle_auto_email(self, instance):
         self.auto_email_enabled = not self.auto_email_enabled
         instance.text = f"Auto Email: {'ON' if self.auto_email_enabled else 'OFF'}"
+        if self.auto_email_enabled and hasattr(self, 'selected_profile'):
+            # Authorise and build the Gmail service now, not when a seat opens
+            warm_gmail_service(self.selected_profile['student_email'])
 
     def show_timer_popup(self, instance):
         if self.validate_fields():
@@ -311,113 +361,109 @@ class SeatFinderScreen(Screen):
         if not self.validate_fields():
             self.show_popup("Error", "Please fill all fields!")
             return
-        if self.search_active:
+        request = make_search_request(
+            self.selected_profile, self.selected_department, self.selected_semester,
+            self.course_input.text, self.section_input.text, self.auto_email_enabled)
+        if not self.search_engine.submit(request, self.on_search_result, self.on_search_error):
             self.show_popup("Info", "Search already in progress!")
-            return
 
-        self.search_active = True
-        threading.Thread(target=self.perform_search_thread, daemon=True).start()
-
-    def perform_search_thread(self):
-        try:
-            driver = webdriver.Chrome()
-            driver.get("https://portal.ewubd.edu/")
-            WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "username")))
-            driver.find_element(By.ID, "username").send_keys(self.selected_profile['student_id'])
-            driver.find_element(By.ID, "pass").send_keys(self.selected_profile['portal_password'])
-            first = int(driver.find_element(By.ID, "lblFirstNo").text)
-            second = int(driver.find_element(By.ID, "lblSecondNo").text)
-            driver.find_element(By.ID, "lblcaptchaAnswer").send_keys(str(first + second))
-            driver.find_element(By.ID, "submit").click()
-            WebDriverWait(driver, 15).until(
-                EC.element_to_be_clickable((By.XPATH, "//a[.//strong[text()='Offered Courses']]"))).click()
-            time.sleep(2)
-            Select(driver.find_element(By.XPATH, "//select[@data-ng-model='filterDepartmentId']")) \
-                .select_by_visible_text(self.selected_department)
-            Select(driver.find_element(By.XPATH, "//select[@data-ng-model='filterSemesterId']")) \
-                .select_by_visible_text(self.selected_semester)
-            driver.find_element(By.XPATH, "//a[contains(text(), 'Show Offered Courses')]").click()
-            time.sleep(3)
-            seats_found = False
-            seat_info = ""
-            for row in driver.find_elements(By.XPATH, "//tbody/tr"):
-                cells = row.find_elements(By.TAG_NAME, "td")
-                if len(cells) >= 6 and cells[0].text.strip() == self.course_input.text.strip() \
-                        and cells[1].text.strip() == self.section_input.text.strip():
-                    seats = cells[5].text.strip()
-                    available_seats, _ = calculate_available_seats(seats)
-                    if available_seats and available_seats > 0:
-                        seats_found = True
-                        seat_info = f"Found seats: {seats}"
-                        Clock.schedule_once(partial(self.handle_success, seat_info))
-                        if self.auto_email_enabled:
-                            self.send_email()
-                    break
-            if not seats_found:
-                seat_info = "No available seats found"
-                Clock.schedule_once(partial(self.show_popup, "Result", seat_info))
-        except Exception as e:
-            Clock.schedule_once(partial(self.show_popup, "Error", f"Search failed: {str(e)}"))
-        finally:
-            self.search_active = False
-            if 'driver' in locals():
-                driver.quit()
-
-    def handle_success(self, seat_info, dt):
+    def on_search_result(self, request, result):
+        """Called from a search worker with the result for one request."""
+        if result['available_seats'] and result['available_seats'] > 0:
+            seat_info = f"Found seats: {result['seats']}"
+            if result['opened_at']:
+                minutes = int((time.time() - result['opened_at']) // 60)
+                seat_info += f" (open for {minutes} min)" if minutes else " (just opened)"
+            Clock.schedule_once(partial(self.handle_success, request, seat_info))
+            # Email the advisor once per opening, not on every check that sees the same free seat
+            opening = (request.profile['student_id'], request.course, request.section, result['opened_at'])
+            if request.auto_email and (result['opened_at'] is None or opening not in self.emailed_openings):
+                self.emailed_openings.add(opening)
+                self.send_email(request)
+        elif not self.is_predictive_check(request):
+            # A predictive alarm checks many times a day; only its hits are worth a popup
+            seat_info = "No available seats found"
+            last_open = get_seat_history().last_free_seat(request.course, request.section,
+                                                          request.department, request.semester)
+            if last_open:
+                seat_info += f"\nLast free seat seen {time.strftime('%d %b %H:%M', time.localtime(last_open))}"
+            Clock.schedule_once(partial(self.show_popup, "Result", seat_info))
+
+    def is_predictive_check(self, request):
+        return request.source == 'alarm' and any(
+            alarm.get('id') == request.alarm_id and alarm.get('mode') == PREDICTIVE
+            for alarm in self.alarm_manager.alarms)
+
+    def on_search_error(self, request, error):
+        Clock.schedule_once(partial(self.show_popup, "Error", f"Search failed: {str(error)}"))
+
+    def handle_success(self, request, seat_info, dt):
         if seat_info:  # Add this check
             self.show_popup("Success", seat_info)
-            self.clear_all_alarms()
+            self.clear_alarms_for(request)
             self.reset_fields()
         else:
             self.show_popup("Error", "No seat information found.")
 
-    def clear_all_alarms(self):
+    def clear_alarms_for(self, request):
+        """Delete the alarm behind the request and any other alarm watching the same profile and section."""
         for alarm in self.alarm_manager.alarms[:]:
-            if 'clock_event' in alarm:
-                Clock.unschedule(alarm['clock_event'])
-            self.alarm_manager.delete_alarm(alarm)
-        self.alarm_manager.save_alarms()
+            same_section = (alarm['profile']['student_id'] == request.profile['student_id']
+                            and alarm['department'] == request.department
+                            and alarm['semester'] == request.semester
+                            and alarm['course'].strip() == request.course
+                            and alarm['section'].strip() == request.section)
+            if same_section or (request.alarm_id is not None and alarm.get('id') == request.alarm_id):
+                self.alarm_manager.delete_alarm(alarm)
 
     def reset_fields(self):
         self.course_input.text = ""
         self.section_input.text = ""
 
+    def toggle_watch(self, instance):
+        """Start polling the selected course/section until a seat opens, or stop that watch."""
+        if not self.validate_fields():
+            self.show_popup("Error", "Please fill all fields first!")
+            return
+        request = make_search_request(
+            self.selected_profile, self.selected_department, self.selected_semester,
+            self.course_input.text, self.section_input.text, self.auto_email_enabled, source='watch')
+        if self.watch_manager.stop(request):
+            self.show_popup("Watch", f"Stopped watching {request.course} section {request.section}.")
+        elif self.watch_manager.start(request, self.on_search_result, self.on_watch_finished):
+            self.show_popup("Watch", f"Watching {request.course} section {request.section} until a seat opens.")
+
+    def on_watch_finished(self, request, reason):
+        if reason == 'deadline':
+            message = f"Stopped watching {request.course} section {request.section}: deadline reached."
+            Clock.schedule_once(partial(self.show_popup, "Watch", message))
+
     def trigger_auto_search(self, alarm):
-        if not self.search_active:
-            self.search_active = True
-            threading.Thread(target=partial(self.auto_search_thread, alarm), daemon=True).start()
+        request = make_search_request(
+            alarm['profile'], alarm['department'], alarm['semester'],
+            alarm['course'], alarm['section'], self.auto_email_enabled, source='alarm', alarm_id=alarm.get('id'))
+        self.search_engine.submit(request, self.on_search_result, self.on_search_error)
 
-    def auto_search_thread(self, alarm):
+    def send_email(self, request):
+        """Queue the advisor email; the outbox keeps retrying it until Gmail accepts it."""
         try:
-            self.selected_profile = alarm['profile']
-            self.selected_department = alarm['department']
-            self.selected_semester = alarm['semester']
-            self.course_input.text = alarm['course']
-            self.section_input.text = alarm['section']
-            result = self.perform_search_thread()
-            if result and "available" in result.lower():
-                Clock.schedule_once(partial(self.handle_success, result))
+            get_outbox().enqueue(
+                request.profile['student_name'],
+                request.profile['student_email'],
+                request.profile['advisor_email'],
+                request.course,
+                request.section,
+                request.profile['student_id']
+            )
         except Exception as e:
-            Clock.schedule_once(partial(self.show_popup, "Error", str(e)))
-        finally:
-            self.search_active = False
-
-    def send_email(self):
-        def email_thread():
-            try:
-                send_email(
-                    self.selected_profile['student_name'],
-                    self.selected_profile['student_email'],
-                    self.selected_profile['advisor_email'],
-                    self.course_input.text,
-                    self.section_input.text,
-                    self.selected_profile['student_id']
-                )
-                Clock.schedule_once(lambda dt: self.show_popup("Email Sent", "Notification sent!"))
-            except Exception as e:
-                Clock.schedule_once(lambda dt: self.show_popup("Email Failed", str(e)))
-
-        threading.Thread(target=email_thread, daemon=True).start()
+            Clock.schedule_once(lambda dt: self.show_popup("Email Failed", str(e)))
+
+    def on_outbox_event(self, event, message, error):
+        if event == EMAIL_SENT:
+            Clock.schedule_once(lambda dt: self.show_popup("Email Sent", "Notification sent!"))
+        elif event == EMAIL_FAILED:
+            Clock.schedule_once(lambda dt: self.show_popup(
+                "Email Failed", f"{message['course']} section {message['section']}: {error}"))
 
     def show_popup(self, title, message, dt=None):
         content = BoxLayout(orientation='vertical', spacing=10)
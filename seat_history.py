@@ -0,0 +1,307 @@
+"""
+Append-only history of observed seat counts.
+
+Every fetched offered-courses table adds one fixed-width record per section to
+history/raw-YYYYMMDD.bin. The records are also rolled up per local hour into
+hourly-YYYYMM.bin and per local day into daily-YYYY.bin once each bucket closes. Raw
+records are kept for RAW_RETENTION_DAYS and hourly rollups for HOURLY_RETENTION_DAYS.
+Daily rollups are kept indefinitely.
+
+series.json maps each (department, semester, course, section) to the small integer id used
+in the records. It also holds the last time each section had a free seat, so that question
+is answered without reading the logs. Buckets still open when the app exits are rebuilt
+from the raw log on the next start. That replay runs on a background thread, so creating
+the history is cheap; reads and writes wait until it is done.
+"""
+import json
+import os
+import struct
+import threading
+import time
+from datetime import date, datetime, timedelta
+from app_paths import get_file_path
+
+
+
+HISTORY_DIR = "history"
+SERIES_FILE = "series.json"
+RAW_RETENTION_DAYS = 30
+HOURLY_RETENTION_DAYS = 400
+READ_CHUNK = 4096                   # Records read per file read
+
+# at, series id, enrolled, capacity
+RAW_RECORD = struct.Struct('<IIhh')
+# bucket start, series id, samples, samples with a free seat, min free, max free, last free-seat time
+ROLLUP_RECORD = struct.Struct('<IIHHhhI')
+
+HOURLY = 'hourly'
+DAILY = 'daily'
+
+
+def parse_seats(seats):
+    """'enrolled/capacity' -> (enrolled, capacity), or None."""
+    try:
+        enrolled, capacity = map(int, seats.split('/'))
+        return enrolled, capacity
+    except (ValueError, AttributeError):
+        return None
+
+
+def hour_start(at):
+    return int(time.mktime(datetime.fromtimestamp(at).replace(minute=0, second=0, microsecond=0).timetuple()))
+
+
+def day_start(at):
+    return int(time.mktime(date.fromtimestamp(at).timetuple()))
+
+
+def _read_records(path, record):
+    """Yield unpacked records from a file without loading it whole."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(record.size * READ_CHUNK)
+            if not chunk:
+                return
+            chunk = chunk[:len(chunk) - len(chunk) % record.size]  # Ignore a torn final record
+            yield from record.iter_unpack(chunk)
+
+
+class _Bucket:
+    __slots__ = ('samples', 'open_samples', 'min_free', 'max_free', 'last_open')
+
+    def __init__(self):
+        self.samples = 0
+        self.open_samples = 0
+        self.min_free = None
+        self.max_free = None
+        self.last_open = 0
+
+    def add(self, at, free):
+        self.samples += 1
+        self.min_free = free if self.min_free is None else min(self.min_free, free)
+        self.max_free = free if self.max_free is None else max(self.max_free, free)
+        if free > 0:
+            self.open_samples += 1
+            self.last_open = max(self.last_open, at)
+
+    def pack(self, start, series_id):
+        return ROLLUP_RECORD.pack(start, series_id, min(self.samples, 0xFFFF), min(self.open_samples, 0xFFFF),
+                                  self.min_free, self.max_free, self.last_open)
+
+
+def _rollup_dict(series, start, series_id, samples, open_samples, min_free, max_free, last_open):
+    department, semester, course, section = series[series_id]['key']
+    return {'start': start, 'department': department, 'semester': semester, 'course': course,
+            'section': section, 'samples': samples, 'open_samples': open_samples,
+            'min_free': min_free, 'max_free': max_free, 'last_open': last_open or None}
+
+
+class SeatHistory:
+    def __init__(self, directory=None):
+        self.directory = directory or get_file_path(HISTORY_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.series = []                # id -> {'key': [dept, sem, course, section], 'last_open', 'last_seen'}
+        self.series_ids = {}            # (dept, sem, course, section) -> id
+        self.hourly_until = 0           # Rollup files are complete before these times
+        self.daily_until = 0
+        self.hour_buckets = {}          # (hour start, id) -> _Bucket
+        self.day_buckets = {}           # (day start, id) -> _Bucket
+        self.ready = threading.Event()  # Set once the index is loaded and open buckets replayed
+        threading.Thread(target=self._start, daemon=True, name="seat-history-replay").start()
+
+    # Files
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _raw_path(self, at):
+        return self._path(datetime.fromtimestamp(at).strftime("raw-%Y%m%d.bin"))
+
+    def _rollup_path(self, period, start):
+        pattern = "hourly-%Y%m.bin" if period == HOURLY else "daily-%Y.bin"
+        return self._path(datetime.fromtimestamp(start).strftime(pattern))
+
+    def _start(self):
+        try:
+            with self.lock:
+                self._load()
+                self._replay()
+        except Exception as e:
+            print(f"Seat history replay failed: {e}")
+        finally:
+            self.ready.set()
+
+    def _load(self):
+        path = self._path(SERIES_FILE)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    stored = json.load(f)
+                self.series = stored['series']
+                self.hourly_until = stored['hourly_until']
+                self.daily_until = stored['daily_until']
+            except (json.JSONDecodeError, IOError, KeyError) as e:
+                print(f"Could not read seat history index: {e}")
+        self.series_ids = {tuple(entry['key']): series_id for series_id, entry in enumerate(self.series)}
+
+    def _save(self):
+        path = self._path(SERIES_FILE)
+        with open(path + ".tmp", 'w') as f:
+            json.dump({'series': self.series, 'hourly_until': self.hourly_until,
+                       'daily_until': self.daily_until}, f)
+        os.replace(path + ".tmp", path)
+
+    def _replay(self):
+        """Rebuild the buckets that were still open when the process last stopped."""
+        since = min(self.hourly_until, self.daily_until)
+        if not since:
+            return
+        day = date.fromtimestamp(max(since, time.time() - RAW_RETENTION_DAYS * 86400))
+        while day <= date.today():
+            path = self._path(day.strftime("raw-%Y%m%d.bin"))
+            for at, series_id, enrolled, capacity in _read_records(path, RAW_RECORD):
+                if at >= since and series_id < len(self.series):
+                    self._aggregate(at, series_id, capacity - enrolled)
+            day += timedelta(days=1)
+
+    # Writing
+    def _series_id(self, key):
+        series_id = self.series_ids.get(key)
+        if series_id is None:
+            series_id = self.series_ids[key] = len(self.series)
+            self.series.append({'key': list(key), 'last_open': None, 'last_seen': None})
+        return series_id
+
+    def _aggregate(self, at, series_id, free):
+        if at >= self.hourly_until:
+            self.hour_buckets.setdefault((hour_start(at), series_id), _Bucket()).add(at, free)
+        if at >= self.daily_until:
+            self.day_buckets.setdefault((day_start(at), series_id), _Bucket()).add(at, free)
+        entry = self.series[series_id]
+        entry['last_seen'] = max(entry['last_seen'] or 0, at)
+        if free > 0:
+            entry['last_open'] = max(entry['last_open'] or 0, at)
+
+    def _flush_buckets(self, period, buckets, before):
+        """Append every bucket that started before `before` to its rollup file."""
+        closed = sorted(key for key in buckets if key[0] < before)
+        by_path = {}
+        for start, series_id in closed:
+            data = buckets.pop((start, series_id)).pack(start, series_id)
+            by_path.setdefault(self._rollup_path(period, start), []).append(data)
+        for path, records in by_path.items():
+            with open(path, 'ab') as f:
+                f.write(b"".join(records))
+        return bool(closed)
+
+    def record_table(self, department, semester, table, at=None):
+        """Append one record per row of an offered-courses table."""
+        at = int(at or time.time())
+        self.ready.wait()
+        with self.lock:
+            new_series = len(self.series)
+            records = []
+            for row in table:
+                seats = parse_seats(row['seats'])
+                if seats is None:
+                    continue
+                series_id = self._series_id((department, semester, row['course'], row['section']))
+                records.append(RAW_RECORD.pack(at, series_id, *seats))
+                self._aggregate(at, series_id, seats[1] - seats[0])
+            if records:
+                with open(self._raw_path(at), 'ab') as f:
+                    f.write(b"".join(records))
+
+            changed = len(self.series) != new_series
+            current_hour, current_day = hour_start(at), day_start(at)
+            if self._flush_buckets(HOURLY, self.hour_buckets, current_hour):
+                self.hourly_until = current_hour
+                changed = True
+            if self._flush_buckets(DAILY, self.day_buckets, current_day):
+                self.daily_until = current_day
+                self.prune(at)
+                changed = True
+            if changed:
+                self._save()
+            if not self.hourly_until:
+                # First records ever: rollups start here
+                self.hourly_until = current_hour
+                self.daily_until = current_day
+                self._save()
+        return len(records)
+
+    def prune(self, now=None):
+        """Delete raw and hourly files that are past their retention."""
+        now = now or time.time()
+        raw_cutoff = (date.fromtimestamp(now) - timedelta(days=RAW_RETENTION_DAYS)).strftime("raw-%Y%m%d.bin")
+        hourly_cutoff = (date.fromtimestamp(now) - timedelta(days=HOURLY_RETENTION_DAYS)).strftime("hourly-%Y%m.bin")
+        for name in os.listdir(self.directory):
+            if (name.startswith("raw-") and name < raw_cutoff) or \
+                    (name.startswith("hourly-") and name < hourly_cutoff):
+                try:
+                    os.remove(self._path(name))
+                except OSError as e:
+                    print(f"Could not remove {name}: {e}")
+
+    # Queries
+    def find_series(self, course, section, department=None, semester=None):
+        """Return the ids of every recorded series for a course section."""
+        self.ready.wait()
+        with self.lock:
+            return [series_id for series_id, entry in enumerate(self.series)
+                    if entry['key'][2] == course and entry['key'][3] == section
+                    and department in (None, entry['key'][0]) and semester in (None, entry['key'][1])]
+
+    def find_department_series(self, department, semester):
+        """Return the ids of every recorded section in a department/semester table."""
+        self.ready.wait()
+        with self.lock:
+            return [series_id for series_id, entry in enumerate(self.series)
+                    if entry['key'][0] == department and entry['key'][1] == semester]
+
+    def last_free_seat(self, course, section, department=None, semester=None):
+        """Return when the section was last seen with a free seat, or None."""
+        ids = self.find_series(course.strip(), section.strip(), department, semester)
+        with self.lock:
+            times = [self.series[series_id]['last_open'] for series_id in ids if self.series[series_id]['last_open']]
+        return max(times) if times else None
+
+    def rollups(self, period, series_ids, since, until=None):
+        """Yield rollup dicts for the given series between since and until, oldest file first."""
+        self.ready.wait()
+        until = until or time.time()
+        wanted = set(series_ids)
+        buckets = self.hour_buckets if period == HOURLY else self.day_buckets
+        step = timedelta(days=28) if period == HOURLY else timedelta(days=365)
+        paths = []
+        day = date.fromtimestamp(since)
+        while day <= date.fromtimestamp(until) + step:
+            path = self._rollup_path(period, time.mktime(day.timetuple()))
+            if path not in paths:
+                paths.append(path)
+            day += step
+        for path in paths:
+            for values in _read_records(path, ROLLUP_RECORD):
+                if values[1] in wanted and since <= values[0] <= until:
+                    yield _rollup_dict(self.series, *values)
+        with self.lock:
+            still_open = [(key, bucket) for key, bucket in buckets.items() if key[1] in wanted]
+        for (start, series_id), bucket in sorted(still_open):
+            if since <= start <= until:
+                yield _rollup_dict(self.series, start, series_id, bucket.samples, bucket.open_samples,
+                                   bucket.min_free, bucket.max_free, bucket.last_open)
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_seat_history():
+    """Return the process-wide seat history. Cheap to call on the UI thread; see SeatHistory.ready."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = SeatHistory()
+        return _history
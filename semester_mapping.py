@@ -1,6 +1,7 @@
 def get_semester_mapping():
     """
-    Returns a list of unique semester names to be displayed in the dropdown menu.
+    Returns a list of unique semester names to be displayed in the dropdown menu
+    until the portal catalogue (portal_catalogue.py) has been fetched.
     """
     return [
         "Summer-2025","Spring-2025", "Fall-2024", "Summer-2024", "Spring-2024",
@@ -0,0 +1,212 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from metrics import get_metrics
+from storage import load_section
+
+
+
+# Set WALLE_PORTAL_URL to point the app at another portal, e.g. benchmarks/mock_portal.py
+PORTAL_URL_ENV = "WALLE_PORTAL_URL"
+PORTAL_URL = os.getenv(PORTAL_URL_ENV, "https://portal.ewubd.edu/").rstrip("/") + "/"
+
+# The portal's JSON endpoints used by portal_client.py. These paths and the JSON field names
+# are a best guess at what the Angular Offered Courses view calls, not checked against the
+# live portal, so the HTTP fast path stays off until "enabled" is set in the "portal_api" settings.
+DEFAULT_PORTAL_API_SETTINGS = {
+    'enabled': False,
+    'departments': "api/Common/GetDepartments",
+    'semesters': "api/Common/GetSemesters",
+    'offered_courses': "api/Course/GetOfferedCourses",
+}
+
+# Pool limits
+MAX_USES_PER_SESSION = 25       # Recycle a browser after this many searches
+MAX_SESSION_AGE = 30 * 60       # Recycle a browser after 30 minutes
+MAX_IDLE_TIME = 10 * 60         # Close a browser left unused for 10 minutes
+PRUNE_INTERVAL = 60             # Seconds between prune() runs of the pruning thread
+
+
+def load_portal_api_settings():
+    return load_section("portal_api", DEFAULT_PORTAL_API_SETTINGS)
+
+
+def portal_login(driver, profile):
+    """Log in to the portal, solving the sum captcha on the login form."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    get_metrics().inc('logins', via='browser')
+    driver.get(PORTAL_URL)
+    WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "username")))
+    driver.find_element(By.ID, "username").send_keys(profile['student_id'])
+    driver.find_element(By.ID, "pass").send_keys(profile['portal_password'])
+    first = int(driver.find_element(By.ID, "lblFirstNo").text)
+    second = int(driver.find_element(By.ID, "lblSecondNo").text)
+    driver.find_element(By.ID, "lblcaptchaAnswer").send_keys(str(first + second))
+    driver.find_element(By.ID, "submit").click()
+
+
+def _dead_driver_errors():
+    """What a WebDriver call raises when Chrome or chromedriver has gone away."""
+    from selenium.common.exceptions import WebDriverException
+    from urllib3.exceptions import HTTPError
+    # A dead chromedriver refuses the connection: urllib3 errors or ConnectionError (an OSError)
+    return WebDriverException, HTTPError, OSError
+
+
+def is_login_page(driver):
+    """Return True if the portal is showing the login form (session expired)."""
+    from selenium.webdriver.common.by import By
+    return bool(driver.find_elements(By.ID, "username"))
+
+
+class PortalSession:
+    """A Chrome instance logged in to the portal for one profile."""
+
+    def __init__(self, profile):
+        from browser_profile import create_driver
+
+        self.profile_key = profile['student_id']
+        with get_metrics().span('browser.start'):
+            self.driver = create_driver()
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.logged_in = False
+
+    def is_expired(self, now=None):
+        now = now or time.time()
+        return (self.uses >= MAX_USES_PER_SESSION
+                or now - self.created_at >= MAX_SESSION_AGE
+                or now - self.last_used >= MAX_IDLE_TIME)
+
+    def ensure_logged_in(self, profile):
+        """Bring the browser back to the dashboard, logging in again if the portal dropped us."""
+        with get_metrics().span('portal.login', via='browser'):
+            if not self.logged_in:
+                portal_login(self.driver, profile)
+                self.logged_in = True
+                return
+            self.driver.get(PORTAL_URL)
+            if is_login_page(self.driver):
+                portal_login(self.driver, profile)
+
+    def is_alive(self):
+        """Cheap health check: a dead browser raises on any command."""
+        try:
+            self.driver.current_url
+            return True
+        except _dead_driver_errors():
+            return False
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except _dead_driver_errors():
+            pass
+
+
+class SessionPool:
+    """Keeps logged-in browsers alive per profile so repeat searches skip Chrome start-up and login."""
+
+    def __init__(self):
+        # Guards the dicts only; health checks and quitting Chrome happen outside it
+        self.lock = threading.Lock()
+        self.idle = {}       # profile key -> list of idle PortalSession
+        self.profile_locks = {}
+        self.stopped = threading.Event()
+        self.pruner = None
+
+    def _profile_lock(self, profile_key):
+        with self.lock:
+            return self.profile_locks.setdefault(profile_key, threading.Lock())
+
+    def _take_idle(self, profile_key):
+        while True:
+            with self.lock:
+                sessions = self.idle.get(profile_key)
+                if not sessions:
+                    return None
+                session = sessions.pop()
+            if not session.is_expired() and session.is_alive():
+                return session
+            session.close()
+
+    def _give_back(self, session):
+        with self.lock:
+            self.idle.setdefault(session.profile_key, []).append(session)
+
+    @contextmanager
+    def session(self, profile):
+        """
+        Borrow a logged-in driver for the given profile.
+
+        A browser that raised during use is thrown away instead of going back into the pool.
+        Searches for the same profile are serialised so two threads never share one portal login.
+        """
+        profile_key = profile['student_id']
+        with self._profile_lock(profile_key):
+            session = self._take_idle(profile_key) or PortalSession(profile)
+            try:
+                session.ensure_logged_in(profile)
+                yield session.driver
+            except BaseException:
+                session.close()
+                raise
+            session.uses += 1
+            session.last_used = time.time()
+            if session.is_expired():
+                session.close()
+            else:
+                self._give_back(session)
+
+    def prune(self):
+        """Close browsers that are too old, used up or idle for too long."""
+        expired = []
+        with self.lock:
+            now = time.time()
+            for profile_key, sessions in self.idle.items():
+                expired += [session for session in sessions if session.is_expired(now)]
+                self.idle[profile_key] = [session for session in sessions if not session.is_expired(now)]
+        for session in expired:
+            session.close()
+
+    def start_pruning(self, interval=PRUNE_INTERVAL):
+        """Run prune() every `interval` seconds on a daemon thread, off the UI thread."""
+        with self.lock:
+            if self.pruner is not None:
+                return
+            self.pruner = threading.Thread(target=self._prune_loop, args=(interval,), daemon=True,
+                                           name="session-prune")
+        self.pruner.start()
+
+    def _prune_loop(self, interval):
+        while not self.stopped.wait(interval):
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"Session prune failed: {e}")
+
+    def close_all(self):
+        self.stopped.set()
+        with self.lock:
+            sessions = [session for sessions in self.idle.values() for session in sessions]
+            self.idle.clear()
+        for session in sessions:
+            session.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Return the process-wide session pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool()
+        return _pool
@@ -0,0 +1,133 @@
+import threading
+import time
+from offered_courses import fetch_offered_courses, evaluate_watches
+from snapshot_diff import get_snapshot_tracker
+from seat_history import get_seat_history
+from storage import load_section
+
+
+
+DEFAULT_TTL = 30                # Seconds a fetched table is reused
+
+# Defaults for the "snapshot" section of settings
+DEFAULT_SNAPSHOT_SETTINGS = {
+    'ttl': DEFAULT_TTL,
+    'warm_up_on_start': False,  # Pre-load tables for saved alarms when the app starts (logs in to the portal)
+}
+
+
+def load_snapshot_settings():
+    return load_section("snapshot", DEFAULT_SNAPSHOT_SETTINGS)
+
+
+class _Flight:
+    """A portal fetch in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.table = None
+        self.error = None
+
+
+class SnapshotCache:
+    """
+    Shares offered-courses tables between searches, keyed by (department, semester).
+
+    Tables are reused for `ttl` seconds. Callers that ask for a table while it is being
+    fetched wait for that fetch instead of starting their own. Every fresh table is
+    passed to the tracker, if any, to be diffed against the previous one, and appended to
+    the seat history, if any.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, fetch=fetch_offered_courses, tracker=None, history=None):
+        self.ttl = ttl
+        self.fetch = fetch
+        self.tracker = tracker
+        self.history = history
+        self.lock = threading.Lock()
+        self.tables = {}        # (department, semester) -> (fetched_at, table)
+        self.in_flight = {}     # (department, semester) -> _Flight
+
+    def get(self, profile, department, semester, max_age=None):
+        """Return a table no older than max_age (defaults to the cache TTL)."""
+        key = (department, semester)
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            cached = self.tables.get(key)
+            if cached and time.time() - cached[0] <= max_age:
+                return cached[1]
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.table
+
+        try:
+            flight.table = self.fetch(profile, department, semester)
+            if self.tracker:
+                try:
+                    self.tracker.update(department, semester, flight.table)
+                except Exception as e:
+                    print(f"Snapshot diff failed for {department} {semester}: {e}")
+            if self.history:
+                try:
+                    self.history.record_table(department, semester, flight.table)
+                except Exception as e:
+                    print(f"Seat history write failed for {department} {semester}: {e}")
+            with self.lock:
+                self.tables[key] = (time.time(), flight.table)
+            return flight.table
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            flight.done.set()
+
+    def search_watches(self, profile, department, semester, watches, max_age=None):
+        """Like offered_courses.search_watches, but served from the shared snapshot."""
+        return evaluate_watches(self.get(profile, department, semester, max_age), watches)
+
+    def invalidate(self, department=None, semester=None):
+        """Drop the cached table for department/semester, or every table, so the next get() fetches."""
+        with self.lock:
+            if department is None and semester is None:
+                self.tables.clear()
+            else:
+                self.tables.pop((department, semester), None)
+
+    def warm_up(self, alarms):
+        """Fetch, in the background, one table per distinct department/semester in the saved alarms."""
+        targets = {}
+        for alarm in alarms:
+            targets.setdefault((alarm['department'], alarm['semester']), alarm['profile'])
+
+        def warm_thread():
+            for (department, semester), profile in targets.items():
+                try:
+                    self.get(profile, department, semester)
+                except Exception as e:
+                    print(f"Snapshot warm-up failed for {department} {semester}: {e}")
+
+        if targets:
+            threading.Thread(target=warm_thread, daemon=True).start()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_snapshot_cache():
+    """Return the process-wide snapshot cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SnapshotCache(ttl=load_snapshot_settings()['ttl'], tracker=get_snapshot_tracker(),
+                                   history=get_seat_history())
+        return _cache
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from app_paths import get_file_path
+from offered_courses import calculate_available_seats
+
+
+
+SNAPSHOT_DIR = "snapshots"
+MAX_RECENT_EVENTS = 500
+
+# Change event types
+SEATS_OPENED = 'seats_opened'
+SEATS_CLOSED = 'seats_closed'
+SECTION_ADDED = 'section_added'
+SECTION_REMOVED = 'section_removed'
+CAPACITY_CHANGED = 'capacity_changed'
+ENROLLMENT_CHANGED = 'enrollment_changed'
+
+
+def row_hash(row):
+    """Short stable hash of the columns we compare between snapshots."""
+    text = f"{row['course']}|{row['section']}|{row['seats']}"
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _capacity(seats):
+    try:
+        return int(seats.split('/')[1])
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def _is_open(seats):
+    available, _ = calculate_available_seats(seats)
+    return bool(available and available > 0)
+
+
+def _event(event_type, key, old_seats, new_seats, at):
+    return {'type': event_type, 'course': key[0], 'section': key[1],
+            'old': old_seats, 'new': new_seats, 'at': at}
+
+
+def diff_snapshots(old, new, at=None):
+    """
+    Compare two snapshots ({(course, section): {'hash', 'seats', ...}}) and return change events.
+
+    Rows whose hash is unchanged are skipped without looking at their seats.
+    """
+    at = at or time.time()
+    events = []
+    for key, entry in new.items():
+        previous = old.get(key)
+        if previous is None:
+            events.append(_event(SECTION_ADDED, key, None, entry['seats'], at))
+            if _is_open(entry['seats']):
+                events.append(_event(SEATS_OPENED, key, None, entry['seats'], at))
+            continue
+        if previous['hash'] == entry['hash']:
+            continue
+        old_seats, new_seats = previous['seats'], entry['seats']
+        if _capacity(old_seats) != _capacity(new_seats):
+            events.append(_event(CAPACITY_CHANGED, key, old_seats, new_seats, at))
+        was_open, is_open = _is_open(old_seats), _is_open(new_seats)
+        if is_open and not was_open:
+            events.append(_event(SEATS_OPENED, key, old_seats, new_seats, at))
+        elif was_open and not is_open:
+            events.append(_event(SEATS_CLOSED, key, old_seats, new_seats, at))
+        elif _capacity(old_seats) == _capacity(new_seats):
+            events.append(_event(ENROLLMENT_CHANGED, key, old_seats, new_seats, at))
+    for key, entry in old.items():
+        if key not in new:
+            events.append(_event(SECTION_REMOVED, key, entry['seats'], None, at))
+    return events
+
+
+def _snapshot_path(department, semester):
+    name = re.sub(r'[^A-Za-z0-9]+', '_', f"{department}_{semester}").strip('_')
+    return os.path.join(get_file_path(SNAPSHOT_DIR), f"{name}.json")
+
+
+class SnapshotTracker:
+    """
+    Remembers the last table per department/semester and turns each new fetch into change events.
+
+    Rows that are open get an 'opened_at' timestamp carried over from the snapshot, so callers
+    can tell a seat that just freed up from one that has been open all day.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshots = {}         # (department, semester) -> {(course, section): entry}
+        self.last_change = {}       # (department, semester) -> timestamp of the last event
+        self.recent_events = deque(maxlen=MAX_RECENT_EVENTS)
+        self.listeners = []
+
+    def subscribe(self, callback):
+        """callback(department, semester, events) is called after every fetch that changed something."""
+        self.listeners.append(callback)
+
+    def _load(self, department, semester):
+        path = _snapshot_path(department, semester)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    stored = json.load(f)
+                return {tuple(key.split('|', 1)): entry for key, entry in stored['rows'].items()}
+            except (json.JSONDecodeError, IOError, KeyError):
+                pass
+        return {}
+
+    def _save(self, department, semester, snapshot):
+        os.makedirs(get_file_path(SNAPSHOT_DIR), exist_ok=True)
+        path = _snapshot_path(department, semester)
+        stored = {'department': department, 'semester': semester, 'saved_at': time.time(),
+                  'rows': {f"{key[0]}|{key[1]}": entry for key, entry in snapshot.items()}}
+        with open(path + ".tmp", 'w') as f:
+            json.dump(stored, f)
+        os.replace(path + ".tmp", path)
+
+    def update(self, department, semester, table):
+        """Diff a freshly fetched table against the stored snapshot and return the change events."""
+        now = time.time()
+        table_key = (department, semester)
+        with self.lock:
+            if table_key not in self.snapshots:
+                self.snapshots[table_key] = self._load(department, semester)
+            old = self.snapshots[table_key]
+            new = {}
+            for row in table:
+                # The first row for a course/section wins, as in OfferedCoursesTable.index
+                key = (row['course'], row['section'])
+                if key not in new:
+                    new[key] = {'hash': row_hash(row), 'seats': row['seats'], 'opened_at': None}
+            events = diff_snapshots(old, new, now)
+            opened = {(e['course'], e['section']) for e in events if e['type'] == SEATS_OPENED}
+            for key, entry in new.items():
+                if not _is_open(entry['seats']):
+                    continue
+                previous = old.get(key)
+                if key in opened or not previous or not previous.get('opened_at'):
+                    entry['opened_at'] = now
+                else:
+                    entry['opened_at'] = previous['opened_at']
+            for row in table:
+                row['opened_at'] = new[(row['course'], row['section'])]['opened_at']
+            self.snapshots[table_key] = new
+            if events:
+                self.last_change[table_key] = now
+                self.recent_events.extend(events)
+                self._save(department, semester, new)
+        if events:
+            for callback in list(self.listeners):
+                try:
+                    callback(department, semester, events)
+                except Exception as e:
+                    print(f"Snapshot listener failed: {e}")
+        return events
+
+    def changed_since(self, department, semester, since):
+        with self.lock:
+            return self.last_change.get((department, semester), 0) > since
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_snapshot_tracker():
+    """Return the process-wide snapshot tracker."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = SnapshotTracker()
+        return _tracker
@@ -0,0 +1,109 @@
+from kivy.clock import Clock
+from kivy.uix.screenmanager import Screen
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.scrollview import ScrollView
+from metrics import get_metrics
+from ui_latency import get_ui_monitor
+
+
+
+REFRESH_INTERVAL = 2    # Seconds between refreshes while the screen is shown
+
+
+def format_snapshot(snapshot):
+    """Render a metrics snapshot as monospaced text: counters, then spans with p50/p95."""
+    lines = [f"Uptime {snapshot['uptime'] / 60:.0f} min", "", "Counters"]
+    for counter in snapshot['counters']:
+        labels = ", ".join(f"{k}={v}" for k, v in counter['labels'].items())
+        name = f"{counter['name']} ({labels})" if labels else counter['name']
+        lines.append(f"  {name:<40}{counter['value']:>8}")
+    lines += ["", f"  {'span':<40}{'count':>7}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+    for span in snapshot['spans']:
+        labels = ", ".join(f"{k}={v}" for k, v in span['labels'].items())
+        name = f"{span['name']} ({labels})" if labels else span['name']
+        lines.append(f"  {name:<40}{span['count']:>7}{span['errors']:>5}{span['p50'] * 1000:>9.0f}"
+                     f"{span['p95'] * 1000:>9.0f}{span['max'] * 1000:>9.0f}")
+    return "\n".join(lines)
+
+
+def format_ui_summary(summary):
+    """Frame and callback histograms plus the slowest callbacks from the UI latency monitor."""
+    lines = ["", "UI main thread"]
+    for name in ('frames', 'callbacks'):
+        stats = summary[name]
+        if stats['count']:
+            lines.append(f"  {name:<12}{stats['count']:>7} p50 {stats['p50_ms']:>7.1f} ms  p95 {stats['p95_ms']:>7.1f} ms"
+                         f"  max {stats['max_ms']:>7.1f} ms")
+    for entry in summary['slowest'][:5]:
+        lines.append(f"  {entry['max_ms']:>7.0f} ms  {entry['callback']} <- {entry['scheduled_at']}")
+    return "\n".join(lines)
+
+
+class StatsScreen(Screen):
+    """Live view of the pipeline metrics."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.refresh_event = None
+        layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
+
+        layout.add_widget(Label(text="Stats", font_size=24, size_hint_y=None, height=50))
+
+        scroll = ScrollView()
+        self.stats_label = Label(text="", font_name="RobotoMono-Regular", font_size=13, size_hint_y=None,
+                                 halign="left", valign="top")
+        self.stats_label.bind(texture_size=lambda label, size: setattr(label, 'height', size[1]))
+        self.stats_label.bind(width=lambda label, width: setattr(label, 'text_size', (width, None)))
+        scroll.add_widget(self.stats_label)
+        layout.add_widget(scroll)
+
+        self.message_label = Label(text="", size_hint_y=None, height=30)
+        layout.add_widget(self.message_label)
+
+        export_button = Button(text="Export Metrics File", size_hint_y=None, height=50)
+        export_button.bind(on_press=self.export)
+        layout.add_widget(export_button)
+
+        if get_ui_monitor() is not None:
+            dump_button = Button(text="Dump UI Latency", size_hint_y=None, height=50)
+            dump_button.bind(on_press=self.dump_ui_latency)
+            layout.add_widget(dump_button)
+
+        back_button = Button(text="Back to Main Menu", size_hint_y=None, height=50)
+        back_button.bind(on_press=self.go_home)
+        layout.add_widget(back_button)
+
+        self.add_widget(layout)
+
+    def on_enter(self):
+        self.refresh()
+        self.refresh_event = Clock.schedule_interval(self.refresh, REFRESH_INTERVAL)
+
+    def on_leave(self):
+        if self.refresh_event is not None:
+            self.refresh_event.cancel()
+            self.refresh_event = None
+
+    def refresh(self, *args):
+        text = format_snapshot(get_metrics().snapshot())
+        ui_monitor = get_ui_monitor()
+        if ui_monitor is not None:
+            text += "\n" + format_ui_summary(ui_monitor.summary())
+        self.stats_label.text = text
+
+    def export(self, instance):
+        try:
+            self.message_label.text = f"Written to {get_metrics().export()}"
+        except OSError as e:
+            self.message_label.text = f"Export failed: {e}"
+
+    def dump_ui_latency(self, instance):
+        try:
+            self.message_label.text = f"Written to {get_ui_monitor().dump()}"
+        except OSError as e:
+            self.message_label.text = f"Dump failed: {e}"
+
+    def go_home(self, instance):
+        self.manager.current = "home"
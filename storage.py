@@ -0,0 +1,242 @@
+"""
+SQLite storage for profiles, alarms, settings and email templates.
+
+Everything lives in walle.db in the persistent directory, opened in WAL mode so search
+threads can read while the UI writes. Each change is one row-level statement in its own
+transaction. The JSON files used by older versions are imported once and renamed to
+*.migrated.
+"""
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from app_paths import get_file_path
+
+
+
+DB_FILE = "walle.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_student_id ON profiles (student_id);
+CREATE TABLE IF NOT EXISTS alarms (
+    id TEXT PRIMARY KEY,
+    student_id TEXT,
+    department TEXT,
+    semester TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alarms_student_id ON alarms (student_id);
+CREATE INDEX IF NOT EXISTS alarms_table ON alarms (department, semester);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS templates (
+    name TEXT PRIMARY KEY,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_path = None
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def get_connection():
+    """Return this thread's connection, creating the schema and migrating JSON data on first use."""
+    global _initialized_path
+    path = get_file_path(DB_FILE)
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'path', None) == path:
+        return conn
+    with _init_lock:
+        if _initialized_path != path:
+            init_conn = _connect(path)
+            init_conn.executescript(SCHEMA)
+            migrate_json_files(init_conn)
+            init_conn.close()
+            _initialized_path = path
+    _local.conn = _connect(path)
+    _local.path = path
+    return _local.conn
+
+
+class transaction:
+    """`with transaction() as conn:` runs the block in one IMMEDIATE transaction."""
+
+    def __enter__(self):
+        self.conn = get_connection()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# JSON migration
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            content = f.read()
+        return json.loads(content) if content.strip() else None
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+def migrate_json_files(conn):
+    """Import profiles.json, alarms.json, settings.json and *_email_template.json once."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return
+    migrated = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        profiles_path = get_file_path("profiles.json")
+        profiles = _read_json(profiles_path) if os.path.exists(profiles_path) else None
+        if isinstance(profiles, dict):
+            for key, profile in profiles.items():
+                conn.execute("INSERT OR REPLACE INTO profiles (id, student_id, data) VALUES (?, ?, ?)",
+                             (int(key), profile.get('student_id'), json.dumps(profile)))
+            migrated.append(profiles_path)
+
+        alarms_path = get_file_path("alarms.json")
+        alarms = _read_json(alarms_path) if os.path.exists(alarms_path) else None
+        if isinstance(alarms, list):
+            for alarm in alarms:
+                alarm.pop('clock_event', None)
+                alarm.setdefault('id', uuid.uuid4().hex)
+                _write_alarm(conn, alarm)
+            migrated.append(alarms_path)
+
+        settings_path = get_file_path("settings.json")
+        settings = _read_json(settings_path) if os.path.exists(settings_path) else None
+        if isinstance(settings, dict):
+            for key, value in settings.items():
+                conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            migrated.append(settings_path)
+
+        for template_path in glob.glob(get_file_path("*_email_template.json")):
+            template = _read_json(template_path)
+            name = os.path.basename(template_path)[:-len("_email_template.json")]
+            if isinstance(template, dict) and 'subject' in template and 'body' in template:
+                conn.execute("INSERT OR REPLACE INTO templates (name, subject, body, updated_at) "
+                             "VALUES (?, ?, ?, ?)", (name, template['subject'], template['body'], time.time()))
+                migrated.append(template_path)
+
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (str(time.time()),))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    for path in migrated:
+        try:
+            os.replace(path, path + ".migrated")
+        except OSError as e:
+            print(f"Could not rename {path}: {e}")
+
+
+# Profiles
+def load_profiles():
+    """Return {key: profile} with string keys, as profiles.json used to."""
+    rows = get_connection().execute("SELECT id, data FROM profiles ORDER BY id").fetchall()
+    return {str(key): json.loads(data) for key, data in rows}
+
+
+def upsert_profile(key, profile):
+    with transaction() as conn:
+        conn.execute("INSERT OR REPLACE INTO profiles (id, student_id, data) VALUES (?, ?, ?)",
+                     (int(key), profile.get('student_id'), json.dumps(profile)))
+
+
+def delete_profile(key):
+    with transaction() as conn:
+        conn.execute("DELETE FROM profiles WHERE id = ?", (int(key),))
+
+
+# Alarms
+def _write_alarm(conn, alarm):
+    profile = alarm.get('profile') or {}
+    conn.execute("INSERT OR REPLACE INTO alarms (id, student_id, department, semester, data) "
+                 "VALUES (?, ?, ?, ?, ?)",
+                 (alarm['id'], profile.get('student_id'), alarm.get('department'), alarm.get('semester'),
+                  json.dumps(alarm)))
+
+
+def load_alarms():
+    rows = get_connection().execute("SELECT data FROM alarms ORDER BY rowid").fetchall()
+    return [json.loads(data) for (data,) in rows]
+
+
+def upsert_alarm(alarm):
+    with transaction() as conn:
+        _write_alarm(conn, alarm)
+
+
+def delete_alarm(alarm_id):
+    with transaction() as conn:
+        conn.execute("DELETE FROM alarms WHERE id = ?", (alarm_id,))
+
+
+# Settings
+def load_settings():
+    rows = get_connection().execute("SELECT key, value FROM settings").fetchall()
+    return {key: json.loads(value) for key, value in rows}
+
+
+def get_setting(key, default=None):
+    row = get_connection().execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def load_section(name, defaults):
+    """Return the settings section `name` with `defaults` filled in for the keys it does not set."""
+    section = dict(defaults)
+    section.update(get_setting(name, {}))
+    return section
+
+
+def update_settings(**changes):
+    """Set the given settings keys, keeping everything else."""
+    with transaction() as conn:
+        for key, value in changes.items():
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+
+# Email templates
+def load_template(name):
+    """Return {'subject', 'body'} for a stored template, or None."""
+    row = get_connection().execute("SELECT subject, body FROM templates WHERE name = ?", (name,)).fetchone()
+    return {'subject': row[0], 'body': row[1]} if row else None
+
+
+def template_updated_at(name):
+    row = get_connection().execute("SELECT updated_at FROM templates WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def save_template(name, template):
+    with transaction() as conn:
+        conn.execute("INSERT OR REPLACE INTO templates (name, subject, body, updated_at) VALUES (?, ?, ?, ?)",
+                     (name, template['subject'], template['body'], time.time()))
@@ -0,0 +1,136 @@
+import threading
+import time
+from string import Formatter
+import storage
+
+
+
+# Default email template
+DEFAULT_TEMPLATE = {
+    'subject': "{course_code} Add Request",
+    'body': """Hi Advisor,
+
+I want to add {course_code} section {section}. 
+
+Thanks for your time.
+
+Sincerely Yours,
+{student_name},
+{student_id}"""
+}
+
+# Placeholders a template may use
+TEMPLATE_FIELDS = ('course_code', 'section', 'student_name', 'student_id')
+
+# How often, at most, the registry checks storage for changes made elsewhere
+STAT_INTERVAL = 2.0
+
+
+class TemplateError(ValueError):
+    """Raised when a template has malformed or unknown placeholders."""
+
+
+def compile_text(text):
+    """Split text into (literal, field, format_spec) parts once, validating every placeholder."""
+    parts = []
+    try:
+        for literal, field, format_spec, conversion in Formatter().parse(text):
+            if field is not None and field not in TEMPLATE_FIELDS:
+                allowed = ", ".join("{%s}" % name for name in TEMPLATE_FIELDS)
+                raise TemplateError(f"Unknown placeholder {{{field}}}. Use {allowed}.")
+            if conversion:
+                raise TemplateError(f"Conversions like !{conversion} are not supported.")
+            parts.append((literal, field, format_spec or ""))
+    except TemplateError:
+        raise
+    except ValueError as e:
+        raise TemplateError(f"Malformed placeholder: {e}. Use {{{{ and }}}} for literal braces.")
+    return parts
+
+
+def render_parts(parts, values):
+    out = []
+    for literal, field, format_spec in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(format(values[field], format_spec))
+    return "".join(out)
+
+
+class CompiledTemplate:
+    def __init__(self, template):
+        self.template = {'subject': template['subject'], 'body': template['body']}
+        self.subject_parts = compile_text(template['subject'])
+        self.body_parts = compile_text(template['body'])
+
+    def render(self, **values):
+        """Return (subject, body) with the placeholders filled in."""
+        return render_parts(self.subject_parts, values), render_parts(self.body_parts, values)
+
+
+def validate_template(template):
+    """Raise TemplateError if the template cannot be rendered."""
+    CompiledTemplate(template)
+
+
+DEFAULT_COMPILED = CompiledTemplate(DEFAULT_TEMPLATE)
+
+
+class TemplateRegistry:
+    """
+    Keeps the active template compiled in memory.
+
+    It reloads when the active template setting or that template's updated_at changes in
+    storage (checked at most every STAT_INTERVAL seconds, e.g. for edits from another process)
+    or right away after invalidate(), which the template editor calls on save.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.compiled = None
+        self.signature = None
+        self.checked_at = 0
+
+    def invalidate(self):
+        with self.lock:
+            self.compiled = None
+
+    def _signature(self):
+        active = storage.get_setting("active", "default")
+        return active, storage.template_updated_at(active)
+
+    def _load(self, active):
+        template = storage.load_template(active)
+        if template is not None:
+            try:
+                return CompiledTemplate(template)
+            except TemplateError as e:
+                print(f"Falling back to the default template: {e}")
+        return DEFAULT_COMPILED
+
+    def active(self):
+        """Return the active CompiledTemplate."""
+        now = time.monotonic()
+        with self.lock:
+            if self.compiled is not None and now - self.checked_at < STAT_INTERVAL:
+                return self.compiled
+            signature = self._signature()
+            self.checked_at = now
+            if self.compiled is None or signature != self.signature:
+                self.compiled = self._load(signature[0])
+                self.signature = signature
+            return self.compiled
+
+    def active_template(self):
+        """Return the active template as a {'subject', 'body'} dict."""
+        return dict(self.active().template)
+
+    def render(self, **values):
+        return self.active().render(**values)
+
+
+_registry = TemplateRegistry()
+
+
+def get_template_registry():
+    return _registry
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# Keep the predictive planner's state out of the real data directory
+os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-test-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_scheduler import AlarmScheduler, next_fire_time
+
+
+
+# A Wednesday
+NOW = datetime(2025, 1, 1, 8, 0)
+
+
+def alarm(alarm_id, at, repeat=()):
+    return {'id': alarm_id, 'time': at, 'repeat': list(repeat), 'course': "CSE246", 'section': "3"}
+
+
+class NextFireTimeTest(unittest.TestCase):
+    def test_one_off_alarm_fires_at_the_next_occurrence(self):
+        self.assertEqual(next_fire_time(alarm("a", "09:30"), NOW), datetime(2025, 1, 1, 9, 30))
+        self.assertEqual(next_fire_time(alarm("a", "07:30"), NOW), datetime(2025, 1, 2, 7, 30))
+
+    def test_fire_time_is_strictly_after(self):
+        self.assertEqual(next_fire_time(alarm("a", "08:00"), NOW), datetime(2025, 1, 2, 8, 0))
+
+    def test_repeating_alarm_skips_to_a_listed_day(self):
+        self.assertEqual(next_fire_time(alarm("a", "07:00", ["Mon"]), NOW), datetime(2025, 1, 6, 7, 0))
+        self.assertEqual(next_fire_time(alarm("a", "09:00", ["Wed"]), NOW), datetime(2025, 1, 1, 9, 0))
+
+    def test_unparsable_time(self):
+        self.assertIsNone(next_fire_time(alarm("a", "9 o'clock"), NOW))
+
+
+class AlarmSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = AlarmScheduler()
+
+    def test_next_due_is_the_earliest_alarm(self):
+        for alarm_id, at in [("late", "12:00"), ("early", "09:00"), ("middle", "10:00")]:
+            self.scheduler.schedule(alarm(alarm_id, at), NOW)
+        self.assertEqual(self.scheduler.next_due(), datetime(2025, 1, 1, 9, 0).timestamp())
+        self.assertEqual(len(self.scheduler), 3)
+
+    def test_pop_due_returns_due_alarms_earliest_first(self):
+        for alarm_id, at in [("c", "11:00"), ("a", "09:00"), ("b", "10:00")]:
+            self.scheduler.schedule(alarm(alarm_id, at), NOW)
+        due = self.scheduler.pop_due(datetime(2025, 1, 1, 10, 0).timestamp())
+        self.assertEqual([a['id'] for a in due], ["a", "b"])
+        self.assertEqual(self.scheduler.next_due(), datetime(2025, 1, 1, 11, 0).timestamp())
+        self.assertEqual(len(self.scheduler), 1)
+
+    def test_cancelled_alarm_is_skipped(self):
+        self.scheduler.schedule(alarm("a", "09:00"), NOW)
+        self.scheduler.schedule(alarm("b", "10:00"), NOW)
+        self.scheduler.cancel("a")
+        self.assertEqual(self.scheduler.next_due(), datetime(2025, 1, 1, 10, 0).timestamp())
+        self.assertEqual([a['id'] for a in self.scheduler.pop_due(datetime(2025, 1, 2).timestamp())], ["b"])
+
+    def test_rescheduled_alarm_fires_once_at_its_new_time(self):
+        moved = alarm("a", "09:00")
+        self.scheduler.schedule(moved, NOW)
+        moved['time'] = "11:00"
+        self.scheduler.schedule(moved, NOW)
+        self.assertEqual(self.scheduler.next_due(), datetime(2025, 1, 1, 11, 0).timestamp())
+        self.assertEqual(self.scheduler.pop_due(datetime(2025, 1, 1, 10, 0).timestamp()), [])
+        self.assertEqual([a['id'] for a in self.scheduler.pop_due(datetime(2025, 1, 2).timestamp())], ["a"])
+
+    def test_alarm_without_a_fire_time_is_dropped(self):
+        broken = alarm("a", "09:00")
+        self.scheduler.schedule(broken, NOW)
+        broken['time'] = "never"
+        self.assertIsNone(self.scheduler.schedule(broken, NOW))
+        self.assertIsNone(self.scheduler.next_due())
+        self.assertEqual(len(self.scheduler), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, date, time, timedelta
+
+# Keep the check budget and seat history of these tests out of the real data directory
+os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-test-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from predictive_schedule import PredictivePlanner, PREDICTIVE, thin_checks
+from walle_cli import alarm_is_due
+
+
+
+def predictive_alarm(alarm_id, student_id="2021-1-60-001"):
+    # No seat history is recorded for it, so its 48 daily checks fall at :15 and :45 of every hour
+    return {'id': alarm_id, 'mode': PREDICTIVE, 'repeat': [], 'course': "CSE246", 'section': "3",
+            'department': "Department of CSE", 'semester': "Fall-2025",
+            'profile': {'student_id': student_id}}
+
+
+class CronDueWindowTest(unittest.TestCase):
+    """walle_cli alarms --due-within N runs a predictive alarm whose check fell in the last N minutes."""
+
+    def test_check_inside_window_is_due(self):
+        now = datetime.combine(date.today() + timedelta(days=1), time(6, 20))
+        self.assertTrue(alarm_is_due(predictive_alarm("cron-1"), now, 10))
+
+    def test_check_before_window_is_not_due(self):
+        now = datetime.combine(date.today() + timedelta(days=1), time(6, 1))
+        self.assertFalse(alarm_is_due(predictive_alarm("cron-2"), now, 10))
+        self.assertTrue(alarm_is_due(predictive_alarm("cron-2"), now, 20))
+
+
+class PlanTest(unittest.TestCase):
+    def test_whole_day_is_planned(self):
+        planner = PredictivePlanner()
+        alarm = predictive_alarm("plan-1")
+        day = date.today() + timedelta(days=1)
+        planner.next_check(alarm, datetime.combine(day, time(0)))
+        plan = planner.plans[("plan-1", day)]
+        self.assertEqual(len(plan), 48)
+        self.assertEqual(plan[0], datetime.combine(day, time(0, 15)))
+
+    def test_mid_day_plan_spreads_only_the_remaining_budget(self):
+        planner = PredictivePlanner()
+        alarm = predictive_alarm("plan-2", student_id="2021-1-60-002")
+        for _ in range(44):
+            planner.budget.consume(alarm['profile'], 48)
+        now = datetime.combine(date.today(), time(12))
+        planner.next_check(alarm, now, now)
+        plan = planner.plans[("plan-2", date.today())]
+        self.assertEqual(len([check for check in plan if check > now]), 4)
+
+    def test_thin_checks_keeps_past_checks(self):
+        now = datetime(2025, 1, 1, 12)
+        checks = [now + timedelta(hours=h) for h in range(-3, 6)]
+        thinned = thin_checks(checks, now, 2)
+        self.assertEqual(thinned[:4], checks[:4])
+        self.assertEqual(len(thinned), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
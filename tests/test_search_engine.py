@@ -0,0 +1,150 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# Keep anything the engine records out of the real data directory
+os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-test-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_engine import SearchEngine, make_search_request
+
+
+
+TIMEOUT = 5
+
+
+def profile(student_id):
+    return {'student_id': student_id, 'student_name': student_id}
+
+
+class FakeCache:
+    """Stands in for the snapshot cache: records each table load and can hold loads until released."""
+
+    def __init__(self, free=()):
+        self.free = set(free)           # (course, section) pairs reported with a free seat
+        self.lock = threading.Lock()
+        self.calls = []                 # (student id, department, semester, watches)
+        self.invalidated = []
+        self.gates = {}                 # student id -> Event the next load for that profile waits on
+        self.started = threading.Condition(self.lock)
+        self.running = {}               # student id -> loads in progress
+        self.overlapped = False
+
+    def hold(self, student_id):
+        gate = self.gates[student_id] = threading.Event()
+        return gate
+
+    def wait_for_calls(self, count):
+        with self.started:
+            return self.started.wait_for(lambda: len(self.calls) >= count, TIMEOUT)
+
+    def search_watches(self, profile, department, semester, watches, max_age=None):
+        student_id = profile['student_id']
+        with self.started:
+            self.calls.append((student_id, department, semester, list(watches)))
+            self.running[student_id] = self.running.get(student_id, 0) + 1
+            self.overlapped = self.overlapped or self.running[student_id] > 1
+            gate = self.gates.pop(student_id, None)
+            self.started.notify_all()
+        if gate is not None:
+            gate.wait(TIMEOUT)
+        with self.lock:
+            self.running[student_id] -= 1
+        return [{'course': course, 'section': section, 'offered': True, 'seats': "",
+                 'available_seats': 1 if (course, section) in self.free else 0, 'opened_at': None}
+                for course, section in watches]
+
+    def invalidate(self, department=None, semester=None):
+        with self.lock:
+            self.invalidated.append((department, semester))
+
+
+class Results:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.results = []
+        self.errors = []
+
+    def on_result(self, request, result):
+        with self.condition:
+            self.results.append((request, result))
+            self.condition.notify_all()
+
+    def on_error(self, request, error):
+        with self.condition:
+            self.errors.append((request, error))
+            self.condition.notify_all()
+
+    def wait(self, count):
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.results) + len(self.errors) >= count, TIMEOUT)
+
+
+class SearchEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = FakeCache(free={("CSE246", "3")})
+        self.engine = SearchEngine(max_workers=4, cache=self.cache)
+        self.results = Results()
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def submit(self, student_id, department, course, section="1"):
+        request = make_search_request(profile(student_id), department, "Fall-2025", course, section)
+        return self.engine.submit(request, self.results.on_result, self.results.on_error)
+
+    def test_queued_requests_for_one_table_share_a_load(self):
+        gate = self.cache.hold("A")
+        self.submit("A", "CSE", "CSE101")
+        self.assertTrue(self.cache.wait_for_calls(1))
+        self.submit("A", "EEE", "EEE101")
+        self.submit("A", "CSE", "CSE246", "3")
+        self.submit("A", "CSE", "CSE325")
+        gate.set()
+        self.assertTrue(self.results.wait(4))
+        self.assertEqual([(department, watches) for _, department, _, watches in self.cache.calls], [
+            ("CSE", [("CSE101", "1")]),
+            ("EEE", [("EEE101", "1")]),
+            ("CSE", [("CSE246", "3"), ("CSE325", "1")]),
+        ])
+        found = {request.course: result['available_seats'] for request, result in self.results.results}
+        self.assertEqual(found, {"CSE101": 0, "EEE101": 0, "CSE246": 1, "CSE325": 0})
+
+    def test_one_profile_runs_one_check_at_a_time(self):
+        gate = self.cache.hold("A")
+        self.submit("A", "CSE", "CSE101")
+        self.assertTrue(self.cache.wait_for_calls(1))
+        self.submit("A", "EEE", "EEE101")
+        # Another profile is not held up by A's load
+        self.submit("B", "CSE", "CSE101")
+        self.assertTrue(self.results.wait(1))
+        self.assertEqual(self.results.results[0][0].profile['student_id'], "B")
+        self.assertEqual(len(self.cache.calls), 2)
+        gate.set()
+        self.assertTrue(self.results.wait(3))
+        self.assertFalse(self.cache.overlapped)
+
+    def test_duplicate_request_is_refused_while_pending(self):
+        gate = self.cache.hold("A")
+        self.assertTrue(self.submit("A", "CSE", "CSE101"))
+        self.assertFalse(self.submit("A", "CSE", "CSE101"))
+        # The same section for another profile is a different check
+        self.assertTrue(self.submit("B", "CSE", "CSE101"))
+        gate.set()
+        self.assertTrue(self.results.wait(2))
+        self.assertTrue(self.submit("A", "CSE", "CSE101"))
+        self.assertTrue(self.results.wait(3))
+
+    def test_table_with_a_free_seat_is_invalidated(self):
+        self.submit("A", "CSE", "CSE101")
+        self.assertTrue(self.results.wait(1))
+        self.assertEqual(self.cache.invalidated, [])
+        self.submit("A", "CSE", "CSE246", "3")
+        self.assertTrue(self.results.wait(2))
+        self.assertEqual(self.cache.invalidated, [("CSE", "Fall-2025")])
+
+
+if __name__ == '__main__':
+    unittest.main()
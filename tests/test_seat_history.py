@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-test-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seat_history import SeatHistory, HOURLY, DAILY, day_start, hour_start
+
+
+
+DEPARTMENT = "Department of CSE"
+SEMESTER = "Fall-2025"
+HOUR = 3600
+# 10:00 local time three days ago; every record in these tests is within the raw retention
+START = day_start(time.time()) - 3 * 86400 + 10 * HOUR
+
+
+def row(seats, course="CSE246", section="3"):
+    return {'course': course, 'section': section, 'seats': seats}
+
+
+class SeatHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="walle-history-")
+        self.history = SeatHistory(self.directory)
+
+    def record(self, at, seats):
+        self.history.record_table(DEPARTMENT, SEMESTER, [row(seats)], at=at)
+
+    def restart(self):
+        self.history = SeatHistory(self.directory)
+        self.assertTrue(self.history.ready.wait(5))
+
+    def rollups(self, period):
+        ids = self.history.find_series("CSE246", "3", DEPARTMENT, SEMESTER)
+        return [(r['start'], r['samples'], r['open_samples'], r['min_free'], r['max_free'], r['last_open'])
+                for r in self.history.rollups(period, ids, START - 86400)]
+
+    def test_hourly_rollup_closes_when_the_next_hour_starts(self):
+        self.record(START, "40/40")
+        self.record(START + 600, "38/40")
+        hourly = os.path.join(self.directory, time.strftime("hourly-%Y%m.bin", time.localtime(START)))
+        self.assertFalse(os.path.exists(hourly))
+        self.record(START + HOUR, "39/40")
+        self.assertEqual(self.rollups(HOURLY), [
+            (START, 2, 1, 0, 2, START + 600),
+            (START + HOUR, 1, 1, 1, 1, START + HOUR),
+        ])
+
+    def test_daily_rollup_closes_when_the_next_day_starts(self):
+        self.record(START, "39/40")
+        self.record(START + 2 * HOUR, "40/40")
+        self.record(START + 86400, "40/40")
+        self.assertEqual(self.rollups(DAILY), [
+            (day_start(START), 2, 1, 0, 1, START),
+            (day_start(START + 86400), 1, 0, 0, 0, None),
+        ])
+
+    def test_open_buckets_are_replayed_after_a_restart(self):
+        self.record(START, "39/40")
+        self.record(START + 600, "40/40")
+        self.restart()
+        self.assertEqual(self.rollups(HOURLY), [(START, 2, 1, 0, 1, START)])
+        self.assertEqual(self.history.last_free_seat("CSE246", "3"), START)
+
+    def test_replay_does_not_count_closed_buckets_twice(self):
+        self.record(START, "39/40")
+        self.record(START + HOUR, "40/40")          # Closes the first hour
+        self.record(START + HOUR + 600, "38/40")
+        self.restart()
+        self.assertEqual(self.rollups(HOURLY), [
+            (START, 1, 1, 1, 1, START),
+            (START + HOUR, 2, 1, 0, 2, START + HOUR + 600),
+        ])
+        # The day is still open, so all three records are replayed into it exactly once
+        self.assertEqual(self.rollups(DAILY), [(day_start(START), 3, 2, 0, 2, START + HOUR + 600)])
+
+    def test_replay_after_a_day_boundary(self):
+        self.record(START, "39/40")
+        self.record(START + 86400, "40/40")         # Closes the first day and its hours
+        self.record(START + 86400 + 600, "40/40")
+        self.restart()
+        self.assertEqual(self.rollups(DAILY), [
+            (day_start(START), 1, 1, 1, 1, START),
+            (day_start(START + 86400), 2, 0, 0, 0, None),
+        ])
+        self.assertEqual([rollup[:2] for rollup in self.rollups(HOURLY)],
+                         [(START, 1), (hour_start(START + 86400), 2)])
+
+    def test_torn_record_at_the_end_of_the_raw_log_is_ignored(self):
+        self.record(START, "39/40")
+        raw = os.path.join(self.directory, time.strftime("raw-%Y%m%d.bin", time.localtime(START)))
+        with open(raw, 'ab') as f:
+            f.write(b"\x01\x02\x03")
+        self.restart()
+        self.assertEqual(self.rollups(HOURLY), [(START, 1, 1, 1, 1, START)])
+
+
+if __name__ == '__main__':
+    unittest.main()
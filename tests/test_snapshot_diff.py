@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# The tracker saves its snapshots to the data directory
+os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-test-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offered_courses import OfferedCoursesTable
+from snapshot_diff import (SnapshotTracker, diff_snapshots, row_hash, SEATS_OPENED, SEATS_CLOSED,
+                           SECTION_ADDED, SECTION_REMOVED, CAPACITY_CHANGED, ENROLLMENT_CHANGED)
+
+
+
+def snapshot(*rows):
+    return {(course, section): {'hash': row_hash({'course': course, 'section': section, 'seats': seats}),
+                                'seats': seats}
+            for course, section, seats in rows}
+
+
+def table(*rows):
+    return [{'course': course, 'section': section, 'seats': seats} for course, section, seats in rows]
+
+
+def types(events):
+    return sorted((event['type'], event['course'], event['section']) for event in events)
+
+
+class DiffSnapshotsTest(unittest.TestCase):
+    def test_seat_changes(self):
+        old = snapshot(("CSE101", "1", "40/40"), ("CSE102", "1", "39/40"), ("CSE103", "1", "30/40"),
+                       ("CSE104", "1", "40/40"))
+        new = snapshot(("CSE101", "1", "39/40"), ("CSE102", "1", "40/40"), ("CSE103", "1", "31/40"),
+                       ("CSE104", "1", "40/45"))
+        self.assertEqual(types(diff_snapshots(old, new, 100)), [
+            (CAPACITY_CHANGED, "CSE104", "1"),
+            (ENROLLMENT_CHANGED, "CSE103", "1"),
+            (SEATS_CLOSED, "CSE102", "1"),
+            (SEATS_OPENED, "CSE101", "1"),
+            (SEATS_OPENED, "CSE104", "1"),
+        ])
+
+    def test_sections_added_and_removed(self):
+        old = snapshot(("CSE101", "1", "40/40"))
+        new = snapshot(("CSE101", "2", "10/40"))
+        self.assertEqual(types(diff_snapshots(old, new, 100)), [
+            (SEATS_OPENED, "CSE101", "2"),
+            (SECTION_ADDED, "CSE101", "2"),
+            (SECTION_REMOVED, "CSE101", "1"),
+        ])
+
+    def test_unchanged_rows_give_no_events(self):
+        rows = snapshot(("CSE101", "1", "10/40"), ("CSE102", "1", "40/40"))
+        self.assertEqual(diff_snapshots(rows, dict(rows), 100), [])
+
+
+class SnapshotTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tracker = SnapshotTracker()
+        # Snapshots are saved per department/semester; a department per test keeps them apart
+        self.department = self.id()
+        self.semester = "Fall-2025"
+
+    def update(self, at, *rows):
+        fetched = table(*rows)
+        with mock.patch('snapshot_diff.time.time', return_value=at):
+            events = self.tracker.update(self.department, self.semester, fetched)
+        return events, {(row['course'], row['section']): row['opened_at'] for row in fetched}
+
+    def test_opened_at_is_kept_while_the_section_stays_open(self):
+        events, opened_at = self.update(100, ("CSE101", "1", "39/40"), ("CSE102", "1", "40/40"))
+        self.assertIn((SEATS_OPENED, "CSE101", "1"), types(events))
+        self.assertEqual(opened_at, {("CSE101", "1"): 100, ("CSE102", "1"): None})
+
+        events, opened_at = self.update(200, ("CSE101", "1", "38/40"), ("CSE102", "1", "40/40"))
+        self.assertEqual(types(events), [(ENROLLMENT_CHANGED, "CSE101", "1")])
+        self.assertEqual(opened_at[("CSE101", "1")], 100)
+
+    def test_reopening_gets_a_new_opened_at(self):
+        self.update(100, ("CSE101", "1", "39/40"))
+        events, opened_at = self.update(200, ("CSE101", "1", "40/40"))
+        self.assertEqual(types(events), [(SEATS_CLOSED, "CSE101", "1")])
+        self.assertIsNone(opened_at[("CSE101", "1")])
+        events, opened_at = self.update(300, ("CSE101", "1", "39/40"))
+        self.assertEqual(types(events), [(SEATS_OPENED, "CSE101", "1")])
+        self.assertEqual(opened_at[("CSE101", "1")], 300)
+
+    def test_opened_at_survives_a_restart(self):
+        self.update(100, ("CSE101", "1", "39/40"))
+        self.tracker = SnapshotTracker()
+        events, opened_at = self.update(200, ("CSE101", "1", "39/40"))
+        self.assertEqual(events, [])
+        self.assertEqual(opened_at[("CSE101", "1")], 100)
+
+    def test_listeners_hear_only_fetches_that_changed_something(self):
+        heard = []
+        self.tracker.subscribe(lambda department, semester, events: heard.append(types(events)))
+        self.update(100, ("CSE101", "1", "40/40"))
+        self.update(200, ("CSE101", "1", "40/40"))
+        self.update(300, ("CSE101", "1", "39/40"))
+        self.assertEqual(heard, [[(SECTION_ADDED, "CSE101", "1")], [(SEATS_OPENED, "CSE101", "1")]])
+        self.assertTrue(self.tracker.changed_since(self.department, self.semester, 250))
+        self.assertFalse(self.tracker.changed_since(self.department, self.semester, 300))
+
+    def test_repeated_section_uses_the_first_row_like_the_table_index(self):
+        rows = (("CSE101", "1", "40/40"), ("CSE101", "1", "39/40"))
+        events, _ = self.update(100, *rows)
+        self.assertNotIn((SEATS_OPENED, "CSE101", "1"), types(events))
+        self.assertEqual(OfferedCoursesTable(table(*rows)).lookup("CSE101", "1")['seats'], "40/40")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Templates and the active-template setting are stored in the data directory's database
+os.environ["WALLE_DATA_DIR"] = tempfile.mkdtemp(prefix="walle-test-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+from template_registry import (CompiledTemplate, TemplateError, TemplateRegistry, DEFAULT_TEMPLATE,
+                               STAT_INTERVAL, compile_text)
+
+
+
+VALUES = {'course_code': "CSE246", 'section': "3", 'student_name': "Sam", 'student_id': "2021-1-60-001"}
+
+
+class CompileTest(unittest.TestCase):
+    def test_render_fills_every_placeholder(self):
+        template = CompiledTemplate({'subject': "{course_code}.{section}",
+                                     'body': "{student_name} ({student_id:>14}) {{not a field}}"})
+        self.assertEqual(template.render(**VALUES),
+                         ("CSE246.3", "Sam ( 2021-1-60-001) {not a field}"))
+
+    def test_default_template_compiles(self):
+        subject, body = CompiledTemplate(DEFAULT_TEMPLATE).render(**VALUES)
+        self.assertEqual(subject, "CSE246 Add Request")
+        self.assertIn("section 3", body)
+
+    def test_unknown_placeholder(self):
+        with self.assertRaisesRegex(TemplateError, "Unknown placeholder {advisor}"):
+            compile_text("Dear {advisor}")
+
+    def test_malformed_placeholder(self):
+        with self.assertRaisesRegex(TemplateError, "Malformed placeholder"):
+            compile_text("Section {section")
+
+    def test_conversion_is_rejected(self):
+        with self.assertRaises(TemplateError):
+            compile_text("{section!r}")
+
+
+class RegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = TemplateRegistry()
+        self.clock = 1000.0
+        patcher = mock.patch('template_registry.time.monotonic', side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def use(self, name, subject):
+        storage.save_template(name, {'subject': subject, 'body': "{student_name}"})
+        storage.update_settings(active=name)
+
+    def subject(self):
+        return self.registry.render(**VALUES)[0]
+
+    def test_missing_template_falls_back_to_the_default(self):
+        storage.update_settings(active="missing")
+        self.assertEqual(self.subject(), "CSE246 Add Request")
+
+    def test_compiled_template_is_reused_until_invalidated(self):
+        self.use("cached", "First {course_code}")
+        self.assertEqual(self.subject(), "First CSE246")
+        compiled = self.registry.active()
+        self.use("cached", "Second {course_code}")
+        self.assertIs(self.registry.active(), compiled)
+        self.registry.invalidate()
+        self.assertEqual(self.subject(), "Second CSE246")
+
+    def test_change_in_storage_is_seen_after_the_stat_interval(self):
+        self.use("polled", "First {course_code}")
+        self.assertEqual(self.subject(), "First CSE246")
+        # Saved by another process, so nobody calls invalidate()
+        self.use("polled-other", "Other {course_code}")
+        self.assertEqual(self.subject(), "First CSE246")
+        self.clock += STAT_INTERVAL
+        self.assertEqual(self.subject(), "Other CSE246")
+
+    def test_unchanged_signature_keeps_the_compiled_template(self):
+        self.use("stable", "Stable {course_code}")
+        compiled = self.registry.active()
+        self.clock += STAT_INTERVAL
+        self.assertIs(self.registry.active(), compiled)
+
+    def test_invalid_stored_template_falls_back_to_the_default(self):
+        self.use("broken", "{advisor}")
+        self.assertEqual(self.subject(), "CSE246 Add Request")
+
+
+if __name__ == '__main__':
+    unittest.main()
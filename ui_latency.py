@@ -0,0 +1,252 @@
+"""
+Opt-in monitor for stalls on the Kivy main thread.
+
+Set WALLE_UI_MONITOR=1 (or "enabled" in the "ui_monitor" settings) to switch it on. Every
+callback run through Clock.schedule_once, schedule_interval or create_trigger is then timed,
+as are touch input dispatch and the interval between frames. A callback that blocks the
+main loop for more than `threshold_ms` is printed with where it was defined and where it
+was scheduled from. Frame and callback times go into rolling histograms of the last
+SAMPLES values; dump() writes them, the slowest callbacks and the recent slow events to
+ui_latency.json in the data directory.
+"""
+import json
+import os
+import sys
+import time
+from collections import deque
+from functools import partial
+from app_paths import get_file_path
+from metrics import get_metrics
+from storage import load_section
+
+
+
+# Set WALLE_UI_MONITOR=1 to turn the monitor on regardless of the settings
+MONITOR_ENV = "WALLE_UI_MONITOR"
+
+DEFAULT_UI_MONITOR_SETTINGS = {
+    'enabled': False,
+    'threshold_ms': 50,             # A callback or input dispatch longer than this is logged
+    'frame_threshold_ms': 100,      # A frame interval longer than this is logged
+}
+
+DUMP_FILE = "ui_latency.json"
+BUCKETS_MS = (4, 8, 16, 33, 50, 100, 250, 500, 1000)
+SAMPLES = 2000                      # Frame and callback times kept for the histograms
+SLOW_EVENTS = 200                   # Slow events kept for dump()
+INPUT_ORIGIN = ("input dispatch (touch handlers)", "EventLoop")
+
+
+def load_ui_monitor_settings():
+    settings = load_section("ui_monitor", DEFAULT_UI_MONITOR_SETTINGS)
+    if os.getenv(MONITOR_ENV):
+        settings['enabled'] = True
+    return settings
+
+
+def describe(callback):
+    """Return 'qualname (file:line)' for a callback, looking through partials and bound methods."""
+    while isinstance(callback, partial):
+        callback = callback.func
+    func = getattr(callback, '__func__', callback)
+    name = getattr(func, '__qualname__', None) or type(func).__qualname__
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return name
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _call_site():
+    """'file:line' of the first caller outside this module."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__') == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+
+def histogram(values):
+    """Count, p50/p95/max and bucket counts in milliseconds for a list of seconds."""
+    ordered = sorted(value * 1000 for value in values)
+    if not ordered:
+        return {'count': 0}
+    buckets = {f"<={bound}": 0 for bound in BUCKETS_MS}
+    buckets[f">{BUCKETS_MS[-1]}"] = 0
+    for value in ordered:
+        bound = next((b for b in BUCKETS_MS if value <= b), None)
+        buckets[f"<={bound}" if bound is not None else f">{BUCKETS_MS[-1]}"] += 1
+    return {
+        'count': len(ordered),
+        'p50_ms': round(ordered[len(ordered) // 2], 1),
+        'p95_ms': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 1),
+        'max_ms': round(ordered[-1], 1),
+        'buckets': buckets,
+    }
+
+
+class TimedCallback:
+    """
+    Wraps a Clock callback to time it. It compares equal to the wrapped callback, so
+    Clock.unschedule(original) still finds the event.
+    """
+    __slots__ = ('monitor', 'callback', 'origin')
+
+    def __init__(self, monitor, callback):
+        self.monitor = monitor
+        self.callback = callback
+        self.origin = (describe(callback), _call_site())
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        try:
+            return self.callback(*args)
+        finally:
+            self.monitor.record(self.origin, time.perf_counter() - start)
+
+    def __eq__(self, other):
+        if isinstance(other, TimedCallback):
+            other = other.callback
+        return self.callback == other
+
+    def __hash__(self):
+        return hash(self.callback)
+
+
+class UILatencyMonitor:
+    """Times Clock callbacks, input dispatch and frames. Everything runs on the main thread."""
+
+    def __init__(self, threshold_ms=50, frame_threshold_ms=100):
+        self.threshold = threshold_ms / 1000
+        self.frame_threshold = frame_threshold_ms / 1000
+        self.frames = deque(maxlen=SAMPLES)
+        self.callbacks = deque(maxlen=SAMPLES)
+        self.origins = {}               # (callback, scheduled at) -> [count, total, max]
+        self.slow = deque(maxlen=SLOW_EVENTS)
+        self.started_at = time.time()
+        self.originals = None
+        self.frame_event = None
+
+    def install(self):
+        """Patch the Clock and the event loop; does nothing when already installed."""
+        from kivy.clock import Clock
+        from kivy.base import EventLoop
+
+        if self.originals is not None:
+            return
+        self.originals = {name: getattr(Clock, name)
+                          for name in ('schedule_once', 'schedule_interval', 'create_trigger')}
+        self.originals['dispatch_input'] = EventLoop.dispatch_input
+        create_trigger = self.originals['create_trigger']
+
+        # The wrapper is the event's only reference to the callback, so it is always held
+        # strongly (release_ref=False); otherwise a fired trigger would lose it.
+        def schedule_once(callback, timeout=0):
+            event = create_trigger(TimedCallback(self, callback), timeout, False, False)
+            event()
+            return event
+
+        def schedule_interval(callback, timeout):
+            event = create_trigger(TimedCallback(self, callback), timeout, True, False)
+            event()
+            return event
+
+        def timed_trigger(callback, timeout=0, interval=False, release_ref=True):
+            return create_trigger(TimedCallback(self, callback), timeout, interval, False)
+
+        Clock.schedule_once = schedule_once
+        Clock.schedule_interval = schedule_interval
+        Clock.create_trigger = timed_trigger
+        EventLoop.dispatch_input = self.dispatch_input
+        self.frame_event = create_trigger(self.on_frame, 0, True, False)
+        self.frame_event()
+
+    def uninstall(self):
+        """Put back the original Clock and event loop functions."""
+        from kivy.clock import Clock
+        from kivy.base import EventLoop
+
+        if self.originals is None:
+            return
+        self.frame_event.cancel()
+        EventLoop.dispatch_input = self.originals.pop('dispatch_input')
+        for name, original in self.originals.items():
+            setattr(Clock, name, original)
+        self.originals = None
+
+    def dispatch_input(self, *args):
+        start = time.perf_counter()
+        try:
+            return self.originals['dispatch_input'](*args)
+        finally:
+            seconds = time.perf_counter() - start
+            if seconds > self.threshold:
+                self.slow_event('input', INPUT_ORIGIN, seconds)
+
+    def on_frame(self, dt):
+        self.frames.append(dt)
+        if dt > self.frame_threshold:
+            self.slow_event('frame', ("frame", ""), dt)
+
+    def record(self, origin, seconds):
+        self.callbacks.append(seconds)
+        stats = self.origins.get(origin)
+        if stats is None:
+            stats = self.origins[origin] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        if seconds > self.threshold:
+            self.slow_event('callback', origin, seconds)
+
+    def slow_event(self, kind, origin, seconds):
+        callback, scheduled_at = origin
+        self.slow.append({'time': time.time(), 'kind': kind, 'callback': callback,
+                          'scheduled_at': scheduled_at, 'ms': round(seconds * 1000, 1)})
+        get_metrics().inc('ui_slow_events', kind=kind)
+        if kind == 'frame':
+            print(f"UI: slow frame, {seconds * 1000:.0f} ms")
+        else:
+            print(f"UI: main thread blocked {seconds * 1000:.0f} ms by {callback}, scheduled at {scheduled_at}")
+
+    def slowest(self, count=20):
+        """The `count` callbacks with the highest max run time, with their totals."""
+        ranked = sorted(self.origins.items(), key=lambda item: item[1][2], reverse=True)[:count]
+        return [{'callback': callback, 'scheduled_at': scheduled_at, 'count': runs,
+                 'total_ms': round(total * 1000, 1), 'max_ms': round(longest * 1000, 1)}
+                for (callback, scheduled_at), (runs, total, longest) in ranked]
+
+    def summary(self):
+        return {
+            'time': time.time(),
+            'uptime': time.time() - self.started_at,
+            'threshold_ms': self.threshold * 1000,
+            'frames': histogram(self.frames),
+            'callbacks': histogram(self.callbacks),
+            'slowest': self.slowest(),
+            'slow_events': list(self.slow),
+        }
+
+    def dump(self):
+        """Write summary() to ui_latency.json and return its path."""
+        path = get_file_path(DUMP_FILE)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+
+_monitor = None
+
+
+def start_ui_monitor():
+    """Install the monitor when the settings or WALLE_UI_MONITOR ask for it; returns it or None."""
+    global _monitor
+    settings = load_ui_monitor_settings()
+    if settings['enabled'] and _monitor is None:
+        _monitor = UILatencyMonitor(settings['threshold_ms'], settings['frame_threshold_ms'])
+        _monitor.install()
+    return _monitor
+
+
+def get_ui_monitor():
+    return _monitor
@@ -1,34 +1,17 @@
-import json
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 import os
 import sys
+from recycle_lists import RecycleList, IconButton
+from profile_repository import get_profile_repository, PROFILE_ADDED, PROFILE_UPDATED, PROFILE_DELETED
 
 
 
-# Persistent Directory Logic (aligned with email_template_manager.py)
-def get_persistent_dir():
-    """Get platform-specific persistent directory for storing data."""
-    if os.name == "nt":  # Windows
-        base_dir = os.getenv('APPDATA')
-    elif os.name == "posix":  # macOS/Linux
-        base_dir = os.path.expanduser('~/.local/share')
-    else:
-        base_dir = os.path.abspath(".")
-
-    app_dir = os.path.join(base_dir, "Wall-E App")
-    os.makedirs(app_dir, exist_ok=True)
-    return app_dir
-
-def get_file_path(filename):
-    """Get full path to a file in the persistent directory."""
-    return os.path.join(get_persistent_dir(), filename)
-
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and PyInstaller."""
     if getattr(sys, 'frozen', False):
@@ -37,26 +20,23 @@ def get_resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-# Profile Loading/Saving (updated to use persistent directory)
-def load_profiles():
-    """Load the profiles from the JSON file."""
-    profiles_path = get_file_path("profiles.json")
-    try:
-        with open(profiles_path, 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        return {}
-
-def save_profiles(profiles):
-    """Save the updated profiles to the JSON file."""
-    profiles_path = get_file_path("profiles.json")
-    try:
-        with open(profiles_path, 'w') as file:
-            json.dump(profiles, file, indent=4)
-    except Exception as e:
-        print(f"Error saving profiles: {e}")
+class ProfileRow(RecycleDataViewBehavior, BoxLayout):
+    """One recycled row of the profile list; the icons share one texture each."""
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation="horizontal", spacing=10, padding=(0, 5), **kwargs)
+        self.item = None
+        self.info = Label(size_hint_x=0.6, halign="left", valign="middle")
+        self.info.bind(size=self.info.setter('text_size'))
+        self.add_widget(self.info)
+        self.add_widget(IconButton(get_resource_path("Icons/edit_icon.png"), size_hint=(None, None), size=(50, 50),
+                                   on_press=lambda x: self.item['edit'](self.item['key'])))
+        self.add_widget(IconButton(get_resource_path("Icons/delete_icon.png"), size_hint=(None, None), size=(50, 50),
+                                   on_press=lambda x: self.item['delete'](self.item['key'])))
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.item = data
+        self.info.text = data['text']
 
 # Profile Management Screens
 class ProfileManagementScreen(Screen):
@@ -145,23 +125,10 @@ class CreateProfileScreen(Screen):
             self.message_label.text = "All fields are required!"
             return
 
-        profiles = load_profiles()
-
-        if profiles:
-            largest_key = max(int(key) for key in profiles.keys())  # Get the largest numeric key
-            new_key = str(largest_key + 1)
-        else:
-            new_key = "1"
-
-        profiles[new_key] = profile_data
-        save_profiles(profiles)
+        get_profile_repository().add(profile_data)
 
         self.message_label.text = "Profile saved successfully!"
 
-        # Trigger dropdown refresh
-        seat_finder = self.manager.get_screen('seat_finder')
-        seat_finder.load_dropdowns()
-
         # Clear all fields after saving
         for field in self.fields.values():
             field.text = ""
@@ -173,71 +140,57 @@ class ViewProfilesScreen(Screen):
 
         layout.add_widget(Label(text="View Profiles", font_size=24, size_hint_y=None, height=50))
 
-        self.scroll_view = ScrollView()
-        self.profiles_list = BoxLayout(orientation="vertical", size_hint_y=None)
-        self.scroll_view.add_widget(self.profiles_list)
-        layout.add_widget(self.scroll_view)
+        self.empty_label = Label(text="", size_hint_y=None, height=30)
+        layout.add_widget(self.empty_label)
+        self.profiles_list = RecycleList(ProfileRow, 60)
+        layout.add_widget(self.profiles_list)
 
         back_button = Button(text="Back to Management", size_hint_y=None, height=50)
         back_button.bind(on_press=self.go_back_to_management)
         layout.add_widget(back_button)
 
         self.add_widget(layout)
+        self.loaded = False
 
     def go_back_to_management(self, instance):
         self.manager.current = "profile_management"
 
     def on_enter(self):
-        self.update_profiles()
+        if not self.loaded:
+            self.update_profiles()
+            get_profile_repository().subscribe(self.on_profile_changed)
+            self.loaded = True
 
     def update_profiles(self):
-        profiles = load_profiles()
-        self.profiles_list.clear_widgets()
-
-        if not profiles:
-            self.profiles_list.add_widget(Label(text="No profiles found.", size_hint_y=None, height=30))
-            return
+        """Fill the list once; later changes arrive through on_profile_changed."""
+        self.profiles_list.data = [self.row_data(key, profile) for key, profile in get_profile_repository().items()]
+        self.refresh_empty_label()
+
+    def refresh_empty_label(self):
+        self.empty_label.text = "" if self.profiles_list.data else "No profiles found."
+
+    def row_data(self, key, profile):
+        return {
+            'key': key,
+            'text': f"{profile.get('student_name', 'N/A')} ({profile.get('student_id', 'N/A')})",
+            'edit': self.edit_profile,
+            'delete': self.show_delete_confirmation,
+        }
 
-        # Adjusting height based on number of profiles
-        self.profiles_list.height = len(profiles) * 60  # Each profile is 60px high
-
-        for key, profile in profiles.items():
-            student_name = profile.get('student_name', 'N/A')
-            student_id = profile.get('student_id', 'N/A')
-
-            profile_layout = BoxLayout(orientation="horizontal", size_hint_y=None, height=50, spacing=10)
-
-            profile_info = Label(
-                text=f"{student_name} ({student_id})",
-                size_hint_x=0.6,
-                halign="left",
-                valign="middle"
-            )
-            profile_info.bind(size=profile_info.setter('text_size'))
-            profile_layout.add_widget(profile_info)
-
-            edit_icon = Button(
-                size_hint=(None, None),
-                size=(50, 50),
-                background_normal=get_resource_path("Icons/edit_icon.png")
-            )
-            edit_icon.bind(on_press=lambda instance, k=key: self.edit_profile(k))
-            profile_layout.add_widget(edit_icon)
-
-            delete_icon = Button(
-                size_hint=(None, None),
-                size=(50, 50),
-                background_normal=get_resource_path("Icons/delete_icon.png")
-            )
-            delete_icon.bind(on_press=lambda instance, k=key: self.show_delete_confirmation(k))
-            profile_layout.add_widget(delete_icon)
-
-            self.profiles_list.add_widget(profile_layout)
+    def on_profile_changed(self, event, key, profile):
+        """Patch just the row data that changed; the RecycleView reuses its widgets."""
+        index = self.profiles_list.index_of('key', key)
+        if event == PROFILE_ADDED:
+            self.profiles_list.data.append(self.row_data(key, profile))
+        elif event == PROFILE_UPDATED and index >= 0:
+            self.profiles_list.data[index] = self.row_data(key, profile)
+        elif event == PROFILE_DELETED and index >= 0:
+            del self.profiles_list.data[index]
+        self.refresh_empty_label()
 
     def show_delete_confirmation(self, key):
         """Prompt the user to confirm deletion."""
-        profiles = load_profiles()
-        if key not in profiles:
+        if get_profile_repository().get(key) is None:
             return
 
         content = BoxLayout(orientation="vertical", spacing=10, padding=10)
@@ -263,20 +216,12 @@ class ViewProfilesScreen(Screen):
         popup.open()
 
     def confirm_delete(self, key, popup):
-        profiles = load_profiles()
-        if key in profiles:
-            del profiles[key]
-            save_profiles(profiles)
-
-            # Refresh dropdowns in the seat finder screen
-            seat_finder = self.manager.get_screen('seat_finder')
-            seat_finder.load_dropdowns()
-
-            self.update_profiles()
+        # Listeners remove the row here and the entry in the seat finder dropdown
+        get_profile_repository().delete(key)
         popup.dismiss()
 
     def edit_profile(self, key):
-        profile = load_profiles().get(key, {})
+        profile = get_profile_repository().get(key)
         if profile:
             self.manager.get_screen("edit_profile").set_profile(key, profile)
             self.manager.current = "edit_profile"
@@ -318,19 +263,13 @@ class EditProfileScreen(Screen):
 
     def save_profile(self, instance):
         updated_profile = {name.lower().replace(" ", "_"): field.text.strip() for name, field in self.fields.items()}
-        profiles = load_profiles()
-        profiles[self.profile_key] = updated_profile
-        save_profiles(profiles)
-
-        self.message_label.text = "Profile saved successfully!"
 
         if not updated_profile["student_email"].endswith("@std.ewubd.edu"):
-            self.show_error("Invalid student email! Must use @std.ewubd.edu")
+            self.message_label.text = "Invalid student email! Must use @std.ewubd.edu"
             return
 
-        # Refresh dropdowns in the seat finder screen
-        seat_finder = self.manager.get_screen('seat_finder')
-        seat_finder.load_dropdowns()
+        get_profile_repository().update(self.profile_key, updated_profile)
+        self.message_label.text = "Profile saved successfully!"
 
     def go_back_to_profiles(self, instance):
         self.manager.current = "view_profiles"
@@ -0,0 +1,266 @@
+"""
+Headless seat checks for cron/systemd. Uses the same profiles and alarms as the app, without Kivy.
+
+Examples:
+    python walle_cli.py profiles
+    python walle_cli.py check --profile 1 --department "Department of CSE" --semester Fall-2025 \\
+        --watch CSE246:3 --watch CSE325:1
+    python walle_cli.py alarms --due-within 5 --email
+    python walle_cli.py history --watch CSE246:3 --hours 48
+    python walle_cli.py settings watch --set fast_interval=30
+
+Results are printed as one JSON object per line. Exit codes, first match wins:
+    2  bad arguments (e.g. unknown profile); nothing was checked
+    3  at least one check failed, even if another one found a seat (its result is still printed)
+    0  at least one watched section has a free seat
+    1  every check ran and no seat was free
+`history` exits 0 when a free seat was ever recorded for one of the sections, 1 otherwise.
+`settings` exits 0, or 2 for a malformed --set.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from data_store import load_alarms
+from profile_repository import get_profile_repository
+from alarm_scheduler import next_fire_time
+from predictive_schedule import get_predictive_planner, PREDICTIVE
+
+
+
+EXIT_FOUND = 0
+EXIT_NOT_FOUND = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+
+def find_profile(name):
+    """Match a profile by its key, student ID or student name."""
+    repository = get_profile_repository()
+    profile = repository.get(name) or repository.find_by_student_id(name)[1]
+    if profile is None:
+        profile = next((p for _, p in repository.items() if p.get('student_name') == name), None)
+    return profile
+
+
+def parse_watch(text):
+    course, _, section = text.partition(':')
+    if not course or not section:
+        raise argparse.ArgumentTypeError(f"expected COURSE:SECTION, got '{text}'")
+    return course.strip(), section.strip()
+
+
+def parse_setting(text):
+    """KEY=VALUE, where VALUE is read as JSON and kept as a plain string when it is not JSON."""
+    key, sep, value = text.partition('=')
+    if not key or not sep:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got '{text}'")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key.strip(), value
+
+
+def alarm_is_due(alarm, now, window_minutes):
+    """True if the alarm was scheduled to fire within the last window_minutes."""
+    fire_at = next_fire_time(alarm, now - timedelta(minutes=window_minutes))
+    return fire_at is not None and fire_at <= now
+
+
+def run_requests(requests, send_emails=False):
+    """Run search requests on the search engine and print one JSON line per result."""
+    from search_engine import SearchEngine
+
+    engine = SearchEngine()
+    lock = threading.Lock()
+    remaining = [len(requests)]
+    done = threading.Event()
+    outcome = {'found': False, 'failed': False}
+
+    def finish():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            done.set()
+
+    def emit(record):
+        print(json.dumps(record), flush=True)
+
+    def on_result(request, result):
+        found = bool(result['available_seats'] and result['available_seats'] > 0)
+        record = dict(result, student_id=request.profile['student_id'], department=request.department,
+                      semester=request.semester, found=found)
+        if found and send_emails:
+            record['email_sent'] = send_advisor_email(request)
+        with lock:
+            outcome['found'] = outcome['found'] or found
+            emit(record)
+            finish()
+
+    def on_error(request, error):
+        with lock:
+            outcome['failed'] = True
+            emit({'student_id': request.profile['student_id'], 'department': request.department,
+                  'semester': request.semester, 'course': request.course, 'section': request.section,
+                  'error': str(error)})
+            finish()
+
+    for request in requests:
+        if not engine.submit(request, on_result, on_error):
+            with lock:
+                finish()        # Duplicate of a request already queued
+    if requests:
+        done.wait()
+    engine.shutdown()
+
+    if outcome['failed']:
+        return EXIT_FAILED
+    return EXIT_FOUND if outcome['found'] else EXIT_NOT_FOUND
+
+
+def send_advisor_email(request):
+    from auto_email import send_email
+    try:
+        send_email(request.profile['student_name'], request.profile['student_email'],
+                   request.profile['advisor_email'], request.course, request.section,
+                   request.profile['student_id'])
+        return True
+    except Exception as e:
+        print(f"Email failed: {e}", file=sys.stderr)
+        return False
+
+
+def cmd_profiles(args):
+    for key, profile in get_profile_repository().items():
+        print(json.dumps({'key': key, 'student_id': profile.get('student_id'),
+                          'student_name': profile.get('student_name')}))
+    return EXIT_FOUND
+
+
+def cmd_check(args):
+    from search_engine import make_search_request
+
+    profile = find_profile(args.profile)
+    if profile is None:
+        print(f"Unknown profile: {args.profile}", file=sys.stderr)
+        return EXIT_USAGE
+    requests = [make_search_request(profile, args.department, args.semester, course, section,
+                                    source='cli')
+                for course, section in args.watch]
+    return run_requests(requests, args.email)
+
+
+def cmd_alarms(args):
+    from search_engine import make_search_request
+
+    now = datetime.now()
+    alarms = load_alarms()
+    planner = get_predictive_planner()
+    planner.set_alarms(alarms)
+    if args.due_within is not None:
+        alarms = [alarm for alarm in alarms if alarm_is_due(alarm, now, args.due_within)]
+    # Predictive alarms count against the profile's daily check budget
+    alarms = [alarm for alarm in alarms if alarm.get('mode') != PREDICTIVE or planner.consume(alarm)]
+    requests = [make_search_request(alarm['profile'], alarm['department'], alarm['semester'],
+                                    alarm['course'], alarm['section'], source='cli')
+                for alarm in alarms]
+    return run_requests(requests, args.email)
+
+
+def cmd_history(args):
+    from seat_history import get_seat_history, HOURLY
+
+    history = get_seat_history()
+    since = time.time() - args.hours * 3600
+    found = False
+    for course, section in args.watch:
+        last_open = history.last_free_seat(course, section, args.department, args.semester)
+        found = found or last_open is not None
+        print(json.dumps({'course': course, 'section': section, 'last_free_seat': last_open}))
+        if args.hours:
+            ids = history.find_series(course, section, args.department, args.semester)
+            for rollup in history.rollups(HOURLY, ids, since):
+                print(json.dumps(rollup))
+    return EXIT_FOUND if found else EXIT_NOT_FOUND
+
+
+def cmd_settings(args):
+    import storage
+
+    if args.section is None:
+        if args.set or args.unset:
+            print("--set and --unset need a section", file=sys.stderr)
+            return EXIT_USAGE
+        for name, section in sorted(storage.load_settings().items()):
+            print(json.dumps({'section': name, 'settings': section}))
+        return EXIT_FOUND
+
+    section = storage.get_setting(args.section, {})
+    if args.set or args.unset:
+        for key, value in args.set:
+            section[key] = value
+        for key in args.unset:
+            section.pop(key, None)
+        storage.update_settings(**{args.section: section})
+    print(json.dumps({'section': args.section, 'settings': section}))
+    return EXIT_FOUND
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="walle_cli", description="Headless Wall-E seat checks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    profiles = commands.add_parser("profiles", help="list saved profiles")
+    profiles.set_defaults(func=cmd_profiles)
+
+    check = commands.add_parser("check", help="check course sections for one profile")
+    check.add_argument("--profile", required=True, help="profile key, student ID or student name")
+    check.add_argument("--department", required=True)
+    check.add_argument("--semester", required=True)
+    check.add_argument("--watch", required=True, action="append", type=parse_watch,
+                       metavar="COURSE:SECTION", help="may be given several times")
+    check.add_argument("--email", action="store_true", help="email the advisor when a seat is free")
+    check.set_defaults(func=cmd_check)
+
+    alarms = commands.add_parser("alarms", help="run the alarms saved in the app")
+    alarms.add_argument("--due-within", type=int, metavar="MINUTES",
+                        help="only alarms scheduled in the last MINUTES (for cron); default: all")
+    alarms.add_argument("--email", action="store_true", help="email the advisor when a seat is free")
+    alarms.set_defaults(func=cmd_alarms)
+
+    history = commands.add_parser("history", help="show when sections last had a free seat")
+    history.add_argument("--watch", required=True, action="append", type=parse_watch,
+                         metavar="COURSE:SECTION", help="may be given several times")
+    history.add_argument("--department")
+    history.add_argument("--semester")
+    history.add_argument("--hours", type=int, default=0, help="also print hourly rollups for the last HOURS")
+    history.set_defaults(func=cmd_history)
+
+    settings = commands.add_parser("settings", help="show or change the saved settings")
+    settings.add_argument("section", nargs="?", help="e.g. watch, snapshot, browser; default: every saved section")
+    settings.add_argument("--set", action="append", default=[], type=parse_setting, metavar="KEY=VALUE",
+                          help="VALUE is JSON, e.g. 30, true or '[[\"09:00\", \"13:00\"]]'; may be given several times")
+    settings.add_argument("--unset", action="append", default=[], metavar="KEY",
+                          help="go back to the default for KEY; may be given several times")
+    settings.set_defaults(func=cmd_settings)
+    return parser
+
+
+def main(argv=None):
+    from metrics import get_metrics
+
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        # One export per run, so cron-driven checks still leave metrics behind
+        try:
+            get_metrics().export()
+        except OSError as e:
+            print(f"Metrics export failed: {e}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
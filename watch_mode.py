@@ -0,0 +1,221 @@
+import heapq
+import random
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from storage import load_section
+from snapshot_diff import get_snapshot_tracker, SEATS_OPENED
+from search_engine import request_key
+
+
+
+# Defaults for the "watch" settings section (see `walle_cli.py settings`)
+DEFAULT_WATCH_SETTINGS = {
+    'fast_interval': 20,            # Seconds between polls during registration or churn
+    'base_interval': 60,            # First interval once things go quiet
+    'max_interval': 15 * 60,        # Backoff ceiling
+    'backoff_factor': 2.0,
+    'jitter': 0.2,                  # +/- fraction applied to every interval
+    'deadline_hours': 24,
+    'registration_windows': [],     # Daily ["HH:MM", "HH:MM"] pairs, e.g. [["09:00", "13:00"]]
+}
+
+
+def load_watch_settings():
+    return load_section("watch", DEFAULT_WATCH_SETTINGS)
+
+
+def in_registration_window(windows, now):
+    current = now.strftime("%H:%M")
+    for start, end in windows:
+        if start <= end and start <= current < end:
+            return True
+        if start > end and (current >= start or current < end):   # Window across midnight
+            return True
+    return False
+
+
+class AdaptiveInterval:
+    """Poll interval that speeds up on activity and backs off exponentially, with jitter, when idle."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.current = settings['base_interval']
+
+    def next(self, changed, now=None):
+        settings = self.settings
+        now = now or datetime.now()
+        if changed or in_registration_window(settings['registration_windows'], now):
+            self.current = settings['base_interval']
+            interval = settings['fast_interval']
+        else:
+            interval = self.current
+            self.current = min(self.current * settings['backoff_factor'], settings['max_interval'])
+        jitter = settings['jitter']
+        return interval * random.uniform(1 - jitter, 1 + jitter)
+
+
+class SeatWatch:
+    """
+    One course/section being watched until a seat appears, the deadline passes or it is stopped.
+
+    The watch only decides when to poll; the polls themselves run on the SearchEngine.
+    on_found(request, result) fires once when a seat is free; on_finished(request, reason)
+    fires when the watch ends for any reason ('found', 'deadline' or 'stopped').
+    """
+
+    def __init__(self, request, on_found, on_finished=None, deadline=None, tracker=None, settings=None):
+        self.request = request
+        self.on_found = on_found
+        self.on_finished = on_finished
+        self.settings = settings or load_watch_settings()
+        self.deadline = deadline or time.time() + self.settings['deadline_hours'] * 3600
+        self.tracker = tracker or get_snapshot_tracker()
+        self.interval = AdaptiveInterval(self.settings)
+        self.next_poll = time.time()
+        self.last_poll = self.next_poll
+        self.stopped = False
+        self.finished = False
+        self.in_flight = False
+        self.polls = 0
+        self.last_error = None
+
+    def reschedule(self, now=None):
+        """Set next_poll from the table churn since the last poll."""
+        now = now or time.time()
+        # Churn anywhere in the table since the last poll keeps us on the fast interval
+        changed = self.tracker.changed_since(self.request.department, self.request.semester, self.last_poll)
+        self.last_poll = now
+        self.next_poll = now + min(self.interval.next(changed), max(self.deadline - now, 0))
+
+
+class WatchManager:
+    """
+    Keeps the running watches, one per distinct request.
+
+    A single scheduler thread submits each watch's polls to the SearchEngine when they are
+    due, so watches share its worker limit and per-profile queues with every other check.
+    When any fetch of a table (another profile's alarm, a manual search) shows seats opening
+    in a watched section, that watch is polled at once instead of waiting out its interval.
+    """
+
+    def __init__(self, engine, tracker=None):
+        self.engine = engine
+        self.condition = threading.Condition()
+        self.watches = {}           # request key -> SeatWatch
+        self.due = []               # heap of (next poll, sequence, SeatWatch); stale entries are skipped
+        self.sequence = 0
+        self.closed = False
+        self.thread = None
+        (tracker or get_snapshot_tracker()).subscribe(self.on_table_changed)
+
+    def start(self, request, on_found, on_finished=None, deadline=None):
+        """Start watching. Returns False if the same course/section is already being watched."""
+        key = request_key(request)
+        with self.condition:
+            if key in self.watches or self.closed:
+                return False
+            watch = self.watches[key] = SeatWatch(request, on_found, on_finished, deadline)
+            self._push(watch)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True, name="seat-watch")
+                self.thread.start()
+        return True
+
+    def _push(self, watch):
+        self.sequence += 1
+        heapq.heappush(self.due, (watch.next_poll, self.sequence, watch))
+        self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.closed and (not self.due or self.due[0][0] > time.time()):
+                    self.condition.wait(self.due[0][0] - time.time() if self.due else None)
+                if self.closed:
+                    return
+                due, _, watch = heapq.heappop(self.due)
+                if due != watch.next_poll:
+                    continue        # Rescheduled since this entry was pushed
+            self._poll(watch)
+
+    def _poll(self, watch):
+        if watch.finished:
+            return
+        if watch.stopped:
+            return self._finish(watch, 'stopped')
+        if time.time() >= watch.deadline:
+            return self._finish(watch, 'deadline')
+        watch.in_flight = True
+        if not self.engine.submit(watch.request, partial(self._on_result, watch), partial(self._on_error, watch)):
+            # The same check is already queued, e.g. a manual search; try again next interval
+            watch.in_flight = False
+            self._requeue(watch)
+
+    def _on_result(self, watch, request, result):
+        watch.in_flight = False
+        watch.polls += 1
+        watch.last_error = None
+        if result['available_seats'] and result['available_seats'] > 0 and not watch.finished:
+            watch.on_found(request, result)
+            self._finish(watch, 'found')
+        else:
+            self._requeue(watch)
+
+    def _on_error(self, watch, request, error):
+        watch.in_flight = False
+        watch.polls += 1
+        watch.last_error = error
+        print(f"Watch poll failed: {error}")
+        self._requeue(watch)
+
+    def _requeue(self, watch):
+        if watch.stopped:
+            return self._finish(watch, 'stopped')
+        with self.condition:
+            if not watch.finished:
+                watch.reschedule()
+                self._push(watch)
+
+    def on_table_changed(self, department, semester, events):
+        """Snapshot tracker listener: poll now every idle watch whose section just opened."""
+        opened = {(event['course'], event['section']) for event in events if event['type'] == SEATS_OPENED}
+        if not opened:
+            return
+        with self.condition:
+            for watch in self.watches.values():
+                request = watch.request
+                if (request.department, request.semester) == (department, semester) and \
+                        (request.course, request.section) in opened and not watch.in_flight:
+                    watch.next_poll = time.time()
+                    self._push(watch)
+
+    def _finish(self, watch, reason):
+        with self.condition:
+            if watch.finished:
+                return
+            watch.finished = True
+            self.watches.pop(request_key(watch.request), None)
+        if watch.on_finished:
+            watch.on_finished(watch.request, reason)
+
+    def stop(self, request):
+        with self.condition:
+            watch = self.watches.get(request_key(request))
+            if watch:
+                # Poll it now so the scheduler ends it without waiting out the interval
+                watch.stopped = True
+                watch.next_poll = time.time()
+                self._push(watch)
+        return watch is not None
+
+    def stop_all(self):
+        with self.condition:
+            self.closed = True
+            watches = list(self.watches.values())
+            for watch in watches:
+                watch.stopped = True
+            self.condition.notify()
+        for watch in watches:
+            self._finish(watch, 'stopped')